@@ -1,46 +1,259 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+import base64
+import json
+import uuid
+from typing import AsyncIterator, Optional, Tuple
 
-from app.core.database import get_db
-from app.schemas.code_analysis import Codebase, CodeFile
-from app.models.code_analysis import CodebaseResponse, CodeFileResponse
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.core.metrics import STAGE_SECONDS
+from app.schemas.code_analysis import Codebase, CodeChunk, CodeFile
+from app.models.code_analysis import CodebaseResponse, CodeChunkResponse, CodeFileResponse
+from app.services.blob_store import load_content
+from app.services.response_cache import CODEBASES_SCOPE, Rendered, cached_response, current_version, etag_headers
+from app.services.versions import SnapshotError, live, snapshot_generation
 
 router = APIRouter()
 
+_codebase_list = TypeAdapter(list[CodebaseResponse])
+_file_list = TypeAdapter(list[CodeFileResponse])
+
 @router.get("/codebases/", response_model=list[CodebaseResponse])
-def list_codebases(db: Session = Depends(get_db)):
+async def list_codebases(request: Request, db: AsyncSession = Depends(get_db)):
     """Get all codebases."""
-    return db.query(Codebase).all()
+    async def render() -> bytes:
+        codebases = (await db.scalars(select(Codebase))).all()
+        return _codebase_list.dump_json(_codebase_list.validate_python(codebases, from_attributes=True))
+    
+    return await cached_response(request, db, "codebases", CODEBASES_SCOPE, (), render)
+
+# Response header with the cursor of the next page of files
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_cursor(file_path: str, file_id: uuid.UUID) -> str:
+    raw = json.dumps([file_path, str(file_id)]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, uuid.UUID]:
+    try:
+        file_path, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        # Well-formed JSON of the wrong types must not reach the query
+        if not isinstance(file_path, str) or not isinstance(file_id, str):
+            raise ValueError("cursor fields must be strings")
+        return file_path, uuid.UUID(file_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _render_files_page(db: AsyncSession, codebase_id: str, cursor: Optional[str], limit: int,
+                             generation: Optional[int] = None) -> Rendered:
+    # Keyset pagination on (file_path, id): each page is an index range
+    # scan, so deep pages cost the same as the first one
+    query = select(CodeFile).options(
+        load_only(CodeFile.id, CodeFile.file_path, CodeFile.language, CodeFile.parsed_at)
+    ).where(CodeFile.codebase_id == codebase_id, live(generation))
+    if cursor:
+        query = query.where(tuple_(CodeFile.file_path, CodeFile.id) > _decode_cursor(cursor))
+    
+    # One extra row tells us whether another page follows
+    files = (await db.scalars(query.order_by(CodeFile.file_path, CodeFile.id).limit(limit + 1))).all()
+    headers = {}
+    if len(files) > limit:
+        files = files[:limit]
+        headers[NEXT_CURSOR_HEADER] = _encode_cursor(files[-1].file_path, files[-1].id)
+    
+    return Rendered(_file_list.dump_json(_file_list.validate_python(files, from_attributes=True)), headers)
 
 @router.get("/codebases/{codebase_id}/files", response_model=list[CodeFileResponse])
-def get_codebase_files(codebase_id: str, db: Session = Depends(get_db)):
-    """Get all files in a codebase."""
-    codebase = db.query(Codebase).filter(Codebase.id == codebase_id).first()
-    if not codebase:
+async def get_codebase_files(
+    request: Request,
+    codebase_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.FILES_PAGE_SIZE, ge=1, le=settings.FILES_PAGE_MAX),
+    version: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get one page of files in a codebase, ordered by path.
+
+    When more files follow, the X-Next-Cursor header carries the value to
+    pass back as ?cursor=, and a Link header the URL of the next page.
+    With ?version= the files of that snapshot are listed instead of the
+    current ones.
+    """
+    if cursor:
+        _decode_cursor(cursor)  # Reject a bad cursor before anything is cached
+    generation = None
+    if version is not None:
+        try:
+            generation = await snapshot_generation(db, codebase_id, version)
+        except SnapshotError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    response = await cached_response(
+        request, db, "files", codebase_id, (cursor, limit, generation),
+        lambda: _render_files_page(db, codebase_id, cursor, limit, generation)
+    )
+    if response is None:
         raise HTTPException(status_code=404, detail="Codebase not found")
-    
-    return db.query(CodeFile).filter(CodeFile.codebase_id == codebase_id).all()
+    next_cursor = response.headers.get(NEXT_CURSOR_HEADER)
+    if next_cursor:
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return response
 
-#API dashboard analytics endpoint
-@router.get("/codebases/{codebase_id}/analysis")
-def get_codebase_analysis(codebase_id: str, db: Session = Depends(get_db)):
-    """Get detailed analysis of a codebase."""
-    files = db.query(CodeFile).filter(CodeFile.codebase_id == codebase_id).all()
+@router.get("/codebases/{codebase_id}/files/{file_id}/content", response_class=PlainTextResponse)
+async def get_file_content(codebase_id: str, file_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the source text of one file from the blob store."""
+    digest = await db.scalar(
+        select(CodeFile.content_hash).where(CodeFile.codebase_id == codebase_id, CodeFile.id == file_id)
+    )
+    content = await load_content(db, digest) if digest else None
+    if content is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return PlainTextResponse(content)
+
+@router.get("/codebases/{codebase_id}/files/{file_id}/chunks", response_model=list[CodeChunkResponse])
+async def get_file_chunks(codebase_id: str, file_id: str, with_text: bool = False,
+                          db: AsyncSession = Depends(get_db)):
+    """Get the module, class and function chunks of one file."""
+    file = (await db.execute(
+        select(CodeFile.file_path, CodeFile.content_hash).where(
+            CodeFile.codebase_id == codebase_id, CodeFile.id == file_id
+        )
+    )).first()
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    chunks = (await db.scalars(
+        select(CodeChunk).options(load_only(
+            CodeChunk.chunk_hash, CodeChunk.kind, CodeChunk.name, CodeChunk.parent,
+            CodeChunk.start_line, CodeChunk.end_line, CodeChunk.token_count
+        )).where(
+            CodeChunk.codebase_id == codebase_id, CodeChunk.file_path == file.file_path,
+            # Chunks describe the current content; older versions of the file have none
+            CodeChunk.content_hash == file.content_hash
+        ).order_by(CodeChunk.start_line)
+    )).all()
     
+    results = [CodeChunkResponse.model_validate(chunk, from_attributes=True) for chunk in chunks]
+    if with_text and file.content_hash:
+        # One blob read serves every chunk of the file
+        lines = (await load_content(db, file.content_hash) or '').split('\n')
+        for chunk in results:
+            chunk.text = '\n'.join(lines[chunk.start_line - 1:chunk.end_line])
+    return results
+
+async def _stream_analysis(codebase_id: str) -> AsyncIterator[bytes]:
+    """Yield one NDJSON record per file, then a summary record.
+
+    Rows come from a server-side cursor in partitions of
+    ANALYSIS_STREAM_BATCH_SIZE and totals are accumulated on the way,
+    so memory does not grow with the number of files. The body is sent
+    after the endpoint has returned, so the cursor runs on a session of
+    its own rather than the request's.
+    """
+    statement = select(
+        CodeFile.file_path,
+        CodeFile.language,
+        CodeFile.function_count,
+        CodeFile.class_count,
+        CodeFile.analysis_result['functions'],
+        CodeFile.analysis_result['classes']
+    ).where(CodeFile.codebase_id == codebase_id, live()).order_by(CodeFile.file_path).execution_options(
+        yield_per=settings.ANALYSIS_STREAM_BATCH_SIZE
+    )
+
+    summary = {"type": "summary", "total_files": 0, "total_functions": 0, "total_classes": 0, "languages": {}}
+    languages = summary["languages"]
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement)
+        async for partition in result.partitions():
+            with STAGE_SECONDS.labels("serialize").time():
+                lines = []
+                for file_path, language, function_count, class_count, functions, classes in partition:
+                    summary["total_files"] += 1
+                    summary["total_functions"] += function_count or 0
+                    summary["total_classes"] += class_count or 0
+                    languages[language] = languages.get(language, 0) + 1
+                    lines.append(orjson.dumps({
+                        "type": "file",
+                        "path": file_path,
+                        "functions": functions or [],
+                        "classes": classes or []
+                    }))
+                chunk = b'\n'.join(lines) + b'\n'
+            yield chunk
+
+    yield orjson.dumps(summary) + b'\n'
+
+async def _render_analysis(db: AsyncSession, codebase_id: str) -> bytes:
+    # Totals and the language histogram come from one grouped aggregate
+    language_rows = (await db.execute(
+        select(
+            CodeFile.language,
+            func.count(CodeFile.id),
+            func.coalesce(func.sum(CodeFile.function_count), 0),
+            func.coalesce(func.sum(CodeFile.class_count), 0)
+        ).where(CodeFile.codebase_id == codebase_id, live()).group_by(CodeFile.language)
+    )).all()
+
     analysis = {
-        "total_files": len(files),
-        "total_functions": sum(f.function_count or 0 for f in files),
-        "total_classes": sum(f.class_count or 0 for f in files),
-        "languages": {},
+        "total_files": sum(row[1] for row in language_rows),
+        "total_functions": sum(row[2] for row in language_rows),
+        "total_classes": sum(row[3] for row in language_rows),
+        "languages": {language: count for language, count, _, _ in language_rows},
         "files": []
     }
-    
-    for file in files:
-        analysis["languages"][file.language] = analysis["languages"].get(file.language, 0) + 1
+
+    # Only the JSONB members the response uses, never the file content
+    file_rows = await db.execute(
+        select(
+            CodeFile.file_path,
+            CodeFile.analysis_result['functions'],
+            CodeFile.analysis_result['classes']
+        ).where(CodeFile.codebase_id == codebase_id, live()).order_by(CodeFile.file_path)
+    )
+
+    for file_path, functions, classes in file_rows:
         analysis["files"].append({
-            "path": file.file_path,
-            "functions": file.analysis_result.get('functions', []) if file.analysis_result else [],
-            "classes": file.analysis_result.get('classes', []) if file.analysis_result else []
+            "path": file_path,
+            "functions": functions or [],
+            "classes": classes or []
         })
     
-    return analysis
\ No newline at end of file
+    with STAGE_SECONDS.labels("serialize").time():
+        return orjson.dumps(analysis)
+
+#API dashboard analytics endpoint
+@router.get("/codebases/{codebase_id}/analysis")
+async def get_codebase_analysis(request: Request, codebase_id: str, stream: bool = False,
+                                db: AsyncSession = Depends(get_db)):
+    """Get detailed analysis of a codebase (?stream=true for NDJSON).
+
+    Buffered responses are served from the response cache; streamed ones
+    are never cached but still answer If-None-Match with 304.
+    """
+    if stream:
+        version = await current_version(db, codebase_id)
+        if version is None:
+            return StreamingResponse(_stream_analysis(codebase_id), media_type="application/x-ndjson")
+        headers, not_modified = etag_headers(request, "analysis_stream", codebase_id, version)
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+        return StreamingResponse(_stream_analysis(codebase_id), media_type="application/x-ndjson",
+                                 headers=headers)
+
+    response = await cached_response(
+        request, db, "analysis", codebase_id, (), lambda: _render_analysis(db, codebase_id)
+    )
+    if response is None:
+        # Unknown codebases keep answering with an empty analysis
+        return Response(await _render_analysis(db, codebase_id), media_type="application/json")
+    return response
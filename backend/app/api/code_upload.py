@@ -1,22 +1,40 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import shutil
 import os
 from pathlib import Path
 from typing import List
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.schemas.code_analysis import Codebase, CodeFile
-from app.models.code_analysis import CodebaseCreate, CodebaseResponse
-from app.services.mcp_parser import MCPParser  # CHANGED: Import MCP parser
+from app.schemas.code_analysis import Codebase
+from app.models.code_analysis import ArchiveResponse, CodebaseCreate, CodebaseResponse, UploadResponse
+from app.services.parser_registry import get_parser
+from app.services.archive_reader import ArchiveEntry, ArchiveError, iter_archive
+from app.services.ingest import IngestStats, finish_ingest, ingest_entries
+from app.services.jobs import enqueue_job, notify_workers
+from app.services.response_cache import CODEBASES_SCOPE, forget_version
 
 router = APIRouter()
-mcp_parser = MCPParser()  # CHANGED: Use MCP parser instead of basic parser
+
+async def _queue_job(db: AsyncSession, codebase_id: str, source: str, **upload) -> JSONResponse:
+    """Spool an upload as a background job and answer 202 with its id."""
+    job = await enqueue_job(db, codebase_id, source, **upload)
+    await db.commit()
+    notify_workers()
+    return JSONResponse(status_code=202, content={
+        "job_id": str(job.id),
+        "status": job.status,
+        "files_total": job.files_total,
+        "status_url": f"{settings.API_V1_STR}/jobs/{job.id}"
+    })
 
 @router.post("/codebases/", response_model=CodebaseResponse)
 async def create_codebase(
     codebase_data: CodebaseCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new codebase entry."""
     try:
@@ -25,67 +43,141 @@ async def create_codebase(
             version=codebase_data.version
         )
         db.add(db_codebase)
-        db.commit()
-        db.refresh(db_codebase)
+        await db.commit()
+        await db.refresh(db_codebase)
+        forget_version(CODEBASES_SCOPE)
         return db_codebase
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/codebases/{codebase_id}/upload")
+@router.post("/codebases/{codebase_id}/upload", response_model=UploadResponse)
 async def upload_code_files(
     codebase_id: str,
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
+    background: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Upload and parse multiple code files with MCP analysis."""
+    """Upload and parse multiple code files with MCP analysis.
+
+    With ?background=true the files are queued as an ingest job and the
+    response only carries the job id to poll at /jobs/{id}. The parse
+    records are handed to orjson as they are rather than being copied
+    into dicts and re-validated against the response model.
+    """
     try:
         # Verify codebase exists
-        codebase = db.query(Codebase).filter(Codebase.id == codebase_id).first()
+        codebase = await db.scalar(select(Codebase).where(Codebase.id == codebase_id))
         if not codebase:
             raise HTTPException(status_code=404, detail="Codebase not found")
         
-        processed_files = []
+        if background:
+            return await _queue_job(db, codebase_id, "files", files=files)
         
+        entries = []
         for file in files:
-            # Read file content
-            content = await file.read()
-            content_str = content.decode('utf-8')
-            
-            # ENHANCED: Use MCP parser for professional analysis
-            parsed_data = mcp_parser.parse_code(content_str, file.filename)  # CHANGED: Use MCP parser
-            
-            # Calculate additional metrics
-            function_count = len(parsed_data.get('functions', []))
-            class_count = len(parsed_data.get('classes', []))
-            import_count = len(parsed_data.get('imports', []))
-            
-            # Save to database with enhanced fields
-            db_file = CodeFile(
-                codebase_id=codebase_id,
-                file_path=file.filename,
-                content=content_str,
-                language=parsed_data.get('language', 'unknown'),
-                # Store MCP analysis results
-                analysis_result=parsed_data,  # CHANGED: Store full MCP analysis
-                size_bytes=len(content_str.encode('utf-8')),
-                line_count=len(content_str.splitlines()),
-                function_count=function_count,
-                class_count=class_count
-            )
-            db.add(db_file)
+            entries.append(ArchiveEntry(file.filename, await file.read()))
+        
+        processed_files = []
+        stats = IngestStats()
+        
+        # Parsing runs in the process pool; results arrive as batches finish
+        async for outcome in ingest_entries(db, codebase_id, entries):
+            stats.record(outcome)
+            if outcome.status == "unchanged":
+                processed_files.append({"filename": outcome.path, "status": "unchanged"})
+                continue
+            if outcome.status != "processed":
+                processed_files.append({"filename": outcome.path, "status": outcome.status, "reason": outcome.reason})
+                continue
+            parsed_data = outcome.parsed
             processed_files.append({
-                "filename": file.filename,
-                "language": parsed_data.get('language'),
-                "functions": parsed_data.get('functions', []),
-                "classes": parsed_data.get('classes', []),
-                "imports": parsed_data.get('imports', []),
-                "parser": parsed_data.get('parser', 'unknown')
+                "filename": outcome.path,
+                "status": "processed",
+                "cached": outcome.cached,
+                "language": parsed_data.language,
+                "functions": parsed_data.functions,
+                "classes": parsed_data.classes,
+                "imports": parsed_data.imports,
+                "parser": parsed_data.parser
             })
         
-        db.commit()
-        return {"message": f"Processed {len(processed_files)} files", "files": processed_files}
+        if stats.counts["processed"]:
+            await finish_ingest(db, codebase_id, changed=[
+                entry["filename"] for entry in processed_files if entry["status"] == "processed"
+            ])
+        else:
+            await db.commit()
+        return ORJSONResponse({
+            "message": f"Processed {stats.counts['processed']} files",
+            **stats.counts,
+            "files": processed_files
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/codebases/{codebase_id}/archive", response_model=ArchiveResponse)
+async def upload_archive(
+    codebase_id: str,
+    archive: UploadFile = File(...),
+    background: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Ingest a whole repository from a single zip or tar.gz archive.
+
+    Entries are streamed one at a time, so memory depends on the largest
+    file rather than on the size of the repository. With ?background=true
+    the archive is queued as an ingest job instead.
+    """
+    try:
+        codebase = await db.scalar(select(Codebase).where(Codebase.id == codebase_id))
+        if not codebase:
+            raise HTTPException(status_code=404, detail="Codebase not found")
+        
+        if background:
+            return await _queue_job(db, codebase_id, "archive", archive=archive)
+        
+        outcomes = []
+        stats = IngestStats()
+        
+        entries = iter_archive(archive.file, get_parser().supports, settings.ARCHIVE_MAX_FILE_BYTES)
+        async for outcome in ingest_entries(db, codebase_id, entries):
+            stats.record(outcome)
+            if outcome.status == "processed":
+                outcomes.append({
+                    "path": outcome.path,
+                    "status": outcome.status,
+                    "cached": outcome.cached,
+                    "language": outcome.parsed.language,
+                    "functions": len(outcome.parsed.functions),
+                    "classes": len(outcome.parsed.classes)
+                })
+            elif outcome.status == "unchanged":
+                outcomes.append({"path": outcome.path, "status": outcome.status})
+            else:
+                outcomes.append({"path": outcome.path, "status": outcome.status, "reason": outcome.reason})
+        
+        if stats.counts["processed"]:
+            await finish_ingest(db, codebase_id, changed=[
+                entry["path"] for entry in outcomes if entry["status"] == "processed"
+            ])
+        else:
+            await db.commit()
+        return ORJSONResponse({
+            "message": f"Processed {stats.counts['processed']} files",
+            **stats.counts,
+            "files": outcomes
+        })
+        
+    except HTTPException:
+        raise
+    except ArchiveError as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.schemas.code_analysis import Codebase
+from app.models.code_analysis import DependencyCycles, DependencyResponse
+from app.services.dependency_graph import DependencyGraph, build_graph, get_graph
+
+router = APIRouter()
+
+async def _load_graph(db: AsyncSession, codebase_id: str) -> DependencyGraph:
+    codebase = await db.scalar(select(Codebase).where(Codebase.id == codebase_id))
+    if not codebase:
+        raise HTTPException(status_code=404, detail="Codebase not found")
+    
+    graph = await get_graph(db, codebase_id)
+    if graph is None:
+        # Codebases ingested before the graph stage existed
+        graph = await build_graph(db, codebase_id)
+        await db.commit()
+    return graph
+
+@router.get("/codebases/{codebase_id}/dependencies", response_model=DependencyResponse)
+async def get_dependencies(
+    codebase_id: str,
+    path: str = Query(..., description="File path as stored in the codebase"),
+    transitive: bool = False,
+    reverse: bool = Query(False, description="Files that import this one instead of files it imports"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the files a file imports, or the files importing it, directly or transitively."""
+    graph = await _load_graph(db, codebase_id)
+    node = graph.node(path)
+    if node is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    return {
+        "path": path,
+        "file_id": graph.file_ids[node],
+        "reverse": reverse,
+        "transitive": transitive,
+        "files": [
+            {"file_id": graph.file_ids[target], "path": graph.paths[target], "depth": depth}
+            for target, depth in graph.neighbours(node, transitive=transitive, reverse=reverse)
+        ]
+    }
+
+@router.get("/codebases/{codebase_id}/dependencies/cycles", response_model=DependencyCycles)
+async def get_dependency_cycles(codebase_id: str, db: AsyncSession = Depends(get_db)):
+    """Get groups of files that import each other in a cycle."""
+    graph = await _load_graph(db, codebase_id)
+    cycles = await asyncio.to_thread(graph.cycles)
+    return {"cycles": [[graph.paths[node] for node in cycle] for cycle in cycles]}
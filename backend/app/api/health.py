@@ -1,18 +1,48 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
 from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.admission import admission
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.metrics import pool_state
+from app.schemas.code_analysis import IngestJob
+from app.services.parse_executor import worker_count
 
 router = APIRouter()
 
 @router.get(
     "/health",
     summary="Health check",
-    description="Check if the API is running properly",
+    description="Check if the API is running properly; ?details=true adds pool and queue state",
     response_description="API status and timestamp"
 )
-async def health_check():
+async def health_check(details: bool = False, db: AsyncSession = Depends(get_db)):
     """Comprehensive health check endpoint."""
-    return {
+    health = {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "service": "codebase-oracle-api"
-    }
\ No newline at end of file
+    }
+    if not details:
+        return health
+
+    health["database_pool"] = pool_state()
+    health["parse_workers"] = worker_count()
+    health["uploads"] = admission.state()
+    try:
+        queued = dict((await db.execute(
+            select(IngestJob.status, func.count()).where(
+                IngestJob.status.in_(("queued", "running"))
+            ).group_by(IngestJob.status)
+        )).all())
+        health["jobs"] = {
+            "queued": queued.get("queued", 0),
+            "running": queued.get("running", 0),
+            "workers_here": settings.JOB_WORKERS
+        }
+    except Exception as e:
+        health["status"] = "degraded"
+        health["database_error"] = str(e)
+    return health
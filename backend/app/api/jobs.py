@@ -0,0 +1,32 @@
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.schemas.code_analysis import IngestJob
+from app.models.code_analysis import JobResponse
+from app.services.jobs import job_progress
+
+router = APIRouter()
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the progress of a background ingest job."""
+    job = await db.scalar(select(IngestJob).where(IngestJob.id == job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return {
+        "id": job.id,
+        "codebase_id": job.codebase_id,
+        "status": job.status,
+        "files_total": job.files_total,
+        "files_done": job.files_done,
+        "counts": job.counts,
+        "errors": job.errors,
+        "error": job.error,
+        **job_progress(job),
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_db
+from app.schemas.code_analysis import Codebase
+from app.models.code_analysis import SemanticMatch
+from app.services.code_search import SearchPatternError, compile_query, search_contents
+from app.services.embeddings import semantic_search
+
+router = APIRouter()
+
+@router.get("/codebases/{codebase_id}/search/semantic", response_model=list[SemanticMatch])
+async def search_semantic(
+    codebase_id: str,
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    level: str = Query("file", pattern="^(file|chunk)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Find the files (or function/class chunks) most similar to a free-text query."""
+    codebase = await db.scalar(select(Codebase).where(Codebase.id == codebase_id))
+    if not codebase:
+        raise HTTPException(status_code=404, detail="Codebase not found")
+    
+    return await semantic_search(db, codebase_id, q, k, level=level)
+
+async def _stream_search(codebase_id: str, q: str, pattern, regex: bool, limit: int):
+    # The body is sent after the endpoint returns, so it reads through a
+    # session of its own rather than the request's
+    async with AsyncSessionLocal() as db:
+        async for chunk in search_contents(db, codebase_id, q, pattern, regex, limit):
+            yield chunk
+
+@router.get("/codebases/{codebase_id}/search")
+async def search_code(
+    codebase_id: str,
+    q: str = Query(..., min_length=1),
+    regex: bool = False,
+    case_sensitive: bool = True,
+    limit: int = Query(100, ge=1, le=settings.CODE_SEARCH_MAX_RESULTS),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search file contents for a string or regex, streamed as NDJSON.
+
+    Each matching line is a {"type": "match", path, line, column, snippet}
+    record; a {"type": "summary"} record comes last.
+    """
+    codebase = await db.scalar(select(Codebase).where(Codebase.id == codebase_id))
+    if not codebase:
+        raise HTTPException(status_code=404, detail="Codebase not found")
+    
+    try:
+        pattern = compile_query(q, regex, case_sensitive)
+    except SearchPatternError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return StreamingResponse(
+        _stream_search(codebase_id, q, pattern, regex, limit), media_type="application/x-ndjson"
+    )
@@ -0,0 +1,28 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.schemas.code_analysis import Codebase
+from app.models.code_analysis import SymbolResponse
+from app.services.symbols import search_symbols
+
+router = APIRouter()
+
+@router.get("/codebases/{codebase_id}/symbols", response_model=list[SymbolResponse])
+async def find_symbols(
+    codebase_id: str,
+    q: str = Query(..., min_length=1),
+    mode: str = Query("auto", pattern="^(auto|exact|prefix|fuzzy)$"),
+    kind: Optional[str] = Query(None, pattern="^(function|class)$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search function and class definitions by name (exact, prefix or fuzzy)."""
+    codebase = await db.scalar(select(Codebase).where(Codebase.id == codebase_id))
+    if not codebase:
+        raise HTTPException(status_code=404, detail="Codebase not found")
+    
+    return await search_symbols(db, codebase_id, q, mode=mode, kind=kind, limit=limit)
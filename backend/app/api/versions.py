@@ -0,0 +1,116 @@
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.schemas.code_analysis import Codebase, CodebaseVersion
+from app.models.code_analysis import (
+    CodebaseVersionCreate, CodebaseVersionResponse, ManifestDiffResponse, ManifestRequest, VersionDiffResponse
+)
+from app.services.dependency_graph import build_graph
+from app.services.versions import (
+    SnapshotError, create_snapshot, diff_generations, diff_manifests, remove_paths, snapshot_generation,
+    stored_files
+)
+
+router = APIRouter()
+
+async def _require_codebase(db: AsyncSession, codebase_id: str):
+    codebase = await db.scalar(select(Codebase.id).where(Codebase.id == codebase_id))
+    if not codebase:
+        raise HTTPException(status_code=404, detail="Codebase not found")
+
+async def _manifest_diff(db: AsyncSession, codebase_id: str, manifest):
+    stored = await stored_files(db, codebase_id)
+    return diff_manifests(
+        {path: digest for path, (_, digest) in stored.items()},
+        {path: digest.lower() for path, digest in manifest.items()}
+    )
+
+@router.get("/codebases/{codebase_id}/versions", response_model=list[CodebaseVersionResponse])
+async def list_versions(codebase_id: str, db: AsyncSession = Depends(get_db)):
+    """Get the snapshots of a codebase, oldest first."""
+    await _require_codebase(db, codebase_id)
+    return (await db.scalars(
+        select(CodebaseVersion).where(CodebaseVersion.codebase_id == codebase_id).order_by(
+            CodebaseVersion.generation, CodebaseVersion.created_at
+        )
+    )).all()
+
+@router.post("/codebases/{codebase_id}/manifest", response_model=ManifestDiffResponse)
+async def diff_manifest(codebase_id: str, manifest: ManifestRequest, db: AsyncSession = Depends(get_db)):
+    """Compare a path -> SHA-256 manifest of a new tree with the stored files.
+
+    Only the paths under "upload" need to be sent before the tree is
+    recorded with POST /versions and the same manifest.
+    """
+    await _require_codebase(db, codebase_id)
+    diff = await _manifest_diff(db, codebase_id, manifest.files)
+    return {"upload": diff.added + diff.changed, "remove": diff.removed, "unchanged": diff.unchanged}
+
+@router.post("/codebases/{codebase_id}/versions", response_model=CodebaseVersionResponse, status_code=201)
+async def create_version(codebase_id: str, version: CodebaseVersionCreate, db: AsyncSession = Depends(get_db)):
+    """Record the current files as a named snapshot.
+
+    With a manifest the snapshot is exactly that tree: stored files that
+    are not in it are removed first, and the request fails with 409 if
+    any file in it still has to be uploaded.
+    """
+    try:
+        await _require_codebase(db, codebase_id)
+
+        removed = 0
+        if version.manifest is not None:
+            diff = await _manifest_diff(db, codebase_id, version.manifest)
+            missing = diff.added + diff.changed
+            if missing:
+                raise HTTPException(status_code=409, detail={
+                    "message": f"{len(missing)} files in the manifest are not uploaded yet",
+                    "upload": missing
+                })
+            removed = await remove_paths(db, codebase_id, diff.removed)
+
+        snapshot = await create_snapshot(db, codebase_id, version.label)
+        response = CodebaseVersionResponse.model_validate(snapshot, from_attributes=True)
+        await db.commit()
+        if removed:
+            await build_graph(db, codebase_id)
+            await db.commit()
+        return response
+
+    except HTTPException:
+        raise
+    except SnapshotError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/codebases/{codebase_id}/versions/diff", response_model=VersionDiffResponse)
+async def diff_versions(codebase_id: str, base: str, head: Optional[str] = None,
+                        db: AsyncSession = Depends(get_db)):
+    """Get the files and symbols that differ between two snapshots.
+
+    Without ?head= the snapshot is compared with the current files.
+    """
+    current = await db.scalar(select(Codebase.generation).where(Codebase.id == codebase_id))
+    if current is None:
+        raise HTTPException(status_code=404, detail="Codebase not found")
+    try:
+        base_generation = await snapshot_generation(db, codebase_id, base)
+        head_generation = current if head is None else await snapshot_generation(db, codebase_id, head)
+    except SnapshotError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    files = await diff_generations(db, codebase_id, base_generation, head_generation)
+    return {
+        "base": base,
+        "head": head if head is not None else "current",
+        "added": sum(1 for change in files if change["status"] == "added"),
+        "changed": sum(1 for change in files if change["status"] == "changed"),
+        "removed": sum(1 for change in files if change["status"] == "removed"),
+        "files": files
+    }
@@ -0,0 +1,252 @@
+"""Admission control and backpressure for upload requests."""
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import (
+    ADMISSION_ACTIVE, ADMISSION_INFLIGHT_BYTES, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+)
+
+# Endpoints that buffer whole uploads: POST /codebases/{id}/upload and /archive
+UPLOAD_PATH = re.compile(rf"^{re.escape(settings.API_V1_STR)}/codebases/(?P<codebase_id>[^/]+)/(?:upload|archive)/?$")
+
+
+class AdmissionRejected(Exception):
+    """An upload that cannot be admitted; carries the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, reason: str, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.reason = reason
+        self.detail = detail
+
+
+class _Waiter:
+    __slots__ = ("codebase_id", "size", "future", "enqueued")
+
+    def __init__(self, codebase_id: str, size: int, future: asyncio.Future):
+        self.codebase_id = codebase_id
+        self.size = size
+        self.future = future
+        self.enqueued = time.perf_counter()
+
+
+class AdmissionController:
+    """Concurrency and in-flight byte budgets, process-wide and per codebase.
+
+    A request larger than a byte budget is still admitted when nothing
+    else holds that budget, so every request under the body limit can
+    eventually run. The queue is FIFO for the process-wide limits;
+    a waiter blocked only by its own codebase's limits lets later
+    requests for other codebases pass. Everything runs on one event
+    loop, so no locking is needed.
+    """
+
+    def __init__(self, max_concurrent: int, max_bytes: int, max_concurrent_per_codebase: int,
+                 max_bytes_per_codebase: int, max_queue: int, max_queue_per_codebase: int):
+        self.max_concurrent = max_concurrent
+        self.max_bytes = max_bytes
+        self.max_concurrent_per_codebase = max_concurrent_per_codebase
+        self.max_bytes_per_codebase = max_bytes_per_codebase
+        self.max_queue = max_queue
+        self.max_queue_per_codebase = max_queue_per_codebase
+        self.active = 0
+        self.active_bytes = 0
+        # codebase id -> [active, bytes, queued]
+        self._codebases: Dict[str, List[int]] = {}
+        self._waiters: Deque[_Waiter] = deque()
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            settings.ADMISSION_MAX_CONCURRENT, settings.ADMISSION_MAX_INFLIGHT_BYTES,
+            settings.ADMISSION_MAX_CONCURRENT_PER_CODEBASE, settings.ADMISSION_MAX_INFLIGHT_BYTES_PER_CODEBASE,
+            settings.ADMISSION_MAX_QUEUE, settings.ADMISSION_MAX_QUEUE_PER_CODEBASE
+        )
+
+    def _usage(self, codebase_id: str) -> List[int]:
+        return self._codebases.setdefault(codebase_id, [0, 0, 0])
+
+    def _fits_process(self, size: int) -> bool:
+        return self.active < self.max_concurrent and (
+            self.active_bytes == 0 or self.active_bytes + size <= self.max_bytes
+        )
+
+    def _fits_codebase(self, codebase_id: str, size: int) -> bool:
+        active, used, _ = self._usage(codebase_id)
+        return active < self.max_concurrent_per_codebase and (
+            used == 0 or used + size <= self.max_bytes_per_codebase
+        )
+
+    def _admit(self, codebase_id: str, size: int):
+        usage = self._usage(codebase_id)
+        usage[0] += 1
+        usage[1] += size
+        self.active += 1
+        self.active_bytes += size
+
+    def _dequeue(self, waiter: _Waiter):
+        self._waiters.remove(waiter)
+        self._usage(waiter.codebase_id)[2] -= 1
+        self._forget_idle(waiter.codebase_id)
+
+    def _forget_idle(self, codebase_id: str):
+        if self._codebases.get(codebase_id) == [0, 0, 0]:
+            del self._codebases[codebase_id]
+
+    def _publish(self):
+        ADMISSION_ACTIVE.set(self.active)
+        ADMISSION_QUEUED.set(len(self._waiters))
+        ADMISSION_INFLIGHT_BYTES.set(self.active_bytes)
+
+    def _wake(self):
+        for waiter in list(self._waiters):
+            if waiter.future.done():
+                # Cancelled; its own acquire() takes it off the queue
+                continue
+            if not self._fits_process(waiter.size):
+                break
+            if not self._fits_codebase(waiter.codebase_id, waiter.size):
+                continue
+            self._dequeue(waiter)
+            self._admit(waiter.codebase_id, waiter.size)
+            ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - waiter.enqueued)
+            waiter.future.set_result(None)
+        self._publish()
+
+    def _expire(self, waiter: _Waiter):
+        if waiter.future.done():
+            return
+        self._dequeue(waiter)
+        waiter.future.set_exception(AdmissionRejected(
+            503, "timeout", "Server is busy with other uploads; try again later"
+        ))
+        # A waiter at the head may have been holding back others that fit
+        self._wake()
+
+    async def acquire(self, codebase_id: str, size: int, timeout: float):
+        """Wait until an upload of ``size`` bytes may run; raises AdmissionRejected."""
+        if not self._waiters and self._fits_process(size) and self._fits_codebase(codebase_id, size):
+            self._admit(codebase_id, size)
+            ADMISSION_WAIT_SECONDS.observe(0)
+            self._publish()
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(503, "queue_full", "Too many uploads in progress; try again later")
+        usage = self._usage(codebase_id)
+        if usage[2] >= self.max_queue_per_codebase:
+            self._forget_idle(codebase_id)
+            raise AdmissionRejected(429, "codebase_queue_full", "Too many concurrent uploads to this codebase")
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(codebase_id, size, loop.create_future())
+        self._waiters.append(waiter)
+        usage[2] += 1
+        # Capacity may be free while earlier waiters wait on their own codebase's limits
+        self._wake()
+        timer = loop.call_later(timeout, self._expire, waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiters:
+                self._dequeue(waiter)
+                self._wake()
+            elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                # Admitted just before the caller went away
+                self.release(codebase_id, size)
+            raise
+        finally:
+            timer.cancel()
+
+    def release(self, codebase_id: str, size: int):
+        usage = self._usage(codebase_id)
+        usage[0] -= 1
+        usage[1] -= size
+        self.active -= 1
+        self.active_bytes -= size
+        self._forget_idle(codebase_id)
+        self._wake()
+
+    def state(self) -> Dict[str, Any]:
+        """Current usage, for the health endpoint."""
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "inflight_bytes": self.active_bytes,
+            "codebases": len(self._codebases)
+        }
+
+
+admission = AdmissionController.from_settings()
+
+
+def _content_length(scope) -> Optional[int]:
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting upload requests through an AdmissionController.
+
+    Requests without a Content-Length reserve the whole body limit. The
+    body limit is also enforced on the bytes actually received.
+    """
+
+    def __init__(self, app, controller: Optional[AdmissionController] = None):
+        self.app = app
+        self.controller = controller or admission
+
+    async def __call__(self, scope, receive, send):
+        match = UPLOAD_PATH.match(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        codebase_id = match["codebase_id"]
+        limit = settings.ADMISSION_MAX_BODY_BYTES
+        length = _content_length(scope)
+        if length is not None and length > limit:
+            ADMISSION_REJECTED.labels("too_large").inc()
+            response = JSONResponse({"detail": f"Upload exceeds {limit} bytes"}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        size = length if length is not None else limit
+        try:
+            await self.controller.acquire(codebase_id, size, settings.ADMISSION_QUEUE_TIMEOUT)
+        except AdmissionRejected as e:
+            ADMISSION_REJECTED.labels(e.reason).inc()
+            response = JSONResponse(
+                {"detail": e.detail}, status_code=e.status_code,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    ADMISSION_REJECTED.labels("too_large").inc()
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {limit} bytes")
+            return message
+
+        try:
+            await self.app(scope, limited_receive, send)
+        finally:
+            self.controller.release(codebase_id, size)
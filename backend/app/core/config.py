@@ -6,6 +6,11 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10  # Connections kept open per engine
+    DB_MAX_OVERFLOW: int = 20  # Extra connections allowed under burst load
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_ECHO: bool = False  # Log every SQL statement
     
     # API
     API_V1_STR: str = "/api/v1"
@@ -14,6 +19,68 @@ class Settings(BaseSettings):
     # Environment
     ENVIRONMENT: str = "development"  # development, testing, production
     
+    # Admission control for upload requests (per API process)
+    ADMISSION_MAX_CONCURRENT: int = 4  # Uploads processed at once
+    ADMISSION_MAX_CONCURRENT_PER_CODEBASE: int = 2
+    ADMISSION_MAX_INFLIGHT_BYTES: int = 1024 * 1024 * 1024  # Request bodies admitted at once
+    ADMISSION_MAX_INFLIGHT_BYTES_PER_CODEBASE: int = 512 * 1024 * 1024
+    ADMISSION_MAX_BODY_BYTES: int = 512 * 1024 * 1024  # Larger uploads get 413 before anything is read
+    ADMISSION_MAX_QUEUE: int = 32  # Uploads waiting for a slot; more get 503
+    ADMISSION_MAX_QUEUE_PER_CODEBASE: int = 8  # More waiting for one codebase get 429
+    ADMISSION_QUEUE_TIMEOUT: float = 30.0  # Seconds an upload may wait before it gets 503
+    ADMISSION_RETRY_AFTER: int = 10  # Retry-After seconds sent with rejections
+    
+    # Archive ingest
+    ARCHIVE_MAX_FILE_BYTES: int = 2 * 1024 * 1024  # Larger entries are skipped, never read
+    
+    # Ingest pipeline
+    INGEST_CHUNK_SIZE: int = 500  # Files hashed, looked up and flushed together
+    BULK_INSERT_BATCH_SIZE: int = 250  # CodeFile rows per INSERT batch
+    
+    # File listing pagination
+    FILES_PAGE_SIZE: int = 100  # Default page size for /codebases/{id}/files
+    FILES_PAGE_MAX: int = 1000  # Largest page a client may request
+    
+    # Streaming analysis
+    ANALYSIS_STREAM_BATCH_SIZE: int = 500  # Rows per server-side cursor fetch and response chunk
+    
+    # Background ingest jobs
+    JOB_WORKERS: int = 2  # Jobs processed concurrently by this process
+    JOB_SPOOL_DIR: str = "/tmp/codebase-oracle/jobs"  # Local scratch files for payloads on their way to and from the database
+    JOB_PAYLOAD_CHUNK_BYTES: int = 8 * 1024 * 1024  # Upload payloads are stored in rows of this size
+    JOB_BATCH_SIZE: int = 500  # Files committed per checkpoint
+    JOB_POLL_INTERVAL: float = 2.0  # Seconds between checks for queued jobs
+    JOB_STALE_SECONDS: int = 300  # A running job without a heartbeat this long is resumed elsewhere
+    JOB_HEARTBEAT_INTERVAL: float = 10.0  # Seconds between heartbeats of a running job
+    JOB_MAX_ERRORS: int = 100  # Per-file errors kept on the job
+    
+    # Parsing engine: "mcp" (regex), "scanner" (single-pass, string and comment aware) or "treesitter"
+    PARSER_ENGINE: str = "mcp"
+    
+    # Parsing executor
+    PARSE_WORKERS: int = 0  # 0 = one process per available core
+    PARSE_BATCH_SIZE: int = 32  # Files sent to a worker per task
+    PARSE_MAX_IN_FLIGHT: int = 0  # Batches queued at once, 0 = 2x workers
+    
+    # Content-addressed blob store
+    BLOB_COMPRESSION_LEVEL: int = 3  # zstd level (zlib is capped at 9)
+    
+    # Embeddings and semantic search
+    EMBEDDING_DIM: int = 256  # Hashing vectorizer buckets; changing it needs a re-ingest
+    SEMANTIC_EF_SEARCH: int = 64  # HNSW candidate list size per query (recall vs latency)
+    
+    # Response cache for read endpoints
+    RESPONSE_CACHE_ENTRIES: int = 256  # Rendered responses kept in the in-process LRU
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Total size of cached bodies
+    RESPONSE_CACHE_VERSION_TTL: float = 2.0  # Seconds a generation is trusted before re-reading it
+    
+    # Code search
+    CODE_SEARCH_BATCH_SIZE: int = 200  # Candidate files decompressed and verified together
+    CODE_SEARCH_MAX_RESULTS: int = 1000  # Largest ?limit a client may request
+    
+    # Parse result cache
+    PARSE_CACHE_SIZE: int = 10000  # Entries kept in the in-memory LRU
+    
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -1,27 +1,43 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
+# Pool settings shared by the sync and async engines
+_pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
     pool_pre_ping=True,  # Verify connection before using
-    echo=True  # Log SQL queries (disable in production)
+    echo=settings.DB_ECHO  # Log SQL queries
 )
 
+# Sync engine, used by scripts and other code outside the event loop
+engine = create_engine(settings.DATABASE_URL, **_pool_options)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same database through asyncpg, used by the API. pgvector's
+# Vector type binds and reads the text form '[1.0,2.0,...]', which asyncpg passes
+# through for extension types, so no binary vector codec may be registered on it
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    **_pool_options
+)
+
+# Objects stay usable after commit so endpoints can return them without reloading
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
 
 # Dependency injection for database sessions
-def get_db():
-    """Provide database session to endpoints."""
-    db = SessionLocal()
-    try:
+async def get_db():
+    """Provide an async database session to endpoints."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""Prometheus metrics for the ingest pipeline and query endpoints."""
+import time
+from typing import Dict
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+from app.core.database import async_engine
+
+# From sub-millisecond decode chunks up to whole-codebase graph builds
+_STAGE_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "codebase_oracle_stage_seconds",
+    "Time spent per call of a pipeline stage (read, decode, blob_store, parse, embed, db_flush, graph, serialize)",
+    ["stage"], buckets=_STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "codebase_oracle_request_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=_STAGE_BUCKETS
+)
+INGEST_FILES = Counter(
+    "codebase_oracle_ingest_files",
+    "Files seen by ingest, by language and outcome",
+    ["language", "status"]
+)
+INGEST_BYTES = Counter(
+    "codebase_oracle_ingest_bytes",
+    "Bytes of decoded source files, by language",
+    ["language"]
+)
+PARSE_ERRORS = Counter(
+    "codebase_oracle_parse_errors",
+    "Files the parser failed on, by language",
+    ["language"]
+)
+RESPONSE_CACHE = Counter(
+    "codebase_oracle_response_cache",
+    "Response cache lookups by endpoint and result (hit, miss, not_modified)",
+    ["endpoint", "result"]
+)
+JOBS_RUNNING = Gauge(
+    "codebase_oracle_jobs_running",
+    "Ingest jobs being processed by this process"
+)
+ADMISSION_ACTIVE = Gauge(
+    "codebase_oracle_admission_active",
+    "Upload requests admitted and running in this process"
+)
+ADMISSION_QUEUED = Gauge(
+    "codebase_oracle_admission_queued",
+    "Upload requests waiting for admission in this process"
+)
+ADMISSION_INFLIGHT_BYTES = Gauge(
+    "codebase_oracle_admission_inflight_bytes",
+    "Request body bytes reserved by admitted uploads"
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "codebase_oracle_admission_wait_seconds",
+    "Time uploads waited in the admission queue before running",
+    buckets=_STAGE_BUCKETS
+)
+ADMISSION_REJECTED = Counter(
+    "codebase_oracle_admission_rejected",
+    "Upload requests turned away, by reason (too_large, queue_full, codebase_queue_full, timeout)",
+    ["reason"]
+)
+
+
+def pool_state() -> Dict[str, int]:
+    """Connection counts of the async engine's pool."""
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Negative while the pool has not filled up yet
+        "overflow": max(pool.overflow(), 0)
+    }
+
+
+class _PoolCollector:
+    """Reports pool usage at scrape time instead of tracking every checkout."""
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "codebase_oracle_db_pool_connections",
+            "Database pool connections by state",
+            labels=["state"]
+        )
+        for state, value in pool_state().items():
+            connections.add_metric([state], value)
+        yield connections
+
+
+REGISTRY.register(_PoolCollector())
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware timing each request until its response has been sent.
+
+    The route template (``/codebases/{codebase_id}/files``) is used as the
+    label, never the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status)
+            ).observe(time.perf_counter() - start)
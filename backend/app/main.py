@@ -1,9 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import logging
 
 from app.core.config import settings
-from app.api import health, code_upload, code_analysis
+from app.api import health, code_upload, code_analysis, symbols, search, dependencies, jobs, metrics, versions
+from app.core.admission import AdmissionMiddleware
+from app.core.database import async_engine
+from app.core.metrics import RequestMetricsMiddleware
+from app.services.jobs import start_workers, stop_workers
+from app.services.parse_executor import shutdown_executor, start_executor
 
 # Configure logging
 logging.basicConfig(
@@ -18,9 +24,13 @@ def create_application() -> FastAPI:
         title=settings.PROJECT_NAME,
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse
     )
 
+    # Innermost, so rejections still get CORS headers and are timed
+    application.add_middleware(AdmissionMiddleware)
+
     # CORS middleware
     application.add_middleware(
         CORSMiddleware,
@@ -28,12 +38,22 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Paging headers of /codebases/{id}/files
+        expose_headers=["X-Next-Cursor", "Link"],
     )
+    application.add_middleware(RequestMetricsMiddleware)
 
     # Include routers
     application.include_router(health.router, prefix=settings.API_V1_STR, tags=["health"])
     application.include_router(code_upload.router, prefix=settings.API_V1_STR, tags=["code-upload"]) 
     application.include_router(code_analysis.router, prefix=settings.API_V1_STR, tags=["code-analysis"])
+    application.include_router(symbols.router, prefix=settings.API_V1_STR, tags=["symbols"])
+    application.include_router(search.router, prefix=settings.API_V1_STR, tags=["search"])
+    application.include_router(dependencies.router, prefix=settings.API_V1_STR, tags=["dependencies"])
+    application.include_router(jobs.router, prefix=settings.API_V1_STR, tags=["jobs"])
+    application.include_router(versions.router, prefix=settings.API_V1_STR, tags=["versions"])
+    # Served at the root, where Prometheus scrapes by default
+    application.include_router(metrics.router, tags=["metrics"])
 
     return application
 
@@ -43,8 +63,13 @@ app = create_application()
 async def startup_event():
     """Runs when application starts."""
     logger.info("Starting Codebase Oracle API")
+    await start_executor()
+    start_workers()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Runs when application shuts down."""
-    logger.info("Shutting down Codebase Oracle API")
\ No newline at end of file
+    logger.info("Shutting down Codebase Oracle API")
+    await stop_workers()
+    shutdown_executor()
+    await async_engine.dispose()
\ No newline at end of file
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, UUID4
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
 
+from app.services.parse_result import ClassRecord, FunctionRecord
+
 class CodebaseCreate(BaseModel):
     name: str
     version: Optional[str] = None
@@ -25,6 +27,159 @@ class CodeFileResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class SymbolResponse(BaseModel):
+    name: str
+    kind: str
+    language: str
+    file_id: UUID4
+    file_path: str
+    line: Optional[int]
+    end_line: Optional[int]
+    parent: Optional[str]
+    signature: Optional[str]
+    match: str  # exact, prefix or fuzzy
+    score: float
+
+class SemanticMatch(BaseModel):
+    file_path: str
+    language: str
+    score: float  # Cosine similarity, 1.0 is identical
+    file_id: Optional[UUID4] = None  # File-level matches
+    # Chunk-level matches
+    kind: Optional[str] = None
+    name: Optional[str] = None
+    start_line: Optional[int] = None
+    end_line: Optional[int] = None
+
+class CodeChunkResponse(BaseModel):
+    chunk_hash: str
+    kind: str
+    name: Optional[str]
+    parent: Optional[str]
+    start_line: int
+    end_line: int
+    token_count: int
+    text: Optional[str] = None  # Only with ?with_text=true
+
+class DependencyFile(BaseModel):
+    file_id: UUID4
+    path: str
+    depth: int  # 1 for direct imports
+
+class DependencyResponse(BaseModel):
+    path: str
+    file_id: UUID4
+    reverse: bool
+    transitive: bool
+    files: List[DependencyFile]
+
+class DependencyCycles(BaseModel):
+    cycles: List[List[str]]
+
+class JobError(BaseModel):
+    path: str
+    reason: Optional[str]
+
+class JobResponse(BaseModel):
+    id: UUID4
+    codebase_id: UUID4
+    status: str  # queued, running, completed or failed
+    files_total: Optional[int]
+    files_done: int
+    counts: Dict[str, int]
+    errors: List[JobError]
+    error: Optional[str]
+    files_per_second: Optional[float]
+    eta_seconds: Optional[float]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+class UploadedFile(BaseModel):
+    filename: str
+    status: str  # processed, unchanged, skipped or failed
+    reason: Optional[str] = None
+    # Processed files only; the parser's records are embedded as they are
+    cached: Optional[bool] = None
+    language: Optional[str] = None
+    parser: Optional[str] = None
+    functions: Optional[List[FunctionRecord]] = None
+    classes: Optional[List[ClassRecord]] = None
+    imports: Optional[List[str]] = None
+
+class UploadResponse(BaseModel):
+    message: str
+    processed: int
+    unchanged: int
+    skipped: int
+    failed: int
+    cache_hits: int
+    cache_misses: int
+    files: List[UploadedFile]
+
+class ArchiveFile(BaseModel):
+    path: str
+    status: str
+    reason: Optional[str] = None
+    cached: Optional[bool] = None
+    language: Optional[str] = None
+    functions: Optional[int] = None  # Counts, not records
+    classes: Optional[int] = None
+
+class ArchiveResponse(BaseModel):
+    message: str
+    processed: int
+    unchanged: int
+    skipped: int
+    failed: int
+    cache_hits: int
+    cache_misses: int
+    files: List[ArchiveFile]
+
+class CodebaseVersionCreate(BaseModel):
+    label: str
+    # path -> SHA-256 of every file in the new tree; stored files missing from it are removed
+    manifest: Optional[Dict[str, str]] = None
+
+class CodebaseVersionResponse(BaseModel):
+    label: str
+    generation: int
+    parent: Optional[str]
+    file_count: int
+    files_added: int
+    files_changed: int
+    files_removed: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ManifestRequest(BaseModel):
+    files: Dict[str, str]  # path -> SHA-256 of the content
+
+class ManifestDiffResponse(BaseModel):
+    upload: List[str]  # New or changed paths whose content the server needs
+    remove: List[str]  # Stored paths missing from the manifest
+    unchanged: int
+
+class FileDiff(BaseModel):
+    path: str
+    status: str  # added, changed or removed
+    language: str
+    # Qualified as Parent.name for methods and nested functions
+    functions_added: List[str]
+    functions_removed: List[str]
+    classes_added: List[str]
+    classes_removed: List[str]
+
+class VersionDiffResponse(BaseModel):
+    base: str
+    head: str  # "current" when comparing against the current tree
+    added: int
+    changed: int
+    removed: int
+    files: List[FileDiff]
+
 class CodeFileCreate(BaseModel):
     file_path: str
     content: str
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, ForeignKey, Index, LargeBinary, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID, JSONB
 from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
 import uuid
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.database import Base
 
 class Codebase(Base):
@@ -13,23 +15,199 @@ class Codebase(Base):
     name = Column(String, nullable=False)
     version = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Bumped by every ingest commit that changes files; part of response cache keys
+    # and the clock that CodeFile version ranges and snapshots refer to
+    generation = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+class CodebaseVersion(Base):
+    """A named snapshot of a codebase: its files as of one generation.
+
+    Snapshots share every CodeFile row that did not change between them
+    (see services/versions.py).
+    """
+    __tablename__ = "codebase_versions"
+
+    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), primary_key=True)
+    label = Column(String, primary_key=True)
+    generation = Column(BigInteger, nullable=False)
+    parent = Column(String, nullable=True)  # Label of the previous snapshot
+    file_count = Column(Integer, nullable=False)
+    # Relative to the parent snapshot
+    files_added = Column(Integer, nullable=False)
+    files_changed = Column(Integer, nullable=False)
+    files_removed = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_codebase_versions_codebase_generation", "codebase_id", "generation"),
+    )
 
 class CodeFile(Base):
     __tablename__ = "code_files"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), nullable=False)
+    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), nullable=False, index=True)
     file_path = Column(String, nullable=False)
-    content = Column(Text, nullable=True)
+    # Contents live in file_blobs, shared by every file with the same bytes
+    content_hash = Column(String(64), ForeignKey("file_blobs.content_hash"), nullable=True, index=True)
     language = Column(String, nullable=False)
     parsed_at = Column(DateTime, nullable=True)
     
-    # NEW: Vector embedding storage
-    embedding = Column(JSONB, nullable=True)  # Store vector embeddings
+    # Hashing embedding of the file's symbols (see services/embeddings.py)
+    embedding = Column(Vector(settings.EMBEDDING_DIM), nullable=True)
     analysis_result = Column(JSONB, nullable=True)  # Store parsed structure
     
     # NEW: File metadata for better analysis
     size_bytes = Column(Integer, nullable=True)
     line_count = Column(Integer, nullable=True)
     function_count = Column(Integer, nullable=True)
-    class_count = Column(Integer, nullable=True)
\ No newline at end of file
+    class_count = Column(Integer, nullable=True)
+
+    # The row belongs to every generation from added_in up to, not including,
+    # removed_in; removed_in stays NULL while it is part of the current tree
+    added_in = Column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    removed_in = Column(BigInteger, nullable=True)
+
+    __table_args__ = (
+        # Serves keyset pagination of a codebase's files by (file_path, id)
+        Index("ix_code_files_codebase_path_id", "codebase_id", "file_path", "id"),
+        # Version diffs only read the rows added or retired between two generations
+        Index("ix_code_files_codebase_added_in", "codebase_id", "added_in"),
+        Index("ix_code_files_codebase_removed_in", "codebase_id", "removed_in"),
+        # Approximate nearest-neighbour search for /search/semantic
+        Index(
+            "ix_code_files_embedding_hnsw", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"}
+        ),
+    )
+
+class Symbol(Base):
+    """A function or class definition, one row per symbol for indexed lookup."""
+    __tablename__ = "symbols"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), nullable=False)
+    # Rows go away with the file version they were parsed from
+    file_id = Column(UUID(as_uuid=True), ForeignKey("code_files.id", ondelete="CASCADE"), nullable=False, index=True)
+    file_path = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    kind = Column(String(16), nullable=False)  # function or class
+    language = Column(String, nullable=False)
+    line = Column(Integer, nullable=True)
+    end_line = Column(Integer, nullable=True)
+    parent = Column(String, nullable=True)  # Enclosing class, or function for nested defs
+    signature = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Exact and prefix lookups: lower(name) = q / LIKE 'q%' within a codebase
+        Index("ix_symbols_codebase_lower_name", "codebase_id", text("lower(name) text_pattern_ops")),
+        # Fuzzy lookups through pg_trgm similarity
+        Index("ix_symbols_lower_name_trgm", text("lower(name) gin_trgm_ops"), postgresql_using="gin"),
+    )
+
+class CodeChunk(Base):
+    """A module, class or function slice of a file, keyed by its own content hash.
+
+    Keys do not involve the CodeFile id, so re-ingesting an edited file
+    keeps the rows of every chunk whose text did not change.
+    """
+    __tablename__ = "code_chunks"
+
+    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), primary_key=True)
+    file_path = Column(String, primary_key=True)
+    chunk_hash = Column(String(64), primary_key=True)
+    # File version the line span refers to
+    content_hash = Column(String(64), ForeignKey("file_blobs.content_hash"), nullable=False)
+    language = Column(String, nullable=False)
+    kind = Column(String(16), nullable=False)  # module, class or function
+    name = Column(String, nullable=True)
+    parent = Column(String, nullable=True)
+    start_line = Column(Integer, nullable=False)
+    end_line = Column(Integer, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    embedding = Column(Vector(settings.EMBEDDING_DIM), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_code_chunks_embedding_hnsw", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"}
+        ),
+    )
+
+class DependencyGraphRecord(Base):
+    """Resolved import graph of a codebase in CSR form (see services/dependency_graph.py)."""
+    __tablename__ = "dependency_graphs"
+
+    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), primary_key=True)
+    node_count = Column(Integer, nullable=False)
+    edge_count = Column(Integer, nullable=False)
+    file_ids = Column(LargeBinary, nullable=False)  # 16-byte UUIDs in node order
+    paths = Column(JSONB, nullable=False)  # File paths in node order
+    indptr = Column(LargeBinary, nullable=False)  # int32[node_count + 1]
+    indices = Column(LargeBinary, nullable=False)  # int32[edge_count]
+    built_at = Column(DateTime, nullable=False)
+
+class IngestJob(Base):
+    """A background ingest of an uploaded payload, checkpointed after every batch."""
+    __tablename__ = "ingest_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    codebase_id = Column(UUID(as_uuid=True), ForeignKey("codebases.id"), nullable=False, index=True)
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, completed, failed
+    source = Column(String(16), nullable=False)  # files or archive
+    files_total = Column(Integer, nullable=True)  # Unknown for streamed tar archives
+    # Archive entries already committed; a resumed job skips this many
+    files_done = Column(Integer, nullable=False, default=0)
+    counts = Column(JSONB, nullable=False, default=dict)
+    errors = Column(JSONB, nullable=False, default=list)
+    error = Column(String, nullable=True)
+    worker_id = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)  # Start of the current run
+    run_offset = Column(Integer, nullable=False, default=0)  # files_done when the current run started
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_ingest_jobs_status_created", "status", "created_at"),
+    )
+
+class IngestJobChunk(Base):
+    """A piece of a job's uploaded payload, kept in the database so any host can run the job."""
+    __tablename__ = "ingest_job_chunks"
+
+    job_id = Column(UUID(as_uuid=True), ForeignKey("ingest_jobs.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+
+class FileBlob(Base):
+    """Compressed file contents keyed by the SHA-256 of the raw bytes."""
+    __tablename__ = "file_blobs"
+
+    content_hash = Column(String(64), primary_key=True)
+    codec = Column(String(8), nullable=False)  # zstd, zlib or raw
+    size_bytes = Column(Integer, nullable=False)  # Uncompressed size
+    data = Column(LargeBinary, nullable=False)
+    # Sorted distinct byte trigrams for code search; NULL for blobs stored before it existed
+    trigrams = Column(ARRAY(Integer), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Array GIN index: `trigrams @> ARRAY[...]` finds candidate files for a search
+        Index("ix_file_blobs_trigrams", "trigrams", postgresql_using="gin"),
+        # Blobs stored before trigrams existed, which every search has to check
+        Index("ix_file_blobs_without_trigrams", "content_hash", postgresql_where=text("trigrams IS NULL")),
+    )
+
+class ParseCacheEntry(Base):
+    """Parse results keyed by file content, shared across codebases."""
+    __tablename__ = "parse_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    parser_version = Column(String, primary_key=True)
+    analysis_result = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
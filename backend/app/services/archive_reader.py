@@ -0,0 +1,130 @@
+import gzip
+import logging
+import lzma
+import tarfile
+import zipfile
+import zlib
+from pathlib import PurePosixPath
+from typing import BinaryIO, Callable, Iterator, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bytes inspected when sniffing for binary content
+BINARY_SNIFF_BYTES = 8192
+
+# Raised while reading a truncated or corrupt archive
+_CORRUPT_ERRORS = (
+    tarfile.TarError, zipfile.BadZipFile, gzip.BadGzipFile, zlib.error, lzma.LZMAError, EOFError
+)
+
+
+class ArchiveEntry(NamedTuple):
+    """A single regular file from an archive, either read or skipped."""
+    path: str
+    data: Optional[bytes]
+    skip_reason: Optional[str] = None
+
+
+class ArchiveError(ValueError):
+    """Raised when an upload is not a readable zip or tar archive."""
+
+
+def _normalize_path(name: str) -> Optional[str]:
+    """Turn an archive member name into a clean relative POSIX path."""
+    parts = [p for p in PurePosixPath(name.replace('\\', '/')).parts if p not in ('', '.', '/')]
+    if not parts or '..' in parts:
+        return None
+    return '/'.join(parts)
+
+
+def _looks_binary(data: bytes) -> bool:
+    """Cheap binary check: text files do not contain NUL bytes."""
+    return b'\x00' in data[:BINARY_SNIFF_BYTES]
+
+
+def iter_archive(
+    fileobj: BinaryIO,
+    is_supported: Callable[[str], bool],
+    max_file_bytes: int
+) -> Iterator[ArchiveEntry]:
+    """Yield archive entries one at a time so only one file is in memory.
+
+    Unsupported extensions and oversized members are skipped from the
+    archive index alone, before any of their bytes are read.
+    """
+    fileobj.seek(0)
+    try:
+        if zipfile.is_zipfile(fileobj):
+            fileobj.seek(0)
+            yield from _iter_zip(fileobj, is_supported, max_file_bytes)
+            return
+
+        fileobj.seek(0)
+        try:
+            # Stream mode reads members sequentially and never seeks backwards
+            archive = tarfile.open(fileobj=fileobj, mode='r|*')
+        except tarfile.TarError as e:
+            raise ArchiveError(f"Unsupported archive format: {e}")
+
+        with archive:
+            yield from _iter_tar(archive, is_supported, max_file_bytes)
+    except _CORRUPT_ERRORS as e:
+        raise ArchiveError(f"Corrupt archive: {e or type(e).__name__}")
+
+
+def _check_member(path: Optional[str], size: int, is_supported: Callable[[str], bool],
+                  max_file_bytes: int) -> Optional[str]:
+    """Return a skip reason for a member, or None if it should be read."""
+    if not is_supported(path):
+        return "unsupported file type"
+    if size > max_file_bytes:
+        return f"file too large ({size} bytes)"
+    return None
+
+
+def _iter_zip(fileobj: BinaryIO, is_supported, max_file_bytes) -> Iterator[ArchiveEntry]:
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            path = _normalize_path(info.filename)
+            if path is None:
+                logger.warning(f"Skipping unsafe archive path: {info.filename}")
+                continue
+
+            reason = _check_member(path, info.file_size, is_supported, max_file_bytes)
+            if reason:
+                yield ArchiveEntry(path, None, reason)
+                continue
+
+            with archive.open(info) as member:
+                # Never trust the declared size of a compressed member
+                data = member.read(max_file_bytes + 1)
+            if len(data) > max_file_bytes:
+                yield ArchiveEntry(path, None, f"file too large (> {max_file_bytes} bytes)")
+            elif _looks_binary(data):
+                yield ArchiveEntry(path, None, "binary file")
+            else:
+                yield ArchiveEntry(path, data)
+
+
+def _iter_tar(archive: tarfile.TarFile, is_supported, max_file_bytes) -> Iterator[ArchiveEntry]:
+    for member in archive:
+        if not member.isfile():
+            continue
+        path = _normalize_path(member.name)
+        if path is None:
+            logger.warning(f"Skipping unsafe archive path: {member.name}")
+            continue
+
+        reason = _check_member(path, member.size, is_supported, max_file_bytes)
+        if reason:
+            yield ArchiveEntry(path, None, reason)
+            continue
+
+        extracted = archive.extractfile(member)
+        data = extracted.read() if extracted else b''
+        if _looks_binary(data):
+            yield ArchiveEntry(path, None, "binary file")
+        else:
+            yield ArchiveEntry(path, data)
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.code_analysis import FileBlob
+from app.services.trigrams import content_trigrams
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional at runtime
+    zstandard = None
+
+# Rows per INSERT when writing blobs
+_INSERT_BATCH = 100
+
+
+def compress(data: bytes) -> Tuple[str, bytes]:
+    """Compress file bytes, returning (codec, payload)."""
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=settings.BLOB_COMPRESSION_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, min(settings.BLOB_COMPRESSION_LEVEL, 9))
+
+
+def decompress(codec: str, payload: bytes) -> bytes:
+    """Inverse of compress() for any codec a blob may have been written with."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(payload)
+    if codec == "zlib":
+        return zlib.decompress(payload)
+    if codec == "raw":
+        return payload
+    raise ValueError(f"Unknown blob codec '{codec}'")
+
+
+def blob_row(digest: str, data: bytes) -> Dict[str, object]:
+    """Compress content into the column values of a FileBlob row, with its search trigrams."""
+    codec, payload = compress(data)
+    return {
+        "content_hash": digest,
+        "codec": codec,
+        "size_bytes": len(data),
+        "data": payload,
+        "trigrams": content_trigrams(data)
+    }
+
+
+async def _missing_hashes(db: AsyncSession, digests: List[str]) -> List[str]:
+    existing = set(await db.scalars(
+        select(FileBlob.content_hash).where(FileBlob.content_hash.in_(digests))
+    ))
+    return [digest for digest in digests if digest not in existing]
+
+
+async def _insert_rows(db: AsyncSession, rows: List[Dict[str, object]]):
+    for start in range(0, len(rows), _INSERT_BATCH):
+        # Concurrent uploads of the same file may race; either copy is fine
+        await db.execute(pg_insert(FileBlob).values(rows[start:start + _INSERT_BATCH]).on_conflict_do_nothing())
+
+
+async def store_blobs(db: AsyncSession, blobs: Dict[str, bytes]) -> int:
+    """Write file contents keyed by content hash, skipping ones already stored.
+
+    Returns the number of new blobs written. Runs in the caller's
+    transaction so CodeFile rows referencing the blobs can follow.
+    """
+    if not blobs:
+        return 0
+    # Only contents that are not stored yet are compressed, in a thread
+    # since compression and trigram extraction are CPU-bound
+    missing = await _missing_hashes(db, list(blobs))
+    rows = await asyncio.to_thread(lambda: [blob_row(digest, blobs[digest]) for digest in missing])
+    await _insert_rows(db, rows)
+    return len(missing)
+
+
+async def store_blob_rows(db: AsyncSession, rows: List[Dict[str, object]]) -> int:
+    """Like store_blobs() for rows already built by blob_row(), e.g. in worker processes."""
+    if not rows:
+        return 0
+    by_hash = {row["content_hash"]: row for row in rows}
+    missing = await _missing_hashes(db, list(by_hash))
+    await _insert_rows(db, [by_hash[digest] for digest in missing])
+    return len(missing)
+
+
+async def load_blobs(db: AsyncSession, digests: Iterable[str]) -> Dict[str, bytes]:
+    """Fetch and decompress the contents for several hashes."""
+    rows = await db.execute(
+        select(FileBlob.content_hash, FileBlob.codec, FileBlob.data).where(
+            FileBlob.content_hash.in_(set(digests))
+        )
+    )
+    return {digest: decompress(codec, payload) for digest, codec, payload in rows}
+
+
+async def load_content(db: AsyncSession, digest: str) -> Optional[str]:
+    """Fetch one file's text by content hash, or None if it is not stored."""
+    data = (await load_blobs(db, [digest])).get(digest)
+    return data.decode('utf-8') if data is not None else None
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import STAGE_SECONDS
+from app.schemas.code_analysis import CodeFile, Symbol
+from app.services.chunk_store import write_chunks
+from app.services.embeddings import embed_rows
+from app.services.response_cache import bump_generation
+from app.services.symbols import symbol_rows
+from app.services.versions import retire_files
+
+logger = logging.getLogger(__name__)
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one flushed batch; ``items`` are the payloads passed to add()."""
+    items: List[Any]
+    error: Optional[str] = None
+
+
+class CodeFileBulkWriter:
+    """Buffer CodeFile rows and write them, with their symbols and chunks, one batch at a time.
+
+    Each batch runs inside its own SAVEPOINT, so a failing batch is rolled
+    back and reported on its own while earlier and later batches still
+    commit with the surrounding transaction. Rows are added in the
+    transaction's generation of the codebase, and the rows they replace
+    are retired in it (see services/versions.py).
+    """
+
+    def __init__(self, db: AsyncSession, codebase_id: str, batch_size: Optional[int] = None):
+        self.db = db
+        self.codebase_id = codebase_id
+        self.batch_size = batch_size or settings.BULK_INSERT_BATCH_SIZE
+        self._rows: List[Dict[str, Any]] = []
+        self._replaces: List[Any] = []
+        self._items: List[Any] = []
+        self._chunks: List[Tuple[Dict[str, Any], List[Any]]] = []
+
+    async def add(self, row: Dict[str, Any], replaces: Any = None, item: Any = None,
+                  chunks: Optional[List[Any]] = None) -> Optional[BatchResult]:
+        """Queue a row, optionally replacing an existing CodeFile id.
+
+        ``chunks`` from chunker.chunk_file() are synced to the chunk store
+        in the same batch.
+
+        Returns the BatchResult when this call filled and flushed a batch.
+        """
+        self._rows.append(row)
+        self._items.append(item)
+        if replaces is not None:
+            self._replaces.append(replaces)
+        if chunks is not None:
+            self._chunks.append((row, chunks))
+        if len(self._rows) >= self.batch_size:
+            return await self.flush()
+        return None
+
+    async def flush(self) -> Optional[BatchResult]:
+        """Write buffered rows in one executemany; returns None if nothing was queued."""
+        if not self._rows:
+            return None
+
+        rows, replaces, items, chunks = self._rows, self._replaces, self._items, self._chunks
+        self._rows, self._replaces, self._items, self._chunks = [], [], [], []
+        # Embeddings are computed per batch so the vectorizer works on whole
+        # matrices, in a thread so the event loop keeps serving requests
+        with STAGE_SECONDS.labels("embed").time():
+            await asyncio.to_thread(embed_rows, rows)
+
+        # Outside the savepoint, so a failed batch does not roll the generation back
+        generation = await bump_generation(self.db, self.codebase_id)
+        for row in rows:
+            row["added_in"] = generation
+
+        try:
+            with STAGE_SECONDS.labels("db_flush").time():
+                async with self.db.begin_nested():
+                    if replaces:
+                        await retire_files(self.db, self.codebase_id, replaces, generation)
+                    # A list of parameter sets is an executemany, which asyncpg
+                    # pipelines: one round trip for the batch, not one per row
+                    await self.db.execute(insert(CodeFile), rows)
+                    symbols = [symbol for row in rows for symbol in symbol_rows(row)]
+                    if symbols:
+                        await self.db.execute(insert(Symbol), symbols)
+                    await write_chunks(self.db, chunks)
+        except Exception as e:
+            logger.error(f"Bulk insert of {len(rows)} files failed: {e}")
+            return BatchResult(items, str(e))
+
+        return BatchResult(items)
@@ -0,0 +1,80 @@
+import asyncio
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import delete, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.code_analysis import CodeChunk
+from app.services.chunker import Chunk
+from app.services.embeddings import embed_texts
+
+
+async def write_chunks(db: AsyncSession, files: List[Tuple[Dict[str, Any], List[Chunk]]]) -> Dict[str, int]:
+    """Bring the stored chunks of some files in line with their new versions.
+
+    ``files`` pairs a CodeFile row with the chunks of its content. Chunks
+    whose hash is already stored for the same path only get their line
+    span updated; new chunks are embedded and inserted and chunks that
+    disappeared are deleted. Returns how many were inserted, kept and
+    deleted.
+    """
+    counts = {"inserted": 0, "kept": 0, "deleted": 0}
+    if not files:
+        return counts
+
+    # Rows may carry the codebase id as a string; stored keys come back as UUIDs
+    files = [(dict(row, codebase_id=uuid.UUID(str(row["codebase_id"]))), chunks) for row, chunks in files]
+    keys = [(row["codebase_id"], row["file_path"]) for row, _ in files]
+    rows = await db.execute(
+        select(CodeChunk.codebase_id, CodeChunk.file_path, CodeChunk.chunk_hash).where(
+            tuple_(CodeChunk.codebase_id, CodeChunk.file_path).in_(keys)
+        )
+    )
+    existing = {tuple(key) for key in rows}
+
+    wanted = set()
+    fresh: List[Dict[str, Any]] = []
+    texts: List[str] = []
+    kept: List[Dict[str, Any]] = []
+    for row, chunks in files:
+        for chunk in chunks:
+            key = (row["codebase_id"], row["file_path"], chunk.chunk_hash)
+            wanted.add(key)
+            values = dict(
+                codebase_id=row["codebase_id"],
+                file_path=row["file_path"],
+                chunk_hash=chunk.chunk_hash,
+                content_hash=row["content_hash"],
+                start_line=chunk.start_line,
+                end_line=chunk.end_line
+            )
+            if key in existing:
+                kept.append(values)
+                continue
+            values.update(
+                language=row["language"],
+                kind=chunk.kind,
+                name=chunk.name,
+                parent=chunk.parent,
+                token_count=chunk.token_count
+            )
+            fresh.append(values)
+            texts.append(chunk.text)
+
+    stale = [key for key in existing if key not in wanted]
+    if stale:
+        await db.execute(delete(CodeChunk).where(
+            tuple_(CodeChunk.codebase_id, CodeChunk.file_path, CodeChunk.chunk_hash).in_(stale)
+        ))
+    if kept:
+        # Unchanged text; only the position in the new file version moves
+        await db.execute(update(CodeChunk), kept)
+    if fresh:
+        # Tokenizing and hashing is CPU work; it runs off the event loop
+        for values, vector in zip(fresh, await asyncio.to_thread(embed_texts, texts)):
+            values["embedding"] = vector if vector.any() else None
+        await db.execute(insert(CodeChunk), fresh)
+
+    counts.update(inserted=len(fresh), kept=len(kept), deleted=len(stale))
+    return counts
@@ -0,0 +1,69 @@
+"""Split a parsed file into module, class and function chunks."""
+import hashlib
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from app.services.parse_result import ParseResult
+
+# Rough token count: words and individual punctuation marks
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+
+
+class Chunk(NamedTuple):
+    kind: str  # module, class or function
+    name: Optional[str]
+    parent: Optional[str]
+    start_line: int
+    end_line: int
+    token_count: int
+    chunk_hash: str
+    text: str
+
+
+def _boundaries(parsed: ParseResult) -> List[tuple]:
+    """(line, kind, name, parent) for every definition that starts a chunk."""
+    starts = {}
+    for record in parsed.classes:
+        if record.line:
+            starts.setdefault(record.line, ("class", record.name, record.parent))
+    for record in parsed.functions:
+        # Nested functions belong to the chunk of their enclosing function
+        if record.line and not record.parent_function:
+            starts.setdefault(record.line, ("function", record.name, record.parent))
+    return sorted((line,) + info for line, info in starts.items())
+
+
+def chunk_file(content: str, parsed: ParseResult) -> List[Chunk]:
+    """Chunk a file along the definitions found by the parser."""
+    lines = content.split('\n')
+    boundaries = []
+    for line, kind, name, parent in _boundaries(parsed):
+        start = line
+        # Decorators above a definition belong to its chunk
+        while start > 1 and lines[start - 2].lstrip().startswith('@'):
+            start -= 1
+        boundaries.append((start, kind, name, parent))
+
+    if not boundaries or boundaries[0][0] > 1:
+        boundaries.insert(0, (1, "module", None, None))
+
+    chunks = []
+    seen: Dict[str, int] = {}
+    for index, (start, kind, name, parent) in enumerate(boundaries):
+        end = boundaries[index + 1][0] - 1 if index + 1 < len(boundaries) else len(lines)
+        # Trailing blank lines are separators, not part of the chunk
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        text = '\n'.join(lines[start - 1:end])
+        if kind == "module" and not text.strip():
+            continue
+
+        chunk_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        # Identical chunks in one file (e.g. repeated stubs) still get distinct keys
+        occurrence = seen.get(chunk_hash, 0)
+        seen[chunk_hash] = occurrence + 1
+        if occurrence:
+            chunk_hash = hashlib.sha256(f"{chunk_hash}#{occurrence}".encode('ascii')).hexdigest()
+
+        chunks.append(Chunk(kind, name, parent, start, end, len(_TOKEN.findall(text)), chunk_hash, text))
+    return chunks
@@ -0,0 +1,114 @@
+"""Literal and regex search over stored file contents."""
+import asyncio
+import re
+from bisect import bisect_right
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.code_analysis import CodeFile, FileBlob
+from app.services.blob_store import decompress
+from app.services.trigrams import required_trigrams
+from app.services.versions import live
+
+# Longest line excerpt returned per match
+SNIPPET_CHARS = 240
+
+
+class SearchPatternError(ValueError):
+    """Raised when a search regex does not compile."""
+
+
+def compile_query(q: str, regex: bool = False, case_sensitive: bool = True) -> re.Pattern:
+    """Compile a search string (escaped unless ``regex``) into a multiline pattern."""
+    flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+    try:
+        return re.compile(q if regex else re.escape(q), flags)
+    except re.error as e:
+        raise SearchPatternError(f"Invalid regex: {e}")
+
+
+def _file_matches(pattern: re.Pattern, file_id: Any, path: str, text: str, limit: int) -> List[Dict[str, Any]]:
+    """First match on each matching line of one file, at most ``limit`` of them."""
+    matches = []
+    line_starts = None
+    last_line = -1
+    for match in pattern.finditer(text):
+        if line_starts is None:
+            # Only built for files that match at all
+            line_starts = [0] + [newline.end() for newline in re.finditer('\n', text)]
+        line = bisect_right(line_starts, match.start()) - 1
+        if line == last_line:
+            continue
+        last_line = line
+        start = line_starts[line]
+        end = text.find('\n', start)
+        matches.append({
+            "type": "match",
+            "file_id": str(file_id),
+            "path": path,
+            "line": line + 1,
+            "column": match.start() - start + 1,
+            "snippet": text[start:end if end != -1 else len(text)][:SNIPPET_CHARS]
+        })
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def _verify(pattern: re.Pattern, rows: Sequence, limit: int) -> List[Dict[str, Any]]:
+    """Decompress candidate files and collect real matches; runs in a thread."""
+    found = []
+    for file_id, path, codec, data in rows:
+        text = decompress(codec, data).decode('utf-8', errors='replace')
+        found.extend(_file_matches(pattern, file_id, path, text, limit - len(found)))
+        if len(found) >= limit:
+            break
+    return found
+
+
+async def search_contents(db: AsyncSession, codebase_id: str, q: str, pattern: re.Pattern,
+                          regex: bool, limit: int) -> AsyncIterator[bytes]:
+    """Yield NDJSON match records as candidates are verified, then a summary record.
+
+    ``pattern`` is compile_query(q, ...); inline flags such as (?i) or (?x) count too.
+    """
+    required = required_trigrams(q, regex, ignore_case=bool(pattern.flags & re.IGNORECASE),
+                                 verbose=bool(pattern.flags & re.VERBOSE))
+
+    statement = select(CodeFile.id, CodeFile.file_path, FileBlob.codec, FileBlob.data).join(
+        FileBlob, FileBlob.content_hash == CodeFile.content_hash
+    ).where(CodeFile.codebase_id == codebase_id, live())
+    if required:
+        statements = [
+            statement.where(FileBlob.trigrams.contains(required)),
+            statement.where(FileBlob.trigrams.is_(None))
+        ]
+    else:
+        statements = [statement]
+
+    summary = {"type": "summary", "indexed": bool(required), "candidates": 0, "files_matched": 0,
+               "matches": 0, "truncated": False}
+    for statement in statements:
+        result = await db.stream(statement.order_by(CodeFile.file_path).execution_options(
+            yield_per=settings.CODE_SEARCH_BATCH_SIZE
+        ))
+        async for partition in result.partitions():
+            summary["candidates"] += len(partition)
+            # Decompression and regex work stay off the event loop
+            found = await asyncio.to_thread(_verify, pattern, partition, limit - summary["matches"])
+            if found:
+                summary["matches"] += len(found)
+                summary["files_matched"] += len({record["file_id"] for record in found})
+                yield b'\n'.join(orjson.dumps(record) for record in found) + b'\n'
+            if summary["matches"] >= limit:
+                summary["truncated"] = True
+                break
+        await result.close()
+        if summary["truncated"]:
+            break
+
+    yield orjson.dumps(summary) + b'\n'
@@ -0,0 +1,414 @@
+"""Import dependency graph of a codebase, stored in CSR form."""
+import asyncio
+import logging
+import re
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import orjson
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.metrics import STAGE_SECONDS
+from app.schemas.code_analysis import CodeFile, DependencyGraphRecord
+from app.services.versions import live
+
+logger = logging.getLogger(__name__)
+
+PYTHON_SUFFIXES = ('.py',)
+JS_SUFFIXES = ('.js', '.jsx', '.mjs', '.cjs', '.ts', '.tsx')
+# Tried in order when a JS specifier omits the extension
+_JS_RESOLVE_SUFFIXES = ('',) + JS_SUFFIXES + tuple('/index' + suffix for suffix in JS_SUFFIXES)
+
+_PY_FROM = re.compile(r'from\s+(\.*)([\w.]*)\s+import\s+(.+)', re.S)
+_PY_IMPORT = re.compile(r'import\s+(.+)', re.S)
+_JS_SPECIFIER = re.compile(r'''(?:from|import|require\s*\()\s*['"]([^'"]+)['"]''')
+
+# Paths per IN (...) list
+_PATH_BATCH = 1000
+
+# Graphs kept in memory, most recently used last
+_CACHE_SIZE = 16
+_cache: "OrderedDict[str, DependencyGraph]" = OrderedDict()
+
+
+class DependencyGraph:
+    """File-level import graph with forward and reverse CSR adjacency.
+
+    ``indices[indptr[i]:indptr[i + 1]]`` are the files node ``i`` imports.
+    """
+
+    def __init__(self, file_ids: List[uuid.UUID], paths: List[str], indptr: np.ndarray,
+                 indices: np.ndarray, built_at: Optional[datetime] = None):
+        self.file_ids = file_ids
+        self.paths = paths
+        self.indptr = indptr
+        self.indices = indices
+        self.built_at = built_at
+        self._node_by_path = {path: node for node, path in enumerate(paths)}
+        self._reverse: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._index: Optional["_ModuleIndex"] = None
+        # (built_at, components) of the last cycles() call
+        self._cycles: Optional[Tuple[Optional[datetime], List[List[int]]]] = None
+
+    @classmethod
+    def from_edges(cls, file_ids: List[uuid.UUID], paths: List[str],
+                   edges: Iterable[Tuple[int, int]]) -> "DependencyGraph":
+        pairs = np.array(sorted(set(edges)), dtype=np.int32).reshape(-1, 2)
+        indptr, indices = _csr(len(paths), pairs[:, 0], pairs[:, 1])
+        return cls(file_ids, paths, indptr, indices)
+
+    @property
+    def edge_count(self) -> int:
+        return int(self.indices.size)
+
+    def node(self, path: str) -> Optional[int]:
+        return self._node_by_path.get(path)
+
+    def module_index(self) -> "_ModuleIndex":
+        """Import resolution index over this graph's paths, built on first use."""
+        if self._index is None:
+            self._index = _ModuleIndex(self.paths)
+        return self._index
+
+    def with_files_replaced(self, files: Dict[int, Tuple[uuid.UUID, Sequence[str]]]) -> "DependencyGraph":
+        """A copy in which the given nodes have new file ids and import statements.
+
+        The set of paths is unchanged, so no other file resolves differently
+        and only the out-edges of these nodes are re-resolved.
+        """
+        index = self.module_index()
+        nodes = np.fromiter(files, dtype=np.int32, count=len(files))
+        sources = np.repeat(np.arange(len(self.paths), dtype=np.int32), np.diff(self.indptr))
+        keep = ~np.isin(sources, nodes)
+        edges = np.array(sorted({
+            (node, target)
+            for node, (_, statements) in files.items()
+            for target in _file_targets(self.paths[node], statements, index) if target != node
+        }), dtype=np.int32).reshape(-1, 2)
+        indptr, indices = _csr(
+            len(self.paths), np.concatenate([sources[keep], edges[:, 0]]),
+            np.concatenate([self.indices[keep], edges[:, 1]])
+        )
+        file_ids = list(self.file_ids)
+        for node, (file_id, _) in files.items():
+            file_ids[node] = file_id
+        graph = DependencyGraph(file_ids, self.paths, indptr, indices)
+        graph._index = index
+        return graph
+
+    def reverse(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Transposed adjacency (who imports each node), built on first use."""
+        if self._reverse is None:
+            sources = np.repeat(np.arange(len(self.paths), dtype=np.int32), np.diff(self.indptr))
+            self._reverse = _csr(len(self.paths), self.indices, sources)
+        return self._reverse
+
+    def neighbours(self, node: int, transitive: bool = False, reverse: bool = False) -> List[Tuple[int, int]]:
+        """(node, depth) pairs reachable from ``node``, breadth first."""
+        indptr, indices = self.reverse() if reverse else (self.indptr, self.indices)
+        seen = np.zeros(len(self.paths), dtype=bool)
+        seen[node] = True
+        found = []
+        frontier = [node]
+        depth = 0
+        while frontier:
+            depth += 1
+            following = []
+            for current in frontier:
+                for target in indices[indptr[current]:indptr[current + 1]].tolist():
+                    if not seen[target]:
+                        seen[target] = True
+                        found.append((target, depth))
+                        following.append(target)
+            if not transitive:
+                break
+            frontier = following
+        return found
+
+    def cycles(self) -> List[List[int]]:
+        """Strongly connected components that form import cycles, computed once per build."""
+        if self._cycles is None or self._cycles[0] != self.built_at:
+            self._cycles = (self.built_at, self._find_cycles())
+        return self._cycles[1]
+
+    def _find_cycles(self) -> List[List[int]]:
+        # Iterative Tarjan
+        indptr, indices = self.indptr, self.indices
+        count = len(self.paths)
+        index = np.full(count, -1, dtype=np.int64)
+        low = np.zeros(count, dtype=np.int64)
+        on_stack = np.zeros(count, dtype=bool)
+        stack: List[int] = []
+        components = []
+        counter = 0
+
+        for root in range(count):
+            if index[root] != -1:
+                continue
+            # (node, position of the next edge to visit)
+            work = [(root, int(indptr[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node, edge = work[-1]
+                if edge < indptr[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = int(indices[edge])
+                    if index[target] == -1:
+                        index[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, int(indptr[target])))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], index[target])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    self_loop = node in indices[indptr[node]:indptr[node + 1]]
+                    if len(component) > 1 or self_loop:
+                        components.append(sorted(component, key=lambda n: self.paths[n]))
+        return components
+
+
+def _csr(count: int, sources: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.lexsort((targets, sources))
+    indptr = np.zeros(count + 1, dtype=np.int32)
+    np.cumsum(np.bincount(sources, minlength=count), out=indptr[1:])
+    return indptr, np.ascontiguousarray(targets[order], dtype=np.int32)
+
+
+# Import resolution --------------------------------------------------------------
+
+class _ModuleIndex:
+    """Maps dotted Python module names and JS paths to graph nodes."""
+
+    def __init__(self, paths: Sequence[str]):
+        self.by_path = {path: node for node, path in enumerate(paths)}
+        self.modules: Dict[str, int] = {}
+        # Module names relative to any directory, used when they are unambiguous
+        suffixes: Dict[str, Set[int]] = {}
+        for node, path in enumerate(paths):
+            if not path.endswith(PYTHON_SUFFIXES):
+                continue
+            parts = path[:-3].split('/')
+            if parts[-1] == '__init__':
+                parts = parts[:-1]
+            if not parts:
+                continue
+            self.modules['.'.join(parts)] = node
+            for start in range(1, len(parts)):
+                suffixes.setdefault('.'.join(parts[start:]), set()).add(node)
+        self.suffixes = {name: nodes.pop() for name, nodes in suffixes.items() if len(nodes) == 1}
+
+    def module(self, name: str, relative: bool = False) -> Optional[int]:
+        node = self.modules.get(name)
+        if node is None and not relative:
+            node = self.suffixes.get(name)
+        return node
+
+
+def _python_targets(path: str, statement: str, index: _ModuleIndex) -> Iterable[int]:
+    statement = ' '.join(statement.split())
+    match = _PY_FROM.match(statement)
+    if match:
+        dots, module, names = match.groups()
+        relative = bool(dots)
+        if relative:
+            package = path.split('/')[:-1]
+            if len(dots) > 1:
+                package = package[:len(package) - (len(dots) - 1)]
+            module = '.'.join(package + ([module] if module else []))
+        names = [name.split(' as ')[0].strip(' ()') for name in names.split(',')]
+        for name in names:
+            # `from pkg import mod` imports a submodule when one exists
+            node = index.module(f"{module}.{name}" if module else name, relative) if name != '*' else None
+            if node is None:
+                node = index.module(module, relative)
+            if node is not None:
+                yield node
+        return
+
+    match = _PY_IMPORT.match(statement)
+    if match:
+        for name in match.group(1).split(','):
+            node = index.module(name.split(' as ')[0].strip())
+            if node is not None:
+                yield node
+
+
+def _js_targets(path: str, statement: str, index: _ModuleIndex) -> Iterable[int]:
+    for specifier in _JS_SPECIFIER.findall(statement):
+        # Bare specifiers name packages outside the codebase
+        if not specifier.startswith('.'):
+            continue
+        parts: List[str] = []
+        for part in (PurePosixPath(path).parent / specifier).parts:
+            if part == '..':
+                if not parts:
+                    break
+                parts.pop()
+            elif part != '.':
+                parts.append(part)
+        base = '/'.join(parts)
+        for suffix in _JS_RESOLVE_SUFFIXES:
+            node = index.by_path.get(base + suffix)
+            if node is not None:
+                yield node
+                break
+
+
+def _file_targets(path: str, statements: Sequence[str], index: _ModuleIndex) -> Iterable[int]:
+    if path.endswith(PYTHON_SUFFIXES):
+        targets = _python_targets
+    elif path.endswith(JS_SUFFIXES):
+        targets = _js_targets
+    else:
+        return
+    for statement in statements:
+        yield from targets(path, statement, index)
+
+
+def resolve_edges(paths: Sequence[str], imports: Sequence[Sequence[str]]) -> List[Tuple[int, int]]:
+    """Resolve each file's import statements to (importer, imported) node pairs."""
+    index = _ModuleIndex(paths)
+    edges = []
+    for node, (path, statements) in enumerate(zip(paths, imports)):
+        for target in _file_targets(path, statements, index):
+            if target != node:
+                edges.append((node, target))
+    return edges
+
+
+def _graph_from_rows(rows: Sequence[Tuple[uuid.UUID, str, Optional[str]]]) -> DependencyGraph:
+    """Full build from (id, path, imports as JSON text) rows sorted by path."""
+    file_ids = [file_id for file_id, _, _ in rows]
+    paths = [path for _, path, _ in rows]
+    imports = [orjson.loads(raw) if raw else [] for _, _, raw in rows]
+    return DependencyGraph.from_edges(file_ids, paths, resolve_edges(paths, imports))
+
+
+# Persistence --------------------------------------------------------------------
+
+async def build_graph(db: AsyncSession, codebase_id: str,
+                      changed: Optional[Iterable[str]] = None) -> DependencyGraph:
+    """Resolve the imports of a codebase and persist the graph.
+
+    With ``changed`` paths whose files were rewritten in place, only those
+    files are re-resolved against the stored graph; a full build runs when
+    files were added or removed, or when there is no graph yet. Resolution
+    and CSR packing run in a thread.
+    """
+    with STAGE_SECONDS.labels("graph").time():
+        # Serializes builders of one codebase, so none works from a stale graph
+        built_at = await db.scalar(
+            select(DependencyGraphRecord.built_at).where(DependencyGraphRecord.codebase_id == codebase_id)
+            .with_for_update()
+        )
+        graph = None
+        if changed is not None and built_at is not None:
+            graph = await _update_graph(db, codebase_id, sorted(set(changed)))
+        if graph is None:
+            rows = (await db.execute(
+                select(CodeFile.id, CodeFile.file_path, CodeFile.analysis_result['imports'].astext).where(
+                    CodeFile.codebase_id == codebase_id, live()
+                ).order_by(CodeFile.file_path)
+            )).all()
+            graph = await asyncio.to_thread(_graph_from_rows, rows)
+        return await _store_graph(db, codebase_id, graph)
+
+
+async def _update_graph(db: AsyncSession, codebase_id: str, changed: List[str]) -> Optional[DependencyGraph]:
+    """The stored graph with ``changed`` re-resolved, or None if the set of paths changed."""
+    previous = await get_graph(db, codebase_id)
+    if previous is None or any(previous.node(path) is None for path in changed):
+        return None
+    files = {}
+    for start in range(0, len(changed), _PATH_BATCH):
+        rows = await db.execute(
+            select(CodeFile.id, CodeFile.file_path, CodeFile.analysis_result['imports']).where(
+                CodeFile.codebase_id == codebase_id, live(),
+                CodeFile.file_path.in_(changed[start:start + _PATH_BATCH])
+            )
+        )
+        files.update((previous.node(path), (file_id, imports or [])) for file_id, path, imports in rows)
+    if len(files) != len(changed):
+        # A changed path is no longer in the tree
+        return None
+    return await asyncio.to_thread(previous.with_files_replaced, files)
+
+
+async def _store_graph(db: AsyncSession, codebase_id: str, graph: DependencyGraph) -> DependencyGraph:
+    graph.built_at = datetime.utcnow()
+    values = dict(
+        codebase_id=codebase_id,
+        node_count=len(graph.paths),
+        edge_count=graph.edge_count,
+        file_ids=b''.join(file_id.bytes for file_id in graph.file_ids),
+        paths=graph.paths,
+        indptr=graph.indptr.tobytes(),
+        indices=graph.indices.tobytes(),
+        built_at=graph.built_at
+    )
+    statement = pg_insert(DependencyGraphRecord).values(values)
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[DependencyGraphRecord.codebase_id],
+        set_={key: statement.excluded[key] for key in values if key != 'codebase_id'}
+    ))
+    _remember(codebase_id, graph)
+    logger.info(f"Built dependency graph for {codebase_id}: {len(graph.paths)} files, {graph.edge_count} edges")
+    return graph
+
+
+async def get_graph(db: AsyncSession, codebase_id: str) -> Optional[DependencyGraph]:
+    """Return the codebase's graph, from memory when it is still current."""
+    built_at = await db.scalar(
+        select(DependencyGraphRecord.built_at).where(DependencyGraphRecord.codebase_id == codebase_id)
+    )
+    if built_at is None:
+        return None
+
+    key = str(codebase_id)
+    cached = _cache.get(key)
+    if cached is not None and cached.built_at == built_at:
+        _cache.move_to_end(key)
+        return cached
+
+    record = await db.get(DependencyGraphRecord, codebase_id)
+    raw_ids = record.file_ids
+    graph = DependencyGraph(
+        [uuid.UUID(bytes=raw_ids[i:i + 16]) for i in range(0, len(raw_ids), 16)],
+        list(record.paths),
+        np.frombuffer(record.indptr, dtype=np.int32),
+        np.frombuffer(record.indices, dtype=np.int32),
+        record.built_at
+    )
+    _remember(codebase_id, graph)
+    return graph
+
+
+def _remember(codebase_id: str, graph: DependencyGraph):
+    key = str(codebase_id)
+    _cache[key] = graph
+    _cache.move_to_end(key)
+    while len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
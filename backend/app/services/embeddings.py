@@ -0,0 +1,142 @@
+"""Local hashing embeddings for files and queries."""
+import hashlib
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.code_analysis import CodeChunk, CodeFile
+from app.services.versions import live
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_SUBTOKEN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+# token -> (bucket, sign); tokens repeat heavily across files
+_bucket_cache: Dict[str, Tuple[int, float]] = {}
+_BUCKET_CACHE_LIMIT = 200_000
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased identifier sub-tokens, plus whole identifiers that were split."""
+    tokens = []
+    for identifier in _IDENTIFIER.findall(text):
+        parts = _SUBTOKEN.findall(identifier)
+        if len(parts) > 1:
+            tokens.append(identifier.lower())
+        tokens.extend(part.lower() for part in parts)
+    return tokens
+
+
+def _bucket(token: str, dim: int) -> Tuple[int, float]:
+    cached = _bucket_cache.get(token)
+    if cached is None:
+        value = int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+        # The low bit picks the sign so collisions tend to cancel out
+        cached = ((value >> 1) % dim, 1.0 if value & 1 else -1.0)
+        if len(_bucket_cache) < _BUCKET_CACHE_LIMIT:
+            _bucket_cache[token] = cached
+    return cached
+
+
+def embed_texts(texts: Sequence[str], dim: Optional[int] = None) -> np.ndarray:
+    """Embed a batch of texts into an (n, dim) float32 matrix of unit rows.
+
+    Texts without any identifiers get an all-zero row.
+    """
+    dim = dim or settings.EMBEDDING_DIM
+    rows: List[int] = []
+    cols: List[int] = []
+    signs: List[float] = []
+    for index, body in enumerate(texts):
+        for token in tokenize(body):
+            bucket, sign = _bucket(token, dim)
+            rows.append(index)
+            cols.append(bucket)
+            signs.append(sign)
+
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    if rows:
+        np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+    # Sublinear term frequency keeps one repeated name from dominating a file
+    matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def file_embedding_text(row: Dict[str, Any]) -> str:
+    """Text that stands for a file: its path, symbol names, signatures and imports."""
+    parsed = row.get("analysis_result") or {}
+    parts = [row["file_path"]]
+    for record in parsed.get("classes", []):
+        parts.append(record["name"])
+    for record in parsed.get("functions", []):
+        parts.append(record["name"])
+        parts.extend(record.get("parameters") or [])
+    parts.extend(parsed.get("imports", []))
+    return ' '.join(parts)
+
+
+def embed_rows(rows: List[Dict[str, Any]]):
+    """Set the ``embedding`` of CodeFile rows in one vectorized batch."""
+    if not rows:
+        return
+    vectors = embed_texts([file_embedding_text(row) for row in rows])
+    for row, vector in zip(rows, vectors):
+        # A zero vector has no cosine distance; leave it out of the index
+        row["embedding"] = vector if vector.any() else None
+
+
+async def _nearest(db: AsyncSession, k: int, statement) -> List[Any]:
+    """Run a k-nearest query, exactly when the HNSW index comes up short.
+
+    The index covers every codebase and returns ef_search candidates
+    before the codebase filter applies, so a codebase holding few of
+    them gets fewer than k rows although more match. Such a query is
+    repeated without index scans: a sort over that codebase's rows.
+    """
+    rows = (await db.execute(statement)).all()
+    if len(rows) < k:
+        await db.execute(text("SET LOCAL enable_indexscan = off"))
+        rows = (await db.execute(statement)).all()
+        await db.execute(text("SET LOCAL enable_indexscan = on"))
+    return rows
+
+
+async def semantic_search(db: AsyncSession, codebase_id: str, q: str, k: int = 10,
+                          level: str = "file") -> List[Dict[str, Any]]:
+    """Files (or chunks, with level="chunk") closest to the query by cosine similarity."""
+    vector = embed_texts([q])[0]
+    if not vector.any():
+        return []
+
+    # Wider HNSW candidate list than pgvector's default of 40; SET LOCAL lasts for this transaction
+    await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.SEMANTIC_EF_SEARCH)}"))
+    if level == "chunk":
+        distance = CodeChunk.embedding.cosine_distance(vector)
+        rows = await _nearest(db, k, select(
+            CodeChunk.file_path, CodeChunk.language, CodeChunk.kind, CodeChunk.name,
+            CodeChunk.start_line, CodeChunk.end_line, distance
+        ).where(
+            CodeChunk.codebase_id == codebase_id,
+            CodeChunk.embedding.isnot(None)
+        ).order_by(distance).limit(k))
+        return [
+            {"file_path": file_path, "language": language, "kind": kind, "name": name,
+             "start_line": start_line, "end_line": end_line, "score": round(1.0 - dist, 4)}
+            for file_path, language, kind, name, start_line, end_line, dist in rows
+        ]
+
+    distance = CodeFile.embedding.cosine_distance(vector)
+    rows = await _nearest(db, k, select(CodeFile.id, CodeFile.file_path, CodeFile.language, distance).where(
+        CodeFile.codebase_id == codebase_id,
+        CodeFile.embedding.isnot(None),
+        live()
+    ).order_by(distance).limit(k))
+    return [
+        {"file_id": file_id, "file_path": file_path, "language": language, "score": round(1.0 - dist, 4)}
+        for file_id, file_path, language, dist in rows
+    ]
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import uuid
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import INGEST_BYTES, INGEST_FILES, PARSE_ERRORS, STAGE_SECONDS
+from app.services import blob_store, parse_cache
+from app.services.archive_reader import ArchiveEntry
+from app.services.bulk_writer import BatchResult, CodeFileBulkWriter
+from app.services.chunker import chunk_file
+from app.services.dependency_graph import build_graph
+from app.services.parse_executor import parse_stream
+from app.services.parse_result import ParseResult
+from app.services.parser_registry import get_parser
+from app.services.response_cache import bump_generation
+from app.services.versions import stored_files
+
+logger = logging.getLogger(__name__)
+
+
+class FileOutcome(NamedTuple):
+    """What happened to one uploaded file."""
+    path: str
+    status: str  # processed, unchanged, skipped or failed
+    parsed: Optional[ParseResult] = None
+    reason: Optional[str] = None
+    cached: bool = False  # parse result came from the content-hash cache
+
+
+def code_file_row(codebase_id: str, file_path: str, content_str: str, parsed_data: ParseResult,
+                  digest: Optional[str] = None) -> Dict[str, Any]:
+    """Build the column values of a CodeFile row from content and its parse result."""
+    return dict(
+        # Assigned here so symbol rows can reference the file in the same batch
+        id=uuid.uuid4(),
+        codebase_id=codebase_id,
+        file_path=file_path,
+        content_hash=digest,
+        language=parsed_data.language,
+        # Store MCP analysis results
+        analysis_result=parsed_data.to_dict(),
+        size_bytes=len(content_str.encode('utf-8')),
+        line_count=len(content_str.splitlines()),
+        function_count=len(parsed_data.functions),
+        class_count=len(parsed_data.classes)
+    )
+
+
+def batch_outcomes(result: Optional[BatchResult]) -> List[FileOutcome]:
+    """Turn a flushed batch into final outcomes, failing every file if it was rolled back."""
+    if result is None:
+        return []
+    if result.error is None:
+        return result.items
+    return [
+        FileOutcome(outcome.path, "failed", reason=f"database write failed: {result.error}")
+        for outcome in result.items
+    ]
+
+
+def _decode(parser, chunk: List[ArchiveEntry]):
+    """Decode and hash a chunk of entries; returns candidates, their bytes, skips and bytes per language.
+
+    A path that occurs more than once keeps its last entry, as unpacking
+    the archive would; the rest are skipped before any work is done.
+    """
+    candidates = []
+    raw = {}
+    skipped = []
+    received: Dict[str, int] = {}
+    last = {entry.path: index for index, entry in enumerate(chunk)}
+    for index, entry in enumerate(chunk):
+        if last[entry.path] != index:
+            skipped.append(FileOutcome(entry.path, "skipped", reason="replaced by a later entry with the same path"))
+            continue
+        if entry.data is None:
+            skipped.append(FileOutcome(entry.path, "skipped", reason=entry.skip_reason))
+            continue
+        try:
+            content_str = entry.data.decode('utf-8')
+        except UnicodeDecodeError:
+            skipped.append(FileOutcome(entry.path, "skipped", reason="not valid UTF-8"))
+            continue
+        digest = parse_cache.content_hash(entry.data)
+        raw[digest] = entry.data
+        candidates.append((entry.path, content_str, digest))
+        language = parser.detect_language(entry.path)
+        received[language] = received.get(language, 0) + len(entry.data)
+    return candidates, raw, skipped, received
+
+
+async def ingest_entries(
+    db: AsyncSession,
+    codebase_id: str,
+    entries: Iterable[ArchiveEntry]
+) -> AsyncIterator[FileOutcome]:
+    """Decode, parse and stage files, yielding an outcome per file.
+
+    Entries are handled in INGEST_CHUNK_SIZE chunks. Reading them (which
+    decompresses archive members), decoding and hashing run in a thread,
+    so the event loop keeps serving requests during a large ingest.
+    Files whose content hash matches the stored copy at the same path are
+    reported unchanged and not touched; the rest have their bytes written
+    to the blob store and are looked up in the parse cache, and only
+    misses are sent to the process pool. Rows go through the bulk writer,
+    so a processed outcome is only yielded once its batch is written; the
+    caller owns the transaction and commits once the stream is drained.
+    """
+    parser = get_parser()
+    parser_version = parser.VERSION
+    writer = CodeFileBulkWriter(db, codebase_id)
+    iterator = iter(entries)
+    # Paths queued in the writer, which stored_files() cannot see until written
+    queued: Set[str] = set()
+
+    while True:
+        with STAGE_SECONDS.labels("read").time():
+            chunk = await asyncio.to_thread(list, islice(iterator, settings.INGEST_CHUNK_SIZE))
+        if not chunk:
+            for outcome in batch_outcomes(await writer.flush()):
+                yield outcome
+            return
+
+        # Decode and hash everything in the chunk; skips are yielded after
+        # it so the decode timing does not include the consumer
+        with STAGE_SECONDS.labels("decode").time():
+            candidates, raw, skipped, received = await asyncio.to_thread(_decode, parser, chunk)
+        for language, size in received.items():
+            INGEST_BYTES.labels(language).inc(size)
+        for outcome in skipped:
+            yield outcome
+
+        if not candidates:
+            continue
+
+        # A path repeated from an earlier chunk replaces that row, so it has to be written first
+        if not queued.isdisjoint(path for path, _, _ in candidates):
+            for outcome in batch_outcomes(await writer.flush()):
+                yield outcome
+            queued.clear()
+
+        # Skip files whose stored copy already has the same content
+        existing = await stored_files(db, codebase_id, [path for path, _, _ in candidates])
+        replaced = {}
+        changed = []
+        for path, content_str, digest in candidates:
+            previous = existing.get(path)
+            if previous and previous[1] == digest:
+                yield FileOutcome(path, "unchanged")
+                continue
+            if previous:
+                replaced[path] = previous[0]
+            changed.append((path, content_str, digest))
+
+        # Contents go to the blob store before any row references them
+        with STAGE_SECONDS.labels("blob_store").time():
+            await blob_store.store_blobs(db, {digest: raw[digest] for _, _, digest in changed})
+
+        # Only parse what the cache has not seen
+        cached = await parse_cache.lookup(db, [digest for _, _, digest in changed], parser_version)
+        misses = [(path, content_str) for path, content_str, digest in changed if digest not in cached]
+        digests = {path: digest for path, _, digest in changed}
+
+        for path, content_str, digest in changed:
+            if digest in cached:
+                row = code_file_row(codebase_id, path, content_str, cached[digest], digest)
+                outcome = FileOutcome(path, "processed", parsed=cached[digest], cached=True)
+                chunks = chunk_file(content_str, cached[digest])
+                queued.add(path)
+                for done in batch_outcomes(await writer.add(row, replaced.get(path), outcome, chunks)):
+                    yield done
+
+        fresh = {}
+        async for file_path, content_str, parsed_data, error in parse_stream(misses):
+            if error is not None:
+                logger.warning(f"Failed to parse {file_path}: {error}")
+                PARSE_ERRORS.labels(parser.detect_language(file_path)).inc()
+                # A file that failed to parse keeps its previous version
+                yield FileOutcome(file_path, "failed", reason=error)
+                continue
+            digest = digests[file_path]
+            fresh[digest] = parsed_data
+            row = code_file_row(codebase_id, file_path, content_str, parsed_data, digest)
+            outcome = FileOutcome(file_path, "processed", parsed=parsed_data)
+            chunks = chunk_file(content_str, parsed_data)
+            queued.add(file_path)
+            for done in batch_outcomes(await writer.add(row, replaced.get(file_path), outcome, chunks)):
+                yield done
+
+        await parse_cache.store(db, fresh, parser_version)
+
+
+async def finish_ingest(db: AsyncSession, codebase_id: str, changed: Optional[Iterable[str]] = None):
+    """Commit an ingest that processed files and bring the dependency graph up to date.
+
+    ``changed`` are the processed paths, for an incremental graph build;
+    without them the graph is rebuilt whole.
+    """
+    # Cached responses of this codebase stop matching once this commits
+    await bump_generation(db, codebase_id)
+    await db.commit()
+    await build_graph(db, codebase_id, changed=changed)
+    await db.commit()
+
+
+class IngestStats:
+    """Running per-status counts plus parse cache hits and misses.
+
+    Every recorded outcome is also counted in the INGEST_FILES metric.
+    """
+
+    def __init__(self):
+        self.counts = {
+            "processed": 0, "unchanged": 0, "skipped": 0, "failed": 0,
+            "cache_hits": 0, "cache_misses": 0
+        }
+
+    def record(self, outcome: FileOutcome):
+        if outcome.parsed is not None:
+            language = outcome.parsed.language
+        else:
+            language = get_parser().detect_language(outcome.path)
+        INGEST_FILES.labels(language, outcome.status).inc()
+        self.counts[outcome.status] += 1
+        if outcome.status == "processed" and outcome.cached:
+            self.counts["cache_hits"] += 1
+        elif outcome.status in ("processed", "failed"):
+            self.counts["cache_misses"] += 1
@@ -0,0 +1,284 @@
+"""Background ingest jobs backed by the ingest_jobs table."""
+import asyncio
+import logging
+import os
+import socket
+import sys
+import tarfile
+import tempfile
+import uuid
+import zipfile
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Any, BinaryIO, Dict, List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import JOBS_RUNNING
+from app.core.database import AsyncSessionLocal
+from app.schemas.code_analysis import IngestJob, IngestJobChunk
+from app.services.archive_reader import iter_archive
+from app.services.ingest import IngestStats, finish_ingest, ingest_entries
+from app.services.parser_registry import get_parser
+from app.services.response_cache import bump_generation
+
+logger = logging.getLogger(__name__)
+
+_workers: List[asyncio.Task] = []
+_wakeup: Optional[asyncio.Event] = None
+_worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+
+
+# Enqueueing -----------------------------------------------------------------------
+
+def _spool_files(files: List[UploadFile], target: BinaryIO) -> int:
+    """Write uploaded files into an uncompressed tar so jobs read one format."""
+    with tarfile.open(fileobj=target, mode='w') as archive:
+        for file in files:
+            file.file.seek(0, os.SEEK_END)
+            info = tarfile.TarInfo(file.filename)
+            info.size = file.file.tell()
+            file.file.seek(0)
+            archive.addfile(info, file.file)
+    return len(files)
+
+
+def _count_archive(source: BinaryIO) -> Optional[int]:
+    # Zip archives list their members up front; tar streams do not
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return sum(1 for info in archive.infolist() if not info.is_dir())
+    return None
+
+
+async def _store_payload(db: AsyncSession, job_id: uuid.UUID, source: BinaryIO):
+    """Copy an upload into ingest_job_chunks, where a worker on any host can read it."""
+    source.seek(0)
+    seq = 0
+    while True:
+        data = await asyncio.to_thread(source.read, settings.JOB_PAYLOAD_CHUNK_BYTES)
+        if not data:
+            break
+        await db.execute(insert(IngestJobChunk).values(job_id=job_id, seq=seq, data=data))
+        seq += 1
+
+
+async def _load_payload(db: AsyncSession, job_id: uuid.UUID, target: BinaryIO):
+    """Write a job's stored upload into ``target``, one chunk at a time."""
+    chunks = await db.stream_scalars(
+        select(IngestJobChunk.data).where(IngestJobChunk.job_id == job_id)
+        .order_by(IngestJobChunk.seq).execution_options(yield_per=1)
+    )
+    async for data in chunks:
+        await asyncio.to_thread(target.write, data)
+    target.seek(0)
+
+
+def _scratch_file():
+    os.makedirs(settings.JOB_SPOOL_DIR, exist_ok=True)
+    return tempfile.TemporaryFile(dir=settings.JOB_SPOOL_DIR)
+
+
+async def enqueue_job(db: AsyncSession, codebase_id: str, source: str,
+                      files: Optional[List[UploadFile]] = None,
+                      archive: Optional[UploadFile] = None) -> IngestJob:
+    """Store an upload in the database and queue it; the caller commits."""
+    job = IngestJob(
+        id=uuid.uuid4(), codebase_id=codebase_id, status="queued", source=source,
+        files_done=0, counts=IngestStats().counts, errors=[]
+    )
+    db.add(job)
+    # The payload rows reference the job
+    await db.flush()
+
+    # File reads and writes run in a thread so large uploads do not stall the loop
+    if source == "files":
+        with _scratch_file() as spool:
+            job.files_total = await asyncio.to_thread(_spool_files, files, spool)
+            await _store_payload(db, job.id, spool)
+    else:
+        job.files_total = await asyncio.to_thread(_count_archive, archive.file)
+        await _store_payload(db, job.id, archive.file)
+    return job
+
+
+def notify_workers():
+    """Wake idle workers in this process after a job was committed."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+# Progress -------------------------------------------------------------------------
+
+def job_progress(job: IngestJob) -> Dict[str, Any]:
+    """Throughput of the current run and the time left, when it can be estimated."""
+    throughput = None
+    eta_seconds = None
+    if job.started_at is not None:
+        end = job.finished_at or datetime.utcnow()
+        elapsed = (end - job.started_at).total_seconds()
+        done_this_run = job.files_done - job.run_offset
+        if elapsed > 0 and done_this_run > 0:
+            throughput = round(done_this_run / elapsed, 2)
+            if job.files_total is not None and job.status == "running":
+                eta_seconds = round(max(job.files_total - job.files_done, 0) / throughput, 1)
+    return {"files_per_second": throughput, "eta_seconds": eta_seconds}
+
+
+# Workers --------------------------------------------------------------------------
+
+async def _claim_job(worker_id: str) -> Optional[uuid.UUID]:
+    """Take the oldest queued job, or a running one whose worker went quiet."""
+    stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        job = await db.scalar(
+            select(IngestJob).where(or_(
+                IngestJob.status == "queued",
+                (IngestJob.status == "running") & (IngestJob.heartbeat_at < stale_before)
+            )).order_by(IngestJob.created_at).limit(1).with_for_update(skip_locked=True)
+        )
+        if job is None:
+            return None
+        if job.status == "running":
+            logger.info(f"Resuming job {job.id} from {job.worker_id} after {job.files_done} files")
+        now = datetime.utcnow()
+        job.status = "running"
+        job.worker_id = worker_id
+        job.started_at = now
+        job.heartbeat_at = now
+        job.run_offset = job.files_done
+        await db.commit()
+        return job.id
+
+
+def _entries(job: IngestJob, fileobj: BinaryIO):
+    if job.source == "files":
+        # Direct uploads accept any file, as the synchronous endpoint does
+        return iter_archive(fileobj, lambda path: True, sys.maxsize)
+    return iter_archive(fileobj, get_parser().supports, settings.ARCHIVE_MAX_FILE_BYTES)
+
+
+def _skip(entries, count: int):
+    for _ in islice(entries, count):
+        pass
+
+
+async def _keep_alive(job_id: uuid.UUID):
+    """Refresh a running job's heartbeat until cancelled, from its own session."""
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(IngestJob).where(IngestJob.id == job_id, IngestJob.status == "running")
+                    .values(heartbeat_at=datetime.utcnow())
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(f"Could not refresh the heartbeat of job {job_id}: {e}")
+
+
+async def run_job(job_id: uuid.UUID):
+    """Ingest a claimed job batch by batch, committing progress with each batch."""
+    heartbeat = asyncio.create_task(_keep_alive(job_id))
+    try:
+        await _run_job(job_id)
+    finally:
+        heartbeat.cancel()
+
+
+async def _run_job(job_id: uuid.UUID):
+    async with AsyncSessionLocal() as db:
+        job = await db.get(IngestJob, job_id)
+        try:
+            with _scratch_file() as fileobj:
+                await _load_payload(db, job.id, fileobj)
+                entries = _entries(job, fileobj)
+                # Batches already committed by an earlier run are skipped, not
+                # redone; reading archives decompresses, so it runs in a thread
+                await asyncio.to_thread(_skip, entries, job.files_done)
+
+                counts = dict(job.counts)
+                errors = list(job.errors)
+                while True:
+                    batch = await asyncio.to_thread(list, islice(entries, settings.JOB_BATCH_SIZE))
+                    if not batch:
+                        break
+                    stats = IngestStats()
+                    async for outcome in ingest_entries(db, str(job.codebase_id), batch):
+                        stats.record(outcome)
+                        if outcome.status == "failed" and len(errors) < settings.JOB_MAX_ERRORS:
+                            errors.append({"path": outcome.path, "reason": outcome.reason})
+                    for key, value in stats.counts.items():
+                        counts[key] = counts.get(key, 0) + value
+
+                    if stats.counts["processed"]:
+                        await bump_generation(db, job.codebase_id)
+                    job.files_done += len(batch)
+                    job.counts = dict(counts)
+                    job.errors = list(errors)
+                    job.heartbeat_at = datetime.utcnow()
+                    await db.commit()
+
+            if job.counts.get("processed"):
+                await finish_ingest(db, str(job.codebase_id))
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+            await db.execute(delete(IngestJobChunk).where(IngestJobChunk.job_id == job_id))
+            await db.commit()
+            logger.info(f"Job {job.id} completed: {job.files_done} files")
+
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await db.rollback()
+            job = await db.get(IngestJob, job_id)
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            await db.execute(delete(IngestJobChunk).where(IngestJobChunk.job_id == job_id))
+            await db.commit()
+
+
+async def _worker(worker_id: str):
+    while True:
+        try:
+            job_id = await _claim_job(worker_id)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} could not claim a job: {e}")
+            job_id = None
+
+        if job_id is not None:
+            try:
+                with JOBS_RUNNING.track_inprogress():
+                    await run_job(job_id)
+            except Exception as e:
+                # E.g. the database went away while recording a failure; the
+                # job is claimed again once its heartbeat goes stale
+                logger.error(f"Worker {worker_id} stopped on job {job_id}: {e}")
+            continue
+
+        _wakeup.clear()
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_workers():
+    """Start JOB_WORKERS worker tasks on the running event loop."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    for number in range(settings.JOB_WORKERS):
+        _workers.append(asyncio.create_task(_worker(f"{_worker_prefix}:{number}")))
+    logger.info(f"Started {settings.JOB_WORKERS} ingest job workers")
+
+
+async def stop_workers():
+    """Cancel worker tasks; interrupted jobs resume once their heartbeat goes stale."""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
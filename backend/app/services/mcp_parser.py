@@ -1,120 +1,92 @@
 import logging
-from typing import Dict, List, Any
 import re
 
+from app.services.parse_result import ClassRecord, FunctionRecord, ParseResult
+from app.services.scanner import scan_javascript, scan_python
+
 logger = logging.getLogger(__name__)
 
+# Compiled once at import instead of on every call
+_PY_FUNCTION = re.compile(r'def\s+(\w+)\(([^)]*)\)')
+_PY_CLASS = re.compile(r'class\s+(\w+)')
+_PY_IMPORT = re.compile(r'(import\s+[^\n]+|from\s+[^\n]+\s+import\s+[^\n]+)')
+_JS_FUNCTION = re.compile(r'function\s+(\w+)\s*\(')
+_JS_ARROW = re.compile(r'(?:const|let)\s+(\w+)\s*=\s*\([^)]*\)\s*=>')
+_JS_CLASS = re.compile(r'class\s+(\w+)')
+_JS_IMPORT = re.compile(r'import\s+[^;]+')
+
 class MCPParser:
     """Simple multi-language parser that actually works."""
     
-    def parse_code(self, content: str, file_path: str) -> Dict[str, Any]:
+    # Bump whenever output changes so cached parse results are invalidated
+    VERSION = "mcp-simple-5"
+    
+    EXTENSIONS = {
+        '.py': 'python',
+        '.js': 'javascript',
+        '.ts': 'typescript', 
+        '.java': 'java',
+        '.cpp': 'cpp'
+    }
+    
+    def supports(self, file_path: str) -> bool:
+        """Check whether a file has an extension this parser understands."""
+        return self.detect_language(file_path) != 'unknown'
+    
+    def parse_code(self, content: str, file_path: str) -> ParseResult:
         """Parse any code file based on its extension."""
-        language = self._detect_language(file_path)
+        language = self.detect_language(file_path)
         
         if language == 'python':
             return self._parse_python(content)
-        elif language == 'javascript':
-            return self._parse_javascript(content)
+        elif language in ('javascript', 'typescript'):
+            return self._parse_javascript(content, language)
         else:
             return self._parse_generic(content, language)
     
-    def _detect_language(self, file_path: str) -> str:
+    def detect_language(self, file_path: str) -> str:
         """Detect language from file extension."""
-        extensions = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript', 
-            '.java': 'java',
-            '.cpp': 'cpp'
-        }
-        
-        for ext, lang in extensions.items():
+        for ext, lang in self.EXTENSIONS.items():
             if file_path.endswith(ext):
                 return lang
         return 'unknown'
     
-    def _parse_python(self, content: str) -> Dict[str, Any]:
+    def _parse_python(self, content: str) -> ParseResult:
         """Parse Python code - SIMPLE VERSION."""
-        functions = []
-        classes = []
-        imports = []
-        
-        # Find functions
-        function_matches = re.findall(r'def\s+(\w+)\(([^)]*)\)', content)
-        for func_name, params in function_matches:
-            functions.append({
-                "name": func_name,
-                "parameters": params.split(',') if params else [],
-                "language": "python"
-            })
-        
-        # Find classes
-        class_matches = re.findall(r'class\s+(\w+)', content)
-        for class_name in class_matches:
-            classes.append({
-                "name": class_name,
-                "language": "python"
-            })
-        
-        # Find imports
-        import_matches = re.findall(r'(import\s+[^\n]+|from\s+[^\n]+\s+import\s+[^\n]+)', content)
-        imports.extend(import_matches)
-        
-        return {
-            "functions": functions,
-            "classes": classes, 
-            "imports": imports,
-            "language": "python",
-            "parser": "mcp-simple"
-        }
-    
-    def _parse_javascript(self, content: str) -> Dict[str, Any]:
-        """Parse JavaScript code - SIMPLE VERSION."""
-        functions = []
-        classes = []
-        imports = []
-        
-        # Find functions
-        function_patterns = [
-            r'function\s+(\w+)\s*\(',
-            r'const\s+(\w+)\s*=\s*\([^)]*\)\s*=>',
-            r'let\s+(\w+)\s*=\s*\([^)]*\)\s*=>'
+        functions = [
+            FunctionRecord(name, "python", parameters=params.split(',') if params else [])
+            for name, params in _PY_FUNCTION.findall(content)
         ]
-        
-        for pattern in function_patterns:
-            matches = re.findall(pattern, content)
-            for func_name in matches:
-                functions.append({
-                    "name": func_name,
-                    "language": "javascript"
-                })
-        
-        # Find classes
-        class_matches = re.findall(r'class\s+(\w+)', content)
-        for class_name in class_matches:
-            classes.append({
-                "name": class_name,
-                "language": "javascript" 
-            })
-        
-        # Find imports
-        import_matches = re.findall(r'import\s+[^;]+', content)
-        imports.extend(import_matches)
-        
-        return {
-            "functions": functions,
-            "classes": classes,
-            "imports": imports,
-            "language": "javascript",
-            "parser": "mcp-simple"
-        }
+        classes = [ClassRecord(name, "python") for name in _PY_CLASS.findall(content)]
+        imports = _PY_IMPORT.findall(content)
+        return ParseResult("python", "mcp-simple", functions, classes, imports)
+    
+    def _parse_javascript(self, content: str, language: str = 'javascript') -> ParseResult:
+        """Parse JavaScript/TypeScript code - SIMPLE VERSION."""
+        functions = [FunctionRecord(name, language) for name in _JS_FUNCTION.findall(content)]
+        functions += [FunctionRecord(name, language) for name in _JS_ARROW.findall(content)]
+        classes = [ClassRecord(name, language) for name in _JS_CLASS.findall(content)]
+        imports = _JS_IMPORT.findall(content)
+        return ParseResult(language, "mcp-simple", functions, classes, imports)
     
-    def _parse_generic(self, content: str, language: str) -> Dict[str, Any]:
+    def _parse_generic(self, content: str, language: str) -> ParseResult:
         """Generic parser for other languages."""
-        return {
-            "functions": [],
-            "classes": [],
-            "imports": [],
-            "language": language,
-            "parser": "mcp-generic"
-        }
\ No newline at end of file
+        return ParseResult(language, "mcp-generic")
+
+
+class ScannerParser(MCPParser):
+    """MCPParser with the single-pass scanner for Python and JS/TS.
+
+    Skips declarations inside strings and comments and records line
+    numbers and parents; benchmarks/bench_parsers.py compares its speed.
+    """
+
+    VERSION = "scanner-1"
+
+    def _parse_python(self, content: str) -> ParseResult:
+        """Parse Python code with the single-pass scanner."""
+        return scan_python(content)
+
+    def _parse_javascript(self, content: str, language: str = 'javascript') -> ParseResult:
+        """Parse JavaScript/TypeScript code with the single-pass scanner."""
+        return scan_javascript(content, language)
@@ -0,0 +1,95 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.schemas.code_analysis import ParseCacheEntry
+from app.services.parse_result import ParseResult
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest identifying a file's content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ParseCache:
+    """Bounded in-memory LRU of parse results keyed by (content hash, parser version)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], ParseResult]" = OrderedDict()
+
+    def get(self, digest: str, parser_version: str) -> Optional[ParseResult]:
+        key = (digest, parser_version)
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def put(self, digest: str, parser_version: str, result: ParseResult):
+        key = (digest, parser_version)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+parse_cache = ParseCache(settings.PARSE_CACHE_SIZE)
+
+
+async def lookup(db: AsyncSession, digests: Iterable[str], parser_version: str) -> Dict[str, ParseResult]:
+    """Find cached parse results, checking memory first and then the table."""
+    found = {}
+    missing = []
+    for digest in set(digests):
+        result = parse_cache.get(digest, parser_version)
+        if result is not None:
+            found[digest] = result
+        else:
+            missing.append(digest)
+
+    if missing:
+        rows = await db.execute(
+            select(ParseCacheEntry.content_hash, ParseCacheEntry.analysis_result).where(
+                ParseCacheEntry.parser_version == parser_version,
+                ParseCacheEntry.content_hash.in_(missing)
+            )
+        )
+        for digest, stored in rows:
+            result = ParseResult.from_dict(stored)
+            parse_cache.put(digest, parser_version, result)
+            found[digest] = result
+
+    return found
+
+
+async def store(db: AsyncSession, results: Dict[str, ParseResult], parser_version: str):
+    """Remember fresh parse results in memory and in the persistent table."""
+    if not results:
+        return
+    for digest, result in results.items():
+        parse_cache.put(digest, parser_version, result)
+
+    statement = pg_insert(ParseCacheEntry).values([
+        {"content_hash": digest, "parser_version": parser_version, "analysis_result": result.to_dict()}
+        for digest, result in results.items()
+    ]).on_conflict_do_nothing()
+    try:
+        # The cache is an optimisation; never let it fail the ingest
+        async with db.begin_nested():
+            await db.execute(statement)
+    except Exception as e:
+        logger.warning(f"Could not persist {len(results)} parse cache entries: {e}")
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import STAGE_SECONDS
+from app.services.parse_result import ParseResult
+from app.services.parser_registry import get_parser
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+# Workers start from a clean server process rather than a fork of the API
+# process, which runs an event loop, threads and open connections
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def available_cores() -> int:
+    """Number of cores this process may run on (respects CPU affinity)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    return settings.PARSE_WORKERS or available_cores()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared parsing pool, creating it on first use outside the API."""
+    global _executor
+    if _executor is None:
+        logger.info(f"Starting parse executor with {worker_count()} {_START_METHOD} processes")
+        _executor = ProcessPoolExecutor(
+            max_workers=worker_count(), mp_context=multiprocessing.get_context(_START_METHOD)
+        )
+    return _executor
+
+
+def _warm_up() -> str:
+    return get_parser().VERSION
+
+
+async def start_executor():
+    """Create the parsing pool and its workers (called on application startup)."""
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    # Workers are started on demand, one per task no idle worker can take
+    await asyncio.gather(*(loop.run_in_executor(executor, _warm_up) for _ in range(worker_count())))
+
+
+def shutdown_executor():
+    """Stop the parsing pool (called on application shutdown)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def parse_batch(
+    batch: List[Tuple[str, str]]
+) -> Tuple[List[Tuple[Optional[ParseResult], Optional[str]]], float]:
+    """Parse (file_path, content) pairs inside a worker process.
+
+    Returns one (parsed_data, error) pair per input, in order, so a bad
+    file never fails the rest of its batch, and the seconds spent
+    parsing. The time is measured here because metrics recorded in a
+    worker process never reach the API process.
+    """
+    start = time.perf_counter()
+    parser = get_parser()  # Built once per worker process
+    results = []
+    for file_path, content in batch:
+        try:
+            results.append((parser.parse_code(content, file_path), None))
+        except Exception as e:
+            results.append((None, str(e)))
+    return results, time.perf_counter() - start
+
+
+def _batched(items: Iterable[Tuple[str, str]], size: int) -> Iterator[List[Tuple[str, str]]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+async def parse_stream(
+    files: Iterable[Tuple[str, str]],
+    batch_size: Optional[int] = None
+) -> AsyncIterator[Tuple[str, str, Optional[ParseResult], Optional[str]]]:
+    """Parse files in the process pool, yielding results as batches finish.
+
+    Yields (file_path, content, parsed_data, error). At most
+    PARSE_MAX_IN_FLIGHT batches are queued at once, so a lazy ``files``
+    iterable is consumed with bounded memory.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    max_in_flight = settings.PARSE_MAX_IN_FLIGHT or 2 * worker_count()
+    batches = _batched(files, batch_size or settings.PARSE_BATCH_SIZE)
+
+    pending: Dict[asyncio.Future, List[Tuple[str, str]]] = {}
+    exhausted = False
+    while pending or not exhausted:
+        while not exhausted and len(pending) < max_in_flight:
+            batch = next(batches, None)
+            if batch is None:
+                exhausted = True
+                break
+            pending[loop.run_in_executor(executor, parse_batch, batch)] = batch
+
+        if not pending:
+            break
+
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            batch = pending.pop(future)
+            results, seconds = future.result()
+            STAGE_SECONDS.labels("parse").observe(seconds)
+            for (file_path, content), (parsed_data, error) in zip(batch, results):
+                yield file_path, content, parsed_data, error
@@ -0,0 +1,86 @@
+"""Typed parse results shared by every parser engine."""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+@dataclass(slots=True)
+class FunctionRecord:
+    name: str
+    language: str
+    line: Optional[int] = None
+    parameters: Optional[List[str]] = None  # None when the parser does not extract them
+    end_line: Optional[int] = None
+    parent: Optional[str] = None  # Enclosing class
+    parent_function: Optional[str] = None  # Enclosing function of a nested def
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {"name": self.name, "language": self.language, "line": self.line}
+        if self.parameters is not None:
+            record["parameters"] = self.parameters
+        if self.end_line is not None:
+            record["end_line"] = self.end_line
+        if self.parent is not None:
+            record["parent"] = self.parent
+        if self.parent_function is not None:
+            record["parent_function"] = self.parent_function
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "FunctionRecord":
+        return cls(
+            record["name"], record.get("language", "unknown"), record.get("line"), record.get("parameters"),
+            record.get("end_line"), record.get("parent"), record.get("parent_function")
+        )
+
+
+@dataclass(slots=True)
+class ClassRecord:
+    name: str
+    language: str
+    line: Optional[int] = None
+    end_line: Optional[int] = None
+    parent: Optional[str] = None  # Enclosing class of a nested class
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {"name": self.name, "language": self.language, "line": self.line}
+        if self.end_line is not None:
+            record["end_line"] = self.end_line
+        if self.parent is not None:
+            record["parent"] = self.parent
+        return record
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "ClassRecord":
+        return cls(
+            record["name"], record.get("language", "unknown"), record.get("line"),
+            record.get("end_line"), record.get("parent")
+        )
+
+
+@dataclass(slots=True)
+class ParseResult:
+    language: str
+    parser: str
+    functions: List[FunctionRecord] = field(default_factory=list)
+    classes: List[ClassRecord] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The stored JSON form (CodeFile.analysis_result and the parse cache)."""
+        return {
+            "functions": [record.to_dict() for record in self.functions],
+            "classes": [record.to_dict() for record in self.classes],
+            "imports": self.imports,
+            "language": self.language,
+            "parser": self.parser
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ParseResult":
+        return cls(
+            data.get("language", "unknown"),
+            data.get("parser", "unknown"),
+            [FunctionRecord.from_dict(record) for record in data.get("functions", [])],
+            [ClassRecord.from_dict(record) for record in data.get("classes", [])],
+            list(data.get("imports", []))
+        )
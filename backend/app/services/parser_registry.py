@@ -0,0 +1,46 @@
+import importlib
+import logging
+from typing import Dict, Optional, Protocol
+
+from app.core.config import settings
+from app.services.parse_result import ParseResult
+
+logger = logging.getLogger(__name__)
+
+
+class ParserEngine(Protocol):
+    """Interface every parsing engine implements."""
+
+    # Part of the parse cache key; bump when the output changes
+    VERSION: str
+
+    def supports(self, file_path: str) -> bool:
+        ...
+
+    def detect_language(self, file_path: str) -> str:
+        ...
+
+    def parse_code(self, content: str, file_path: str) -> ParseResult:
+        ...
+
+
+# Engine name -> "module:Class", imported lazily so optional engines cost nothing
+PARSER_ENGINES = {
+    "mcp": "app.services.mcp_parser:MCPParser",
+    "scanner": "app.services.mcp_parser:ScannerParser",
+    "treesitter": "app.services.treesitter_parser:TreeSitterParser",
+}
+
+_instances: Dict[str, ParserEngine] = {}
+
+
+def get_parser(name: Optional[str] = None) -> ParserEngine:
+    """Return the shared instance of a parser engine (PARSER_ENGINE by default)."""
+    name = name or settings.PARSER_ENGINE
+    if name not in _instances:
+        if name not in PARSER_ENGINES:
+            raise ValueError(f"Unknown parser engine '{name}', expected one of {sorted(PARSER_ENGINES)}")
+        module_name, class_name = PARSER_ENGINES[name].split(':')
+        _instances[name] = getattr(importlib.import_module(module_name), class_name)()
+        logger.info(f"Using parser engine: {name}")
+    return _instances[name]
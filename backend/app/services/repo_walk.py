@@ -0,0 +1,157 @@
+"""Parallel directory walk of a local checkout that honours .gitignore."""
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Never descended into, whatever the ignore files say
+ALWAYS_SKIPPED = frozenset({'.git', '.hg', '.svn'})
+
+
+class IgnoreRule(NamedTuple):
+    base: str  # Directory of the .gitignore, relative to the root ('' for the root)
+    pattern: re.Pattern
+    negate: bool
+    dir_only: bool
+
+
+def _translate(glob: str) -> str:
+    """Regex source for a gitignore glob, without the anchoring prefix."""
+    out = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if glob.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if char == '*':
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = glob.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(char))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif char == '\\' and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
+
+
+def parse_rules(lines: List[str], base: str = '') -> List[IgnoreRule]:
+    """Turn the lines of one ignore file into rules relative to ``base``."""
+    rules = []
+    for line in lines:
+        line = line.rstrip('\n')
+        if not line.endswith('\\ '):
+            line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        negate = line.startswith('!')
+        if negate:
+            line = line[1:]
+        elif line.startswith(('\\!', '\\#')):
+            line = line[1:]
+        dir_only = line.endswith('/')
+        line = line.rstrip('/')
+        if not line:
+            continue
+        # A slash anywhere but the end anchors the pattern to the ignore file's directory
+        anchored = '/' in line
+        line = line.lstrip('/')
+        prefix = '' if anchored else '(?:.*/)?'
+        rules.append(IgnoreRule(base, re.compile(f"{prefix}{_translate(line)}\\Z"), negate, dir_only))
+    return rules
+
+
+def read_rules(path: str, base: str) -> List[IgnoreRule]:
+    """Rules of an ignore file, or none if it cannot be read."""
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return parse_rules(f.readlines(), base)
+    except OSError:
+        return []
+
+
+def is_ignored(rules: List[IgnoreRule], rel_path: str, is_dir: bool) -> bool:
+    """Whether the last rule matching ``rel_path`` ignores it."""
+    for rule in reversed(rules):
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.base:
+            if not rel_path.startswith(rule.base + '/'):
+                continue
+            candidate = rel_path[len(rule.base) + 1:]
+        else:
+            candidate = rel_path
+        if rule.pattern.match(candidate):
+            return not rule.negate
+    return False
+
+
+def _scan(path: str, rel: str, rules: List[IgnoreRule], use_gitignore: bool,
+          include: Callable[[str], bool]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, List[IgnoreRule]]]]:
+    """List one directory: (files to index, subdirectories to walk with their rules)."""
+    if use_gitignore:
+        local = read_rules(os.path.join(path, '.gitignore'), rel)
+        if local:
+            rules = rules + local
+
+    files = []
+    directories = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            child = f"{rel}/{entry.name}" if rel else entry.name
+            # Symlinks are skipped: they can loop or point outside the checkout
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                if entry.name in ALWAYS_SKIPPED or is_ignored(rules, child, True):
+                    continue
+                directories.append((entry.path, child, rules))
+            elif entry.is_file():
+                if include(child) and not is_ignored(rules, child, False):
+                    files.append((entry.path, child))
+    return files, directories
+
+
+def walk_repo(
+    root: str,
+    use_gitignore: bool = True,
+    include: Optional[Callable[[str], bool]] = None,
+    threads: int = 8
+) -> Iterator[Tuple[str, str]]:
+    """Yield (absolute path, POSIX path relative to root) for every file to index.
+
+    Files are yielded as their directories are listed, so consumers can
+    start before the walk ends; the order is not deterministic.
+    """
+    root = os.path.abspath(root)
+    include = include or (lambda path: True)
+    rules: List[IgnoreRule] = []
+    if use_gitignore:
+        rules = read_rules(os.path.join(root, '.git', 'info', 'exclude'), '')
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = {pool.submit(_scan, root, '', rules, use_gitignore, include)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, directories = future.result()
+                for path, rel, inherited in directories:
+                    pending.add(pool.submit(_scan, path, rel, inherited, use_gitignore, include))
+                yield from files
@@ -0,0 +1,188 @@
+"""Versioned cache of rendered responses for read endpoints."""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from sqlalchemy import event, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import RESPONSE_CACHE
+from app.schemas.code_analysis import Codebase
+
+# Scope of responses that list codebases rather than describe one
+CODEBASES_SCOPE = "codebases"
+
+_BUMPED_KEY = "response_cache_bumped"
+
+
+class Rendered(NamedTuple):
+    """A rendered body with headers that are cached along with it."""
+    body: bytes
+    headers: Dict[str, str] = {}
+
+
+class ResponseCache:
+    """Bounded LRU of rendered bodies, limited by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[Tuple, Rendered]" = OrderedDict()
+
+    def get(self, key: Tuple) -> Optional[Rendered]:
+        rendered = self._entries.get(key)
+        if rendered is not None:
+            self._entries.move_to_end(key)
+        return rendered
+
+    def put(self, key: Tuple, rendered: Rendered):
+        # A body that would take most of the budget would only evict everything else
+        if len(rendered.body) > self.max_bytes // 4:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= len(previous.body)
+        self._entries[key] = rendered
+        self.size_bytes += len(rendered.body)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted.body)
+
+    def clear(self):
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_ENTRIES, settings.RESPONSE_CACHE_MAX_BYTES)
+
+# scope -> (version, monotonic time it was read)
+_versions: Dict[str, Tuple[str, float]] = {}
+
+
+async def _read_version(db: AsyncSession, scope: str) -> Optional[str]:
+    if scope == CODEBASES_SCOPE:
+        # Codebases are only ever added, so count and newest creation identify the list
+        count, newest = (await db.execute(
+            select(func.count(Codebase.id), func.max(Codebase.created_at))
+        )).one()
+        return f"{count}:{newest.isoformat() if newest else ''}"
+    generation = await db.scalar(select(Codebase.generation).where(Codebase.id == scope))
+    return None if generation is None else str(generation)
+
+
+async def current_version(db: AsyncSession, scope: str) -> Optional[str]:
+    """Version of a codebase (or of the codebase list); None if the codebase does not exist."""
+    remembered = _versions.get(scope)
+    now = time.monotonic()
+    if remembered is not None and now - remembered[1] < settings.RESPONSE_CACHE_VERSION_TTL:
+        return remembered[0]
+    version = await _read_version(db, scope)
+    if version is not None:
+        _versions[scope] = (version, now)
+    return version
+
+
+def forget_version(scope: str):
+    """Make the next read of ``scope`` re-read its version from the database."""
+    _versions.pop(str(scope), None)
+
+
+async def bump_generation(db: AsyncSession, codebase_id: str) -> int:
+    """Advance a codebase's generation inside the caller's transaction and return it.
+
+    Only the first call in a transaction advances it, so everything one
+    transaction writes shares a generation. The UPDATE also holds the
+    codebase row lock until commit, which serializes writers of one
+    codebase. This process forgets the cached version once the
+    transaction commits.
+    """
+    bumped = db.sync_session.info.setdefault(_BUMPED_KEY, {})
+    key = str(codebase_id)
+    if key not in bumped:
+        bumped[key] = await db.scalar(
+            update(Codebase).where(Codebase.id == codebase_id).values(
+                generation=Codebase.generation + 1
+            ).returning(Codebase.generation).execution_options(synchronize_session=False)
+        )
+    return bumped[key]
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_committed(session: Session):
+    for scope in session.info.pop(_BUMPED_KEY, ()):
+        forget_version(scope)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_bumps(session: Session, previous_transaction):
+    # A SAVEPOINT rolling back leaves the bump of the enclosing transaction in place
+    if previous_transaction.nested or session.in_transaction():
+        return
+    session.info.pop(_BUMPED_KEY, None)
+
+
+def _etag(endpoint: str, scope: str, version: str, params: Tuple) -> str:
+    raw = json.dumps([endpoint, scope, version, params], default=str).encode('utf-8')
+    return f'"{hashlib.blake2b(raw, digest_size=12).hexdigest()}"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+
+async def cached_response(
+    request: Request,
+    db: AsyncSession,
+    endpoint: str,
+    scope: str,
+    params: Tuple,
+    render: Callable[[], Awaitable[Union[bytes, Rendered]]],
+    media_type: str = "application/json"
+) -> Optional[Response]:
+    """Serve a rendered body from the cache, or render and remember it.
+
+    ``render`` returns the body, or a Rendered with headers of its own.
+    Answers 304 when If-None-Match carries the current ETag. Returns None
+    if ``scope`` names a codebase that does not exist.
+    """
+    version = await current_version(db, scope)
+    if version is None:
+        return None
+
+    etag = _etag(endpoint, scope, version, params)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _matches(request, etag):
+        RESPONSE_CACHE.labels(endpoint, "not_modified").inc()
+        return Response(status_code=304, headers=headers)
+
+    key = (endpoint, scope, version, params)
+    rendered = response_cache.get(key)
+    if rendered is None:
+        RESPONSE_CACHE.labels(endpoint, "miss").inc()
+        rendered = await render()
+        if not isinstance(rendered, Rendered):
+            rendered = Rendered(rendered)
+        response_cache.put(key, rendered)
+    else:
+        RESPONSE_CACHE.labels(endpoint, "hit").inc()
+    return Response(rendered.body, media_type=media_type, headers={**headers, **rendered.headers})
+
+
+def etag_headers(request: Request, endpoint: str, scope: str, version: str,
+                 params: Tuple = ()) -> Tuple[Dict[str, Any], bool]:
+    """ETag headers for a response that is not cached, and whether the client already has it."""
+    etag = _etag(endpoint, scope, version, params)
+    return {"ETag": etag, "Cache-Control": "no-cache"}, _matches(request, etag)
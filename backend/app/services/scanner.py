@@ -0,0 +1,147 @@
+"""Single-pass scanners for Python and JavaScript/TypeScript: one combined regex per language."""
+import re
+from typing import Dict, List, Tuple
+
+from app.services.parse_result import ClassRecord, FunctionRecord, ParseResult
+
+# Every alternative of a scanner pattern starts with a literal character, so
+# the regex engine skips from one candidate character to the next in C; only
+# declarations, strings and comments come back to Python. Declarations are
+# matched at the start of a line (JS: also after ";" or a block comment),
+# where a string or comment that began on an earlier line has already been
+# consumed whole.
+
+
+# Python ---------------------------------------------------------------------
+
+_PY_TOKENS = re.compile(
+    r'''#[^\n]*+'''
+    r'''|"""[^"\\]*+(?:(?:\\.|"(?!""))[^"\\]*+)*+(?:""")?'''
+    r"""|'''[^'\\]*+(?:(?:\\.|'(?!''))[^'\\]*+)*+(?:''')?"""
+    r'''|"[^"\\\n]*+(?:\\.[^"\\\n]*+)*+"?'''
+    r"""|'[^'\\\n]*+(?:\\.[^'\\\n]*+)*+'?"""
+    r'''|\n(?P<indent>[ \t]*+)(?:(?:async[ \t]++|)def[ \t]++(?P<def>\w++)[ \t]*+\((?P<params>[^)]*+)'''
+    r'''|class[ \t]++(?P<class>\w++)'''
+    r'''|(?P<import>import[ \t][^\n]*+|from[ \t][^\n]*?[ \t]import\b[^\n]*+))''',
+    re.DOTALL
+)
+
+
+def scan_python(content: str) -> ParseResult:
+    """Find functions, classes and imports of a Python file."""
+    functions: List[FunctionRecord] = []
+    classes: List[ClassRecord] = []
+    imports: List[str] = []
+
+    # A leading newline gives line 1 a line start like every other line
+    text = '\n' + content
+    # Open blocks as (indent width, is a class, name), to attribute parents
+    blocks: List[Tuple[int, bool, str]] = []
+    line = 0
+    last = 0
+    for match in _PY_TOKENS.finditer(text):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        if kind == 'import':
+            imports.append(match.group('import').split('#', 1)[0].strip())
+            continue
+
+        start = match.start() + 1
+        line += text.count('\n', last, start)
+        last = start
+        indent = match.group('indent')
+        indent = len(indent.expandtabs()) if '\t' in indent else len(indent)
+        while blocks and blocks[-1][0] >= indent:
+            blocks.pop()
+        parent = blocks[-1] if blocks else None
+
+        if kind == 'class':
+            name = match.group('class')
+            classes.append(ClassRecord(name, "python", line, parent=parent[2] if parent and parent[1] else None))
+            blocks.append((indent, True, name))
+        else:
+            name = match.group('def')
+            params = match.group('params')
+            record = FunctionRecord(name, "python", line, params.split(',') if params else [])
+            if parent and parent[1]:
+                record.parent = parent[2]
+            elif parent:
+                record.parent_function = parent[2]
+            functions.append(record)
+            blocks.append((indent, False, name))
+
+    return ParseResult("python", "scanner", functions, classes, imports)
+
+
+# JavaScript / TypeScript ----------------------------------------------------
+
+_JS_ARROW = r'''[ \t]*+(?::[^=\n]++)?=[ \t]*+(?:async[ \t]++)?(?:\([^)]*+\)|[\w$]++)[ \t]*+(?::[^=\n]++)?=>'''
+# Keywords that are never the name of a method
+_JS_NOT_METHODS = r'''(?:if|for|while|switch|catch|with|return|function|else)(?![\w$])'''
+
+
+def _js_declaration(suffix: str) -> str:
+    """A declaration at a statement start, with its groups named ``<kind><suffix>``."""
+    return (
+        r'''(?:export[ \t]++(?:default[ \t]++|)|)(?:declare[ \t]++|)(?:abstract[ \t]++|async[ \t]++|)(?:'''
+        r'''function(?![\w$])[ \t]*+\*?[ \t]*+(?P<function{0}>[\w$]++)[ \t]*+[(<]'''
+        r'''|class[ \t]++(?P<class{0}>[\w$]++)'''
+        r'''|(?:const|let|var)[ \t]++(?P<arrow{0}>[\w$]++)''' + _JS_ARROW +
+        r'''|(?P<import{0}>import(?![\w$])(?:[^;'"{{\n]++|\{{[^}}]*+\}})*+(?:["'][^"'\n]*+["'])?))'''
+    ).format(suffix)
+
+
+# A "/" right after one of these (and at most one blank) starts a regex literal
+_JS_REGEX_AFTER = r'[(,=:\[!&|?{};]'
+_JS_TOKENS = re.compile(
+    r'''"[^"\\\n]*+(?:\\.[^"\\\n]*+)*+"?'''
+    r"""|'[^'\\\n]*+(?:\\.[^'\\\n]*+)*+'?"""
+    r'''|`[^`\\]*+(?:\\.[^`\\]*+)*+`?'''
+    r'''|//[^\n]*+'''
+    r'''|/\*[^*]*+\*++(?:[^/*][^*]*+\*++)*+/(?:[ \t]*+''' + _js_declaration('_c') + r''')?'''
+    r'''|/\*.*'''
+    r'''|/(?:(?<=''' + _JS_REGEX_AFTER + r'''/)|(?<=''' + _JS_REGEX_AFTER + r'''[ \t]/)|(?<=return[ \t]/))'''
+    r'''(?![/*])(?:[^/\\\n\[]++|\\.|\[(?:[^\]\\\n]++|\\.)*+\]?)*+/?'''
+    r'''|;[ \t]*+''' + _js_declaration('_s') +
+    r'''|\n[ \t]*+(?:''' + _js_declaration('') +
+    r'''|(?!''' + _JS_NOT_METHODS + r''')(?:static[ \t]++|)(?:async[ \t]++|)(?:[gs]et[ \t]++|)(?P<method>[\w$]++)[ \t]*+'''
+    r'''\([^)]*+\)[ \t]*+(?::[^{\n]++)?\{)''',
+    re.DOTALL
+)
+# Group name -> symbol kind
+_JS_KINDS: Dict[str, str] = {'method': 'function'}
+for _suffix in ('', '_c', '_s'):
+    _JS_KINDS.update({
+        f'function{_suffix}': 'function', f'arrow{_suffix}': 'function',
+        f'class{_suffix}': 'class', f'import{_suffix}': 'import',
+    })
+
+
+def scan_javascript(content: str, language: str = "javascript") -> ParseResult:
+    """Find functions, classes and imports of a JS/TS file."""
+    functions: List[FunctionRecord] = []
+    classes: List[ClassRecord] = []
+    imports: List[str] = []
+
+    text = '\n' + content
+    line = 0
+    last = 0
+    for match in _JS_TOKENS.finditer(text):
+        group = match.lastgroup
+        if group is None:
+            continue
+        kind = _JS_KINDS[group]
+        if kind == 'import':
+            imports.append(' '.join(match.group(group).split()))
+            continue
+
+        start = match.start(group)
+        line += text.count('\n', last, start)
+        last = start
+        if kind == 'class':
+            classes.append(ClassRecord(match.group(group), language, line))
+        else:
+            functions.append(FunctionRecord(match.group(group), language, line))
+
+    return ParseResult(language, "scanner", functions, classes, imports)
@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.code_analysis import Symbol
+
+
+def symbol_rows(file_row: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten the functions and classes of a CodeFile row into Symbol rows."""
+    parsed = file_row.get("analysis_result") or {}
+    base = dict(
+        codebase_id=file_row["codebase_id"],
+        file_id=file_row["id"],
+        file_path=file_row["file_path"],
+        language=file_row["language"]
+    )
+    rows = []
+    for kind, records in (("function", parsed.get("functions", [])), ("class", parsed.get("classes", []))):
+        for record in records:
+            parameters = record.get("parameters")
+            rows.append(dict(
+                base,
+                name=record["name"],
+                kind=kind,
+                line=record.get("line"),
+                end_line=record.get("end_line"),
+                parent=record.get("parent") or record.get("parent_function"),
+                signature=f"{record['name']}({', '.join(p.strip() for p in parameters)})"
+                if parameters is not None else None
+            ))
+    return rows
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _as_result(symbol: Symbol, match: str, score: float) -> Dict[str, Any]:
+    return {
+        "name": symbol.name,
+        "kind": symbol.kind,
+        "language": symbol.language,
+        "file_id": symbol.file_id,
+        "file_path": symbol.file_path,
+        "line": symbol.line,
+        "end_line": symbol.end_line,
+        "parent": symbol.parent,
+        "signature": symbol.signature,
+        "match": match,
+        "score": round(score, 3)
+    }
+
+
+async def search_symbols(
+    db: AsyncSession,
+    codebase_id: str,
+    q: str,
+    mode: str = "auto",
+    kind: Optional[str] = None,
+    limit: int = 50
+) -> List[Dict[str, Any]]:
+    """Find symbols by name, best matches first.
+
+    Exact and prefix matches come from the lower(name) B-tree index and
+    rank above fuzzy ones; "auto" only falls back to the trigram index
+    when they do not fill the page. Matching is case-insensitive.
+    """
+    needle = q.lower()
+    lower_name = func.lower(Symbol.name)
+    base = select(Symbol).where(Symbol.codebase_id == codebase_id)
+    if kind:
+        base = base.where(Symbol.kind == kind)
+
+    results: List[Dict[str, Any]] = []
+    seen = set()
+
+    if mode in ("auto", "exact", "prefix"):
+        if mode == "exact":
+            query = base.where(lower_name == needle)
+        else:
+            query = base.where(lower_name.like(_escape_like(needle) + '%', escape='\\'))
+        # Exact hits first, then shorter names: "cart" ranks "Cart" over "CartItemView"
+        query = query.order_by((lower_name == needle).desc(), func.length(Symbol.name), Symbol.name, Symbol.id)
+        for symbol in await db.scalars(query.limit(limit)):
+            exact = symbol.name.lower() == needle
+            results.append(_as_result(symbol, "exact" if exact else "prefix",
+                                      1.0 if exact else len(needle) / len(symbol.name)))
+            seen.add(symbol.id)
+
+    if mode == "fuzzy" or (mode == "auto" and len(results) < limit):
+        similarity = func.similarity(lower_name, needle)
+        # `%` applies pg_trgm.similarity_threshold and can use the trigram index
+        query = base.add_columns(similarity).where(lower_name.op('%')(needle))
+        if seen:
+            query = query.where(Symbol.id.notin_(seen))
+        query = query.order_by(similarity.desc(), Symbol.name, Symbol.id).limit(limit - len(results))
+        for symbol, score in await db.execute(query):
+            results.append(_as_result(symbol, "fuzzy", score))
+
+    return results
@@ -0,0 +1,239 @@
+import importlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.services.mcp_parser import MCPParser
+from app.services.parse_result import ClassRecord, FunctionRecord, ParseResult
+
+logger = logging.getLogger(__name__)
+
+try:
+    from tree_sitter import Language, Parser
+except ImportError:  # pragma: no cover - optional at runtime
+    Language = Parser = None
+
+# language -> (grammar module, function returning the grammar pointer)
+GRAMMARS = {
+    'python': ('tree_sitter_python', 'language'),
+    'javascript': ('tree_sitter_javascript', 'language'),
+    'typescript': ('tree_sitter_typescript', 'language_typescript'),
+    'java': ('tree_sitter_java', 'language'),
+    'cpp': ('tree_sitter_cpp', 'language'),
+    'go': ('tree_sitter_go', 'language'),
+}
+
+# Node types that introduce functions, classes and imports, per language
+FUNCTION_NODES = {
+    'python': {'function_definition'},
+    'javascript': {'function_declaration', 'generator_function_declaration', 'method_definition'},
+    'typescript': {'function_declaration', 'generator_function_declaration', 'method_definition'},
+    'java': {'method_declaration', 'constructor_declaration'},
+    'cpp': {'function_definition'},
+    'go': {'function_declaration', 'method_declaration'},
+}
+CLASS_NODES = {
+    'python': {'class_definition'},
+    'javascript': {'class_declaration', 'class'},
+    'typescript': {'class_declaration', 'abstract_class_declaration', 'interface_declaration'},
+    'java': {'class_declaration', 'interface_declaration', 'enum_declaration', 'record_declaration'},
+    'cpp': {'class_specifier', 'struct_specifier'},
+    'go': {'type_spec'},
+}
+IMPORT_NODES = {
+    'python': {'import_statement', 'import_from_statement', 'future_import_statement'},
+    'javascript': {'import_statement'},
+    'typescript': {'import_statement'},
+    'java': {'import_declaration'},
+    'cpp': {'preproc_include'},
+    'go': {'import_spec'},
+}
+# Anonymous functions that take the name of the variable they are assigned to
+ASSIGNED_FUNCTION_NODES = {'arrow_function', 'function_expression', 'function', 'generator_function'}
+
+
+class TreeSitterParser:
+    """Syntax-tree parser: one tree per file, one traversal for all symbols.
+
+    Languages without an installed grammar fall back to MCPParser, so the
+    engine can always be selected.
+    """
+
+    VERSION = "tree-sitter-1"
+
+    EXTENSIONS = {
+        **MCPParser.EXTENSIONS,
+        '.jsx': 'javascript',
+        '.cc': 'cpp',
+        '.hpp': 'cpp',
+        '.go': 'go'
+    }
+
+    def __init__(self):
+        self._fallback = MCPParser()
+        # Grammars and parsers are built once per language and reused
+        self._languages: Dict[str, Any] = {}
+        self._parsers: Dict[str, Any] = {}
+
+    def supports(self, file_path: str) -> bool:
+        """Check whether a file has an extension this parser understands."""
+        return self.detect_language(file_path) != 'unknown'
+
+    def detect_language(self, file_path: str) -> str:
+        """Detect language from file extension ('unknown' if unsupported)."""
+        return self.EXTENSIONS.get(Path(file_path).suffix.lower(), 'unknown')
+
+    def _get_parser(self, language: str):
+        """Return a cached parser for the language, or None without a grammar."""
+        if language in self._parsers:
+            return self._parsers[language]
+
+        parser = None
+        if Parser is not None and language in GRAMMARS:
+            module_name, attr = GRAMMARS[language]
+            try:
+                pointer = getattr(importlib.import_module(module_name), attr)()
+                try:
+                    grammar = Language(pointer, language)
+                except TypeError:  # tree-sitter >= 0.22 dropped the name argument
+                    grammar = Language(pointer)
+                parser = Parser()
+                if hasattr(parser, 'set_language'):
+                    parser.set_language(grammar)
+                else:
+                    parser.language = grammar
+                self._languages[language] = grammar
+            except Exception as e:
+                logger.warning(f"tree-sitter grammar for {language} unavailable, using regex parser: {e}")
+                parser = None
+
+        self._parsers[language] = parser
+        return parser
+
+    def parse_code(self, content: str, file_path: str) -> ParseResult:
+        """Parse any code file based on its extension."""
+        language = self.detect_language(file_path)
+        parser = self._get_parser(language)
+        if parser is None:
+            return self._fallback.parse_code(content, file_path)
+
+        source = content.encode('utf-8')
+        tree = parser.parse(source)
+        return self._walk(tree.root_node, source, language)
+
+    def _walk(self, root, source: bytes, language: str) -> ParseResult:
+        """Collect functions, classes and imports in a single depth-first pass."""
+        functions: List[FunctionRecord] = []
+        classes: List[ClassRecord] = []
+        imports: List[str] = []
+
+        function_nodes = FUNCTION_NODES[language]
+        class_nodes = CLASS_NODES[language]
+        import_nodes = IMPORT_NODES[language]
+
+        def text(node) -> str:
+            return source[node.start_byte:node.end_byte].decode('utf-8', 'replace')
+
+        # (node, enclosing class name, enclosing function name)
+        stack = [(root, None, None)]
+        while stack:
+            node, parent_class, parent_function = stack.pop()
+            node_type = node.type
+            child_class, child_function = parent_class, parent_function
+
+            if node_type in function_nodes:
+                name = self._function_name(node, language, text)
+                if name:
+                    functions.append(self._function_record(
+                        node, name, language, text, parent_class, parent_function
+                    ))
+                    child_function = name
+                    # Functions nested in a method do not belong to the class
+                    child_class = None
+
+            elif node_type == 'variable_declarator':
+                value = node.child_by_field_name('value')
+                name_node = node.child_by_field_name('name')
+                if value is not None and name_node is not None and value.type in ASSIGNED_FUNCTION_NODES:
+                    functions.append(self._function_record(
+                        value, text(name_node), language, text, parent_class, parent_function
+                    ))
+
+            elif node_type in class_nodes:
+                name = self._class_name(node, language, text)
+                if name:
+                    classes.append(ClassRecord(
+                        name, language, node.start_point[0] + 1, node.end_point[0] + 1, parent_class or None
+                    ))
+                    child_class = name
+                    child_function = None
+
+            elif node_type in import_nodes:
+                imports.append(text(node).strip())
+                continue
+
+            # Reverse so siblings are visited in source order
+            for child in reversed(node.named_children):
+                stack.append((child, child_class, child_function))
+
+        return ParseResult(language, "tree-sitter", functions, classes, imports)
+
+    def _function_record(self, node, name: str, language: str, text, parent_class: Optional[str],
+                         parent_function: Optional[str]) -> FunctionRecord:
+        params_node = node.child_by_field_name('parameters')
+        if params_node is None and language == 'cpp':
+            declarator = self._function_declarator(node)
+            params_node = declarator.child_by_field_name('parameters') if declarator else None
+        if params_node is None:
+            # Single-parameter arrow functions: `x => x * 2`
+            single = node.child_by_field_name('parameter')
+            parameters = [text(single)] if single is not None else []
+        else:
+            parameters = [text(p) for p in params_node.named_children if p.type != 'comment']
+
+        record = FunctionRecord(name, language, node.start_point[0] + 1, parameters, node.end_point[0] + 1)
+        if language == 'go' and node.type == 'method_declaration':
+            receiver = node.child_by_field_name('receiver')
+            if receiver is not None:
+                parent_class = self._go_receiver_type(receiver, text)
+        if parent_class:
+            record.parent = parent_class
+        elif parent_function:
+            record.parent_function = parent_function
+        return record
+
+    def _function_name(self, node, language: str, text) -> Optional[str]:
+        if language == 'cpp':
+            declarator = self._function_declarator(node)
+            inner = declarator.child_by_field_name('declarator') if declarator else None
+            return text(inner) if inner is not None else None
+        name_node = node.child_by_field_name('name')
+        return text(name_node) if name_node is not None else None
+
+    def _class_name(self, node, language: str, text) -> Optional[str]:
+        if language == 'go':
+            # Only struct and interface type declarations count as classes
+            type_node = node.child_by_field_name('type')
+            if type_node is None or type_node.type not in ('struct_type', 'interface_type'):
+                return None
+        if language == 'cpp' and node.child_by_field_name('body') is None:
+            # Forward declarations and elaborated type specifiers
+            return None
+        name_node = node.child_by_field_name('name')
+        return text(name_node) if name_node is not None else None
+
+    @staticmethod
+    def _function_declarator(node):
+        """Follow C++ declarators (pointers, references) down to the function declarator."""
+        declarator = node.child_by_field_name('declarator')
+        while declarator is not None and declarator.type != 'function_declarator':
+            declarator = declarator.child_by_field_name('declarator')
+        return declarator
+
+    @staticmethod
+    def _go_receiver_type(receiver, text) -> Optional[str]:
+        for param in receiver.named_children:
+            type_node = param.child_by_field_name('type')
+            if type_node is not None:
+                return text(type_node).lstrip('*')
+        return None
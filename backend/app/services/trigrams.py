@@ -0,0 +1,113 @@
+"""Byte trigrams of file contents and of search patterns."""
+import re
+from typing import List, Set
+
+import numpy as np
+
+# Regex metacharacters that end a run of literal text
+_SPECIAL = set('.^$*+?{}[]()|\\')
+# One escape, including what it consumes: \x41, \u0041, \N{...}, octal
+# \101 and \0, backreferences \1 to \99, or a single escaped character
+_ESCAPE = re.compile(r'\\(?:x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|N\{[^}]*\}|[0-7]{3}|0[0-7]{0,2}|[1-9][0-9]?|.)',
+                     re.DOTALL)
+# A whole character class; "]" right after "[" or "[^" is literal, as is an escaped one
+_CLASS = re.compile(r'\[\^?\]?(?:\\.|[^\]\\])*\]?', re.DOTALL)
+# Global inline flags turning on verbose mode, e.g. (?x) or (?ix)
+_INLINE_VERBOSE = re.compile(r'\(\?[aiLmsux]*x')
+# Under IGNORECASE these also match non-ASCII letters (İ, ı, K, ſ), which
+# index-time ASCII lowercasing does not fold into them
+_UNICODE_FOLDED = re.compile('[iksIKS]')
+
+
+def _codes(data: bytes) -> np.ndarray:
+    raw = np.frombuffer(data.lower(), dtype=np.uint8).astype(np.int32)
+    if raw.size < 3:
+        return np.empty(0, dtype=np.int32)
+    return (raw[:-2] << 16) | (raw[1:-1] << 8) | raw[2:]
+
+
+def content_trigrams(data: bytes) -> List[int]:
+    """Sorted distinct trigrams of a file's bytes."""
+    return np.unique(_codes(bytes(data))).tolist()
+
+
+def _literal_runs(pattern: str) -> List[str]:
+    """Literal substrings every match of ``pattern`` must contain.
+
+    Deliberately conservative: alternation and verbose mode give up
+    entirely, text inside groups is ignored (a group may be optional or
+    a lookaround), and classes and escapes just end the current run.
+    What is returned is therefore always required, though not
+    necessarily all that is.
+    """
+    if '|' in pattern.replace('\\|', '') or _INLINE_VERBOSE.match(pattern):
+        return []
+    runs = []
+    run = []
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern):
+            escape = _ESCAPE.match(pattern, i).group()
+            i += len(escape)
+            if len(escape) == 2 and not escape[1].isalnum() and not depth:
+                run.append(escape[1])
+            else:
+                # \d, \w, \b and friends are classes or assertions, not text,
+                # and \x41 or \1 stand for text that is not spelled out
+                runs.append(''.join(run))
+                run = []
+            continue
+        if char == '[':
+            i = _CLASS.match(pattern, i).end() - 1
+            runs.append(''.join(run))
+            run = []
+        elif char == '(':
+            depth += 1
+            runs.append(''.join(run))
+            run = []
+        elif char == ')':
+            depth = max(depth - 1, 0)
+        elif depth:
+            pass
+        elif char in '*?' or (char == '{' and re.match(r'\{0*[,}]', pattern[i:])):
+            # The previous character may be absent
+            if run:
+                run.pop()
+            runs.append(''.join(run))
+            run = []
+        elif char in _SPECIAL:
+            runs.append(''.join(run))
+            run = []
+        else:
+            run.append(char)
+        if char == '{' and not depth:
+            # Skip the repetition count
+            end = pattern.find('}', i)
+            i = end if end != -1 else len(pattern)
+        i += 1
+    runs.append(''.join(run))
+    return [run for run in runs if len(run) >= 3]
+
+
+def required_trigrams(query: str, regex: bool = False, ignore_case: bool = False,
+                      verbose: bool = False) -> List[int]:
+    """Trigrams a file must contain to possibly match; empty if nothing can be required.
+
+    ``ignore_case`` and ``verbose`` are the pattern's IGNORECASE and
+    VERBOSE flags; whitespace and comments mean nothing in verbose mode.
+    """
+    if regex and verbose:
+        return []
+    runs = _literal_runs(query) if regex else [query]
+    required: Set[int] = set()
+    if ignore_case:
+        runs = [piece for run in runs for piece in _UNICODE_FOLDED.split(run)]
+    for run in runs:
+        codes = _codes(run.encode('utf-8'))
+        if ignore_case:
+            # Only ASCII is folded at index time, so trigrams with other bytes cannot be required
+            codes = codes[((codes & 0x808080) == 0)]
+        required.update(codes.tolist())
+    return sorted(required)
@@ -0,0 +1,227 @@
+"""Named snapshots of a codebase that share unchanged file rows."""
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.code_analysis import Codebase, CodebaseVersion, CodeChunk, CodeFile, Symbol
+from app.services.response_cache import bump_generation
+
+# Paths per IN (...) list
+_PATH_BATCH = 1000
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot label is taken or unknown."""
+
+
+class ManifestDiff(NamedTuple):
+    """How a path -> content hash manifest differs from the stored tree."""
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: int
+
+
+# A CodeFile row is part of generations added_in <= g < removed_in (NULL while
+# current). Ingest never rewrites a row: a changed file gets a new one and the
+# old one is retired, so snapshots share every row that did not change.
+def live(generation: Optional[int] = None):
+    """Condition on CodeFile rows of the current tree, or of the tree as of ``generation``."""
+    if generation is None:
+        return CodeFile.removed_in.is_(None)
+    return and_(
+        CodeFile.added_in <= generation,
+        or_(CodeFile.removed_in.is_(None), CodeFile.removed_in > generation)
+    )
+
+
+def diff_manifests(stored: Dict[str, Optional[str]], manifest: Dict[str, str]) -> ManifestDiff:
+    """Compare stored path -> hash with a manifest of the full new tree."""
+    added, changed = [], []
+    unchanged = 0
+    for path, digest in manifest.items():
+        if path not in stored:
+            added.append(path)
+        elif stored[path] != digest:
+            changed.append(path)
+        else:
+            unchanged += 1
+    removed = [path for path in stored if path not in manifest]
+    return ManifestDiff(sorted(added), sorted(changed), sorted(removed), unchanged)
+
+
+async def stored_files(db: AsyncSession, codebase_id: str,
+                       paths: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Any, Optional[str]]]:
+    """Map file_path -> (id, content_hash) for the current tree, optionally only some paths."""
+    statement = select(CodeFile.file_path, CodeFile.id, CodeFile.content_hash).where(
+        CodeFile.codebase_id == codebase_id, live()
+    )
+    if paths is None:
+        return {path: (file_id, digest) for path, file_id, digest in await db.execute(statement)}
+
+    paths = list(paths)
+    found = {}
+    for start in range(0, len(paths), _PATH_BATCH):
+        rows = await db.execute(statement.where(CodeFile.file_path.in_(paths[start:start + _PATH_BATCH])))
+        found.update((path, (file_id, digest)) for path, file_id, digest in rows)
+    return found
+
+
+async def latest_snapshot(db: AsyncSession, codebase_id: str) -> Optional[CodebaseVersion]:
+    return await db.scalar(
+        select(CodebaseVersion).where(CodebaseVersion.codebase_id == codebase_id).order_by(
+            CodebaseVersion.generation.desc(), CodebaseVersion.created_at.desc()
+        ).limit(1)
+    )
+
+
+async def snapshot_generation(db: AsyncSession, codebase_id: str, label: str) -> int:
+    """Generation a snapshot label points at; raises SnapshotError if there is none."""
+    generation = await db.scalar(
+        select(CodebaseVersion.generation).where(
+            CodebaseVersion.codebase_id == codebase_id, CodebaseVersion.label == label
+        )
+    )
+    if generation is None:
+        raise SnapshotError(f"Unknown version '{label}'")
+    return generation
+
+
+async def retire_files(db: AsyncSession, codebase_id: str, file_ids: List[Any], generation: int):
+    """Take rows out of the current tree as of ``generation``.
+
+    Symbols only index the current tree, so they go either way.
+    """
+    if not file_ids:
+        return
+    await db.execute(delete(Symbol).where(Symbol.file_id.in_(file_ids)))
+    newest = await db.scalar(
+        select(func.max(CodebaseVersion.generation)).where(CodebaseVersion.codebase_id == codebase_id)
+    )
+    if newest is None:
+        await db.execute(delete(CodeFile).where(CodeFile.id.in_(file_ids)))
+        return
+    await db.execute(delete(CodeFile).where(CodeFile.id.in_(file_ids), CodeFile.added_in > newest))
+    await db.execute(
+        update(CodeFile).where(CodeFile.id.in_(file_ids), CodeFile.added_in <= newest).values(
+            removed_in=generation
+        ).execution_options(synchronize_session=False)
+    )
+
+
+async def remove_paths(db: AsyncSession, codebase_id: str, paths: Iterable[str]) -> int:
+    """Remove files from the current tree; returns how many were stored."""
+    stored = await stored_files(db, codebase_id, paths)
+    if not stored:
+        return 0
+    generation = await bump_generation(db, codebase_id)
+    gone = sorted(stored)
+    for start in range(0, len(gone), _PATH_BATCH):
+        batch = gone[start:start + _PATH_BATCH]
+        await retire_files(db, codebase_id, [stored[path][0] for path in batch], generation)
+        # Chunks are keyed by path, not by file id, so they go separately
+        await db.execute(delete(CodeChunk).where(
+            CodeChunk.codebase_id == codebase_id, CodeChunk.file_path.in_(batch)
+        ))
+    return len(gone)
+
+
+def _symbol_names(records: Optional[List[Dict[str, Any]]]) -> Set[str]:
+    names = set()
+    for record in records or []:
+        parent = record.get("parent") or record.get("parent_function")
+        names.add(f"{parent}.{record['name']}" if parent else record["name"])
+    return names
+
+
+async def diff_generations(db: AsyncSession, codebase_id: str, base: int, head: int) -> List[Dict[str, Any]]:
+    """Files added, changed or removed going from ``base`` to ``head``, with their symbol changes.
+
+    Only rows added or retired between the two generations are read, so
+    the cost follows the size of the change, not of the codebase.
+    """
+    low, high = sorted((base, head))
+    rows = await db.execute(
+        select(
+            CodeFile.file_path, CodeFile.content_hash, CodeFile.language, CodeFile.added_in,
+            CodeFile.analysis_result['functions'], CodeFile.analysis_result['classes']
+        ).where(
+            CodeFile.codebase_id == codebase_id,
+            or_(
+                and_(CodeFile.added_in > low, live(high)),
+                and_(live(low), CodeFile.removed_in <= high)
+            )
+        )
+    )
+
+    # path -> [row as of low, row as of high]
+    sides: Dict[str, List[Optional[tuple]]] = {}
+    for file_path, digest, language, added_in, functions, classes in rows:
+        side = 1 if added_in > low else 0
+        sides.setdefault(file_path, [None, None])[side] = (digest, language, functions, classes)
+
+    changes = []
+    for path in sorted(sides):
+        old, new = sides[path]
+        if base > head:
+            old, new = new, old
+        if old is not None and new is not None and old[0] == new[0]:
+            # Replaced and then restored to the same content
+            continue
+        status = "added" if old is None else "removed" if new is None else "changed"
+        old_functions, old_classes = (_symbol_names(old[2]), _symbol_names(old[3])) if old else (set(), set())
+        new_functions, new_classes = (_symbol_names(new[2]), _symbol_names(new[3])) if new else (set(), set())
+        changes.append({
+            "path": path,
+            "status": status,
+            "language": (new or old)[1],
+            "functions_added": sorted(new_functions - old_functions),
+            "functions_removed": sorted(old_functions - new_functions),
+            "classes_added": sorted(new_classes - old_classes),
+            "classes_removed": sorted(old_classes - new_classes)
+        })
+    return changes
+
+
+async def create_snapshot(db: AsyncSession, codebase_id: str, label: str) -> CodebaseVersion:
+    """Record the current tree as snapshot ``label``; the caller commits.
+
+    Locks the codebase row, so the snapshot waits for ingests of the
+    codebase that are in flight and later ones see it before retiring rows.
+    """
+    generation = await db.scalar(
+        select(Codebase.generation).where(Codebase.id == codebase_id).with_for_update()
+    )
+    if generation is None:
+        raise SnapshotError("Codebase not found")
+    taken = await db.scalar(
+        select(CodebaseVersion.label).where(CodebaseVersion.codebase_id == codebase_id, CodebaseVersion.label == label)
+    )
+    if taken is not None:
+        raise SnapshotError(f"Version '{label}' already exists")
+
+    parent = await latest_snapshot(db, codebase_id)
+    counts = {"added": 0, "changed": 0, "removed": 0}
+    if parent is not None:
+        for change in await diff_generations(db, codebase_id, parent.generation, generation):
+            counts[change["status"]] += 1
+        file_count = parent.file_count + counts["added"] - counts["removed"]
+    else:
+        file_count = await db.scalar(
+            select(func.count(CodeFile.id)).where(CodeFile.codebase_id == codebase_id, live())
+        )
+
+    snapshot = CodebaseVersion(
+        codebase_id=codebase_id,
+        label=label,
+        generation=generation,
+        parent=parent.label if parent else None,
+        file_count=file_count,
+        files_added=counts["added"],
+        files_changed=counts["changed"],
+        files_removed=counts["removed"]
+    )
+    db.add(snapshot)
+    await db.flush()
+    return snapshot
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""End-to-end benchmarks of the upload and analysis endpoints.
+
+Runs against the app in-process (through httpx's ASGI transport, using
+DATABASE_URL) or against a running server with --url. A local Postgres
+with the pgvector image from docker-compose is required; the schema
+relies on JSONB, pg_trgm and pgvector, so SQLite cannot stand in.
+
+Usage: python benchmarks/bench_e2e.py [--files N] [--upload-batch N]
+       [--requests N] [--url http://localhost:8000] [--init-db] [--output FILE]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from common import add_corpus_arguments, corpus_from_args, write_report
+from synthetic_repo import repo_zip
+
+API = "/api/v1"
+
+
+def _latencies(samples):
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+async def _timed(call):
+    start = time.perf_counter()
+    response = await call
+    elapsed = time.perf_counter() - start
+    response.raise_for_status()
+    return response, elapsed
+
+
+async def _create_codebase(client, name):
+    response, _ = await _timed(client.post(f"{API}/codebases/", json={"name": name}))
+    return response.json()["id"]
+
+
+async def bench_upload(client, corpus, batch_size, label):
+    """Upload the corpus through /upload in batches; returns throughput and latencies."""
+    codebase_id = await _create_codebase(client, f"bench-upload-{label}")
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in corpus)
+
+    async def upload_all():
+        latencies = []
+        start = time.perf_counter()
+        for offset in range(0, len(corpus), batch_size):
+            files = [
+                ("files", (path, content.encode('utf-8'), "text/plain"))
+                for path, content in corpus[offset:offset + batch_size]
+            ]
+            _, elapsed = await _timed(client.post(f"{API}/codebases/{codebase_id}/upload", files=files))
+            latencies.append(elapsed)
+        return time.perf_counter() - start, latencies
+
+    first, first_latencies = await upload_all()
+    # Same content again: exercises the unchanged-file fast path
+    again, again_latencies = await upload_all()
+    return codebase_id, {
+        "first": {
+            "seconds": round(first, 3),
+            "files_per_second": round(len(corpus) / first, 1),
+            "mb_per_second": round(total_bytes / first / 1e6, 3),
+            "request_latency": _latencies(first_latencies),
+        },
+        "unchanged_reupload": {
+            "seconds": round(again, 3),
+            "files_per_second": round(len(corpus) / again, 1),
+            "request_latency": _latencies(again_latencies),
+        },
+    }
+
+
+async def bench_archive(client, corpus):
+    codebase_id = await _create_codebase(client, "bench-archive")
+    archive = repo_zip(corpus)
+    _, elapsed = await _timed(client.post(
+        f"{API}/codebases/{codebase_id}/archive",
+        files={"archive": ("repo.zip", archive, "application/zip")}
+    ))
+    return {
+        "seconds": round(elapsed, 3),
+        "files_per_second": round(len(corpus) / elapsed, 1),
+        "archive_bytes": len(archive),
+    }
+
+
+async def bench_analysis(client, codebase_id, requests):
+    buffered = []
+    for _ in range(requests):
+        _, elapsed = await _timed(client.get(f"{API}/codebases/{codebase_id}/analysis"))
+        buffered.append(elapsed)
+
+    first_byte = []
+    streamed = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with client.stream("GET", f"{API}/codebases/{codebase_id}/analysis",
+                                 params={"stream": "true"}) as response:
+            response.raise_for_status()
+            first = None
+            async for _ in response.aiter_bytes():
+                if first is None:
+                    first = time.perf_counter() - start
+            streamed.append(time.perf_counter() - start)
+            first_byte.append(first or streamed[-1])
+
+    return {
+        "buffered": _latencies(buffered),
+        "stream_total": _latencies(streamed),
+        "stream_first_byte": _latencies(first_byte),
+    }
+
+
+async def run(args, corpus):
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=600)
+        shutdown = None
+    else:
+        from app.core.database import async_engine
+        from app.main import app
+        from app.services.parse_executor import shutdown_executor
+
+        async def shutdown():
+            shutdown_executor()
+            await async_engine.dispose()
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=600)
+
+    try:
+        results = {}
+        codebase_id, results["upload"] = await bench_upload(client, corpus, args.upload_batch, args.seed)
+        results["archive"] = await bench_archive(client, corpus)
+        results["analysis"] = await bench_analysis(client, codebase_id, args.requests)
+        return results
+    finally:
+        await client.aclose()
+        if shutdown is not None:
+            await shutdown()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(arg_parser, files=2000)
+    arg_parser.add_argument('--upload-batch', type=int, default=100, help='files per /upload request')
+    arg_parser.add_argument('--requests', type=int, default=20, help='/analysis requests per mode')
+    arg_parser.add_argument('--url', help='benchmark a running server instead of the app in-process')
+    arg_parser.add_argument('--init-db', action='store_true', help='create extensions and tables first')
+    args = arg_parser.parse_args()
+
+    if args.init_db:
+        from scripts.init_db import init_database
+        init_database()
+
+    corpus = corpus_from_args(args)
+    results = asyncio.run(run(args, corpus))
+    write_report("e2e", args, corpus, results)
+
+
+if __name__ == "__main__":
+    main()
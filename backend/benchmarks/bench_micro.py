@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks of the per-file CPU stages on a synthetic repository.
+
+Times CodeParser and MCPParser (and optionally the tree-sitter engine,
+the chunker and the embedder) over the same seeded corpus and reports
+the best of --repeat runs as JSON.
+
+Usage: python benchmarks/bench_micro.py [--files N] [--repeat N]
+       [--stages code,mcp,treesitter,chunker,embeddings] [--output FILE]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from common import add_corpus_arguments, corpus_from_args, write_report
+
+STAGES = ('code', 'mcp', 'treesitter', 'chunker', 'embeddings')
+
+
+def _best_of(repeat, run):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), timings
+
+
+def _summary(seconds, timings, files, total_bytes):
+    return {
+        "seconds": round(seconds, 5),
+        "all_seconds": [round(t, 5) for t in timings],
+        "files_per_second": round(files / seconds, 1),
+        "mb_per_second": round(total_bytes / seconds / 1e6, 3),
+    }
+
+
+def bench_parser(parse, corpus, repeat):
+    """Time a parse function overall and per language."""
+    parse_all = lambda: [parse(path, content) for path, content in corpus]  # noqa: E731
+    parse_all()  # Warm up caches and lazy grammar loading
+    seconds, timings = _best_of(repeat, parse_all)
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in corpus)
+    result = _summary(seconds, timings, len(corpus), total_bytes)
+
+    by_language = defaultdict(list)
+    for path, content in corpus:
+        by_language[os.path.splitext(path)[1]].append((path, content))
+    result["by_extension"] = {}
+    for extension, files in sorted(by_language.items()):
+        seconds, timings = _best_of(repeat, lambda: [parse(path, content) for path, content in files])
+        size = sum(len(content.encode('utf-8')) for _, content in files)
+        result["by_extension"][extension] = _summary(seconds, timings, len(files), size)
+    return result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(arg_parser)
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per stage; the fastest is reported')
+    arg_parser.add_argument('--stages', default='code,mcp,chunker,embeddings',
+                            help=f"comma-separated subset of {','.join(STAGES)}")
+    args = arg_parser.parse_args()
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        arg_parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    corpus = corpus_from_args(args)
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in corpus)
+    results = {}
+
+    if 'code' in stages:
+        from app.services.code_parser import CodeParser
+        parser = CodeParser()
+        results["code_parser"] = bench_parser(parser.parse_file, corpus, args.repeat)
+    if 'mcp' in stages:
+        from app.services.mcp_parser import MCPParser
+        parser = MCPParser()
+        results["mcp_parser"] = bench_parser(
+            lambda path, content: parser.parse_code(content, path), corpus, args.repeat
+        )
+    if 'treesitter' in stages:
+        from app.services.treesitter_parser import TreeSitterParser
+        parser = TreeSitterParser()
+        results["treesitter_parser"] = bench_parser(
+            lambda path, content: parser.parse_code(content, path), corpus, args.repeat
+        )
+
+    if 'chunker' in stages or 'embeddings' in stages:
+        from app.services.mcp_parser import MCPParser
+        parsed = [(path, content, MCPParser().parse_code(content, path)) for path, content in corpus]
+
+    if 'chunker' in stages:
+        from app.services.chunker import chunk_file
+        seconds, timings = _best_of(args.repeat, lambda: [chunk_file(content, p) for _, content, p in parsed])
+        results["chunker"] = _summary(seconds, timings, len(corpus), total_bytes)
+    if 'embeddings' in stages:
+        from app.services.embeddings import embed_rows
+        rows = [{"file_path": path, "analysis_result": p.to_dict()} for path, _, p in parsed]
+        seconds, timings = _best_of(args.repeat, lambda: embed_rows([dict(row) for row in rows]))
+        results["embeddings"] = _summary(seconds, timings, len(corpus), total_bytes)
+
+    write_report("micro", args, corpus, results)
+
+
+if __name__ == "__main__":
+    main()
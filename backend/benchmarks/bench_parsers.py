@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Compare parser engines for speed and symbol-extraction accuracy.
+
+Usage: python benchmarks/bench_parsers.py [--repeat N] [--files N] [--large-mb N] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from synthetic_repo import generate_repo
+
+from app.services.mcp_parser import MCPParser, ScannerParser
+from app.services.treesitter_parser import TreeSitterParser
+
+# Hand-labelled files covering cases regex parsing gets wrong:
+# nested and decorated defs, keywords inside strings and comments.
+ACCURACY_CASES = [
+    {
+        "path": "cases/shop.py",
+        "content": '''import os
+from typing import List, Dict
+
+HELP = """
+class NotAClass:
+    def not_a_function(self): pass
+"""
+
+# class CommentedOut: pass
+
+@dataclass
+class ShoppingCart:
+    def __init__(self):
+        self.items = []
+
+    @property
+    def total(self) -> float:
+        def _price(item):
+            return item["price"]
+        return sum(_price(i) for i in self.items)
+
+def process_order(cart: ShoppingCart,
+                  discount: float = 0.0) -> Dict[str, float]:
+    return {"total": cart.total}
+''',
+        "functions": {"__init__", "total", "_price", "process_order"},
+        "classes": {"ShoppingCart"},
+    },
+    {
+        "path": "cases/cart.js",
+        "content": '''import { useState } from "react";
+
+// function commentedOut() {}
+const label = "class Fake {}";
+
+function calculateTotal(items) {
+    return items.reduce((sum, item) => sum + item.price, 0);
+}
+
+const applyTax = (total, rate) => total * (1 + rate);
+
+class ShoppingCart {
+    constructor() {
+        this.items = [];
+    }
+
+    addItem(product, price) {
+        this.items.push({ product, price });
+        return this.items.length;
+    }
+}
+''',
+        "functions": {"calculateTotal", "applyTax", "constructor", "addItem"},
+        "classes": {"ShoppingCart"},
+    },
+    {
+        "path": "cases/Cart.java",
+        "content": '''import java.util.List;
+
+public class Cart {
+    private List<Item> items;
+
+    public Cart() {}
+
+    public double total(double rate) {
+        return 0.0;
+    }
+}
+''',
+        "functions": {"Cart", "total"},
+        "classes": {"Cart"},
+    },
+    {
+        "path": "cases/links.js",
+        "content": '''const s = "function notReal(";
+const docs = "http://example.com"; function afterUrl() {}
+const pattern = /[`'"]/g;
+const help = `
+function inTemplate() {}
+`;
+/* class InComment {} */ export class Linker {}
+''',
+        "functions": {"afterUrl"},
+        "classes": {"Linker"},
+    },
+]
+
+# Real fixtures shipped with the repo, used for the speed comparison
+FIXTURES = ['test_file.py', 'test_advanced.py', 'test.js']
+
+
+def _score(found, expected):
+    true_positives = len(found & expected)
+    precision = true_positives / len(found) if found else 1.0
+    recall = true_positives / len(expected) if expected else 1.0
+    return round(precision, 3), round(recall, 3)
+
+
+def accuracy(parser):
+    results = {}
+    for case in ACCURACY_CASES:
+        parsed = parser.parse_code(case["content"], case["path"])
+        functions = {record.name for record in parsed.functions}
+        classes = {record.name for record in parsed.classes}
+        fn_precision, fn_recall = _score(functions, case["functions"])
+        cls_precision, cls_recall = _score(classes, case["classes"])
+        results[case["path"]] = {
+            "function_precision": fn_precision,
+            "function_recall": fn_recall,
+            "class_precision": cls_precision,
+            "class_recall": cls_recall,
+        }
+    return results
+
+
+def load_corpus(files=0):
+    if files:
+        return generate_repo(files, 42)
+    base = os.path.join(os.path.dirname(__file__), '..')
+    corpus = [(case["path"], case["content"]) for case in ACCURACY_CASES]
+    for name in FIXTURES:
+        with open(os.path.join(base, name), encoding='utf-8') as f:
+            corpus.append((name, f.read()))
+    return corpus
+
+
+def speed(parser, corpus, repeat):
+    # Warm up grammar and parser caches before timing
+    for path, content in corpus:
+        parser.parse_code(content, path)
+
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in corpus) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path, content in corpus:
+            parser.parse_code(content, path)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 4),
+        "files_per_second": round(len(corpus) * repeat / elapsed, 1),
+        "mb_per_second": round(total_bytes / elapsed / 1e6, 2),
+    }
+
+
+def large_files(corpus, megabytes):
+    """One file per language of about ``megabytes`` MB, built by repeating the corpus."""
+    files = {}
+    for path, content in corpus:
+        extension = os.path.splitext(path)[1]
+        if extension in ('.py', '.js'):
+            files.setdefault(extension, []).append(content)
+    large = []
+    for extension, contents in sorted(files.items()):
+        text = '\n'.join(contents)
+        copies = max(1, int(megabytes * 1e6 // len(text.encode('utf-8'))))
+        large.append((f"large{extension}", '\n'.join([text] * copies)))
+    return large
+
+
+def large_speed(parsers, corpus, repeat):
+    """Seconds per parse of each multi-MB file (best of ``repeat``), per engine."""
+    results = {}
+    for path, content in corpus:
+        size = len(content.encode('utf-8'))
+        results[path] = {"mb": round(size / 1e6, 2)}
+        for name, parser in parsers:
+            best = min(_time_once(parser, content, path) for _ in range(repeat))
+            results[path][name] = round(best, 4)
+    return results
+
+
+def _time_once(parser, content, path):
+    start = time.perf_counter()
+    parser.parse_code(content, path)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=200, help='passes over the corpus')
+    arg_parser.add_argument('--files', type=int, default=0,
+                            help='time a synthetic repo of this many files instead of the fixtures')
+    arg_parser.add_argument('--large-mb', type=float, default=4.0,
+                            help='size of the single-file Python and JS inputs for the large-file timing')
+    arg_parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.files)
+    parsers = (("mcp", MCPParser()), ("scanner", ScannerParser()), ("treesitter", TreeSitterParser()))
+    report = {}
+    for name, parser in parsers:
+        report[name] = {"speed": speed(parser, corpus, args.repeat), "accuracy": accuracy(parser)}
+    # Multi-MB files, where per-file overhead no longer hides the scanning cost
+    large = large_speed(parsers, large_files(generate_repo(2000, 42), args.large_mb), 3)
+
+    if args.json:
+        print(json.dumps({"engines": report, "large_files": large}, indent=2))
+        return
+
+    for name, result in report.items():
+        s = result["speed"]
+        print(f"{name:<11} {s['files_per_second']:>10} files/s {s['mb_per_second']:>8} MB/s")
+        for path, scores in result["accuracy"].items():
+            print(f"    {path:<18} functions P={scores['function_precision']} R={scores['function_recall']}"
+                  f"  classes P={scores['class_precision']} R={scores['class_recall']}")
+    for path, timings in large.items():
+        times = "  ".join(f"{name} {timings[name]}s" for name, _ in parsers)
+        speedups = ", ".join(
+            f"{timings[name] / timings['scanner']:.2f}x vs {name}" for name, _ in parsers if name != "scanner"
+        )
+        print(f"{path:<9} {timings['mb']:>5} MB  {times}  scanner speedup: {speedups}")
+
+
+if __name__ == "__main__":
+    main()
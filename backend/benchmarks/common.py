@@ -0,0 +1,62 @@
+"""Shared helpers for the benchmark scripts: corpus options and JSON reports."""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from synthetic_repo import DEFAULT_MIX, generate_repo, parse_mix
+
+
+def add_corpus_arguments(arg_parser: argparse.ArgumentParser, files: int = 1000):
+    """Options describing the synthetic repository a benchmark runs on."""
+    group = arg_parser.add_argument_group('synthetic corpus')
+    group.add_argument('--files', type=int, default=files, help='number of files')
+    group.add_argument('--seed', type=int, default=42, help='generator seed')
+    group.add_argument('--min-lines', type=int, default=20)
+    group.add_argument('--max-lines', type=int, default=400)
+    group.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX,
+                       help='language weights, e.g. python=0.6,javascript=0.3,typescript=0.1')
+    arg_parser.add_argument('--output', help='write the JSON report here instead of stdout')
+
+
+def corpus_from_args(args):
+    return generate_repo(args.files, args.seed, args.min_lines, args.max_lines, args.mix)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_report(name: str, args, corpus, results: dict):
+    """Print or save a report that compare.py can diff against another run."""
+    report = {
+        "benchmark": name,
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.utcnow().isoformat() + 'Z',
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "corpus": {
+            "files": len(corpus),
+            "bytes": sum(len(content.encode('utf-8')) for _, content in corpus),
+            "seed": args.seed,
+            "min_lines": args.min_lines,
+            "max_lines": args.max_lines,
+            "mix": args.mix,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Compare two benchmark reports and flag regressions.
+
+Throughput metrics (``*_per_second``) regress when they drop, timing
+metrics (``seconds``, ``*_ms``) when they grow. Exits with status 1 if
+any metric regressed by more than --threshold percent.
+
+Usage: python benchmarks/compare.py BASELINE.json CANDIDATE.json [--threshold 10] [--json]
+"""
+import argparse
+import json
+import sys
+
+
+def _flatten(results, prefix=''):
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def _higher_is_better(metric):
+    leaf = metric.rsplit('.', 1)[-1]
+    if leaf.endswith('_per_second'):
+        return True
+    if leaf == 'seconds' or leaf.endswith('_ms'):
+        return False
+    return None  # Counts and sizes are informational
+
+
+def compare(baseline, candidate, threshold):
+    base = dict(_flatten(baseline["results"]))
+    rows = []
+    for metric, value in _flatten(candidate["results"]):
+        direction = _higher_is_better(metric)
+        if metric not in base or direction is None or not base[metric]:
+            continue
+        change = (value - base[metric]) / base[metric] * 100
+        worse = -change if direction else change
+        rows.append({
+            "metric": metric,
+            "baseline": base[metric],
+            "candidate": value,
+            "change_percent": round(change, 1),
+            "regression": worse > threshold,
+        })
+    return rows
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('baseline')
+    arg_parser.add_argument('candidate')
+    arg_parser.add_argument('--threshold', type=float, default=10.0, help='allowed slowdown in percent')
+    arg_parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = arg_parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline.get("corpus") != candidate.get("corpus"):
+        print("warning: reports were produced from different corpora", file=sys.stderr)
+
+    rows = compare(baseline, candidate, args.threshold)
+    if args.json:
+        print(json.dumps({"baseline": baseline.get("commit"), "candidate": candidate.get("commit"),
+                          "metrics": rows}, indent=2))
+    else:
+        print(f"{baseline.get('commit')} -> {candidate.get('commit')}")
+        for row in rows:
+            flag = '  REGRESSION' if row["regression"] else ''
+            print(f"  {row['metric']:<55} {row['baseline']:>12} {row['candidate']:>12} "
+                  f"{row['change_percent']:>+7.1f}%{flag}")
+
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
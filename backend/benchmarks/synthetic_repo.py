@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Seeded generator of synthetic source repositories for benchmarks.
+
+The same seed and options always produce byte-identical files, so runs
+on different commits measure the same input. Files import each other,
+nest methods in classes and hide keywords in strings and comments, so
+every stage (parsing, symbols, chunks, dependency graph) has work to do.
+
+Usage: python benchmarks/synthetic_repo.py OUT_DIR [--files N] [--seed S]
+       [--min-lines N] [--max-lines N] [--mix python=0.6,javascript=0.3,typescript=0.1]
+       [--zip]
+"""
+import argparse
+import io
+import math
+import os
+import random
+import zipfile
+from typing import Dict, List, Tuple
+
+EXTENSIONS = {'python': '.py', 'javascript': '.js', 'typescript': '.ts', 'java': '.java'}
+DEFAULT_MIX = {'python': 0.6, 'javascript': 0.3, 'typescript': 0.1}
+
+_WORDS = [
+    'order', 'cart', 'item', 'price', 'user', 'account', 'invoice', 'payment', 'report', 'cache',
+    'session', 'token', 'parser', 'node', 'graph', 'queue', 'worker', 'event', 'config', 'store',
+    'index', 'record', 'batch', 'stream', 'buffer', 'client', 'server', 'request', 'response', 'job'
+]
+_VERBS = ['get', 'set', 'load', 'save', 'build', 'parse', 'render', 'update', 'compute', 'validate']
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "python=0.6,javascript=0.4" into normalised language weights."""
+    mix = {}
+    for part in text.split(','):
+        language, _, weight = part.partition('=')
+        if language.strip() not in EXTENSIONS:
+            raise ValueError(f"Unknown language '{language}', expected one of {sorted(EXTENSIONS)}")
+        mix[language.strip()] = float(weight or 1)
+    total = sum(mix.values())
+    return {language: weight / total for language, weight in mix.items()}
+
+
+class _Writer:
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+
+    def name(self, capital: bool = False) -> str:
+        words = [self.rng.choice(_WORDS) for _ in range(self.rng.randint(1, 2))]
+        if capital:
+            return ''.join(word.capitalize() for word in words)
+        return self.rng.choice(_VERBS) + '_' + '_'.join(words)
+
+    def camel(self, name: str) -> str:
+        head, *rest = name.split('_')
+        return head + ''.join(part.capitalize() for part in rest)
+
+    def params(self) -> List[str]:
+        return self.rng.sample(_WORDS, self.rng.randint(0, 4))
+
+
+def _python_file(w: _Writer, module: str, siblings: List[str], lines: int) -> str:
+    out = ['"""Synthetic module %s.\n\nclass NotReal: documentation mentioning def fake(): pass\n"""' % module]
+    out += ['import os', 'from typing import Any, Dict, List']
+    for target in w.rng.sample(siblings, min(len(siblings), w.rng.randint(0, 3))):
+        out.append(f"from {target} import *")
+    out.append('')
+    while len(out) < lines:
+        if w.rng.random() < 0.35:
+            cls = w.name(capital=True)
+            out += ['', f"class {cls}:", f'    """{cls} keeps "def inside_string():" out of the symbol table."""', '']
+            for _ in range(w.rng.randint(1, 5)):
+                params = ', '.join(['self'] + w.params())
+                out += [f"    def {w.name()}({params}):", "        # def commented_out(): pass",
+                        "        total = 0", "        for value in range(10):",
+                        "            total += value", "        return total", '']
+        else:
+            fn = w.name()
+            out += ['', f"def {fn}({', '.join(w.params())}):", f"    label = 'class Fake: {fn}'",
+                    "    def helper(x):", "        return x * 2", "    return helper(len(label))", '']
+    return '\n'.join(out) + '\n'
+
+
+def _js_file(w: _Writer, path: str, siblings: List[str], lines: int, typescript: bool) -> str:
+    out = ['/* Synthetic module. function notReal() {} */']
+    for target in w.rng.sample(siblings, min(len(siblings), w.rng.randint(0, 3))):
+        relative = os.path.relpath(target, os.path.dirname(path)).rsplit('.', 1)[0]
+        if not relative.startswith('.'):
+            relative = './' + relative
+        out.append(f"import {{ {w.camel(w.name())} }} from '{relative}';")
+    out.append('')
+    typed = ': number' if typescript else ''
+    while len(out) < lines:
+        roll = w.rng.random()
+        if roll < 0.3:
+            cls = w.name(capital=True)
+            out += [f"export class {cls} {{", "    constructor() {", "        this.items = [];", "    }"]
+            for _ in range(w.rng.randint(1, 4)):
+                out += [f"    {w.camel(w.name())}({', '.join(w.params())}) {{",
+                        "        // function commentedOut() {}", "        return this.items.length;", "    }"]
+            out += ['}', '']
+        elif roll < 0.6:
+            out += [f"const {w.camel(w.name())} = ({', '.join(w.params())}){typed} => {{",
+                    "    const text = `function inTemplate() {}`;", "    return text.length;", '};', '']
+        else:
+            out += [f"export function {w.camel(w.name())}({', '.join(w.params())}){typed} {{",
+                    "    let total = 0;", "    for (let i = 0; i < 10; i++) { total += i; }",
+                    "    return total;", '}', '']
+    return '\n'.join(out) + '\n'
+
+
+def _java_file(w: _Writer, lines: int) -> Tuple[str, str]:
+    cls = w.name(capital=True)
+    out = ['package synthetic;', '', 'import java.util.List;', '', f"public class {cls} {{"]
+    while len(out) < lines - 1:
+        out += [f"    public int {w.camel(w.name())}(int a, int b) {{", "        return a + b;", "    }", '']
+    out.append('}')
+    return cls, '\n'.join(out) + '\n'
+
+
+def generate_repo(
+    files: int = 1000,
+    seed: int = 42,
+    min_lines: int = 20,
+    max_lines: int = 400,
+    mix: Dict[str, float] = None
+) -> List[Tuple[str, str]]:
+    """Return (path, content) pairs of a synthetic repository.
+
+    File lengths follow a log-uniform distribution between min_lines and
+    max_lines, so most files are small and a few are large, as in real
+    repositories. Files end after the definition that reaches their
+    length, so they may run a few lines over.
+    """
+    rng = random.Random(seed)
+    w = _Writer(rng)
+    mix = mix or DEFAULT_MIX
+    languages = list(mix)
+    weights = [mix[language] for language in languages]
+
+    plan = []
+    for number in range(files):
+        language = rng.choices(languages, weights)[0]
+        package = f"pkg{number % max(1, files // 50)}"
+        lines = int(math.exp(rng.uniform(math.log(min_lines), math.log(max_lines))))
+        plan.append((language, package, number, lines))
+
+    # Imports point at modules generated earlier, like a layered code base
+    python_modules: List[str] = []
+    js_paths: List[str] = []
+    repo = []
+    for language, package, number, lines in plan:
+        if language == 'python':
+            module = f"src.{package}.mod{number}"
+            repo.append((f"src/{package}/mod{number}.py", _python_file(w, module, python_modules[-50:], lines)))
+            python_modules.append(module)
+        elif language == 'java':
+            cls, content = _java_file(w, lines)
+            repo.append((f"src/{package}/{cls}{number}.java", content))
+        else:
+            path = f"src/{package}/mod{number}{EXTENSIONS[language]}"
+            repo.append((path, _js_file(w, path, js_paths[-50:], lines, language == 'typescript')))
+            js_paths.append(path)
+    return repo
+
+
+def repo_zip(repo: List[Tuple[str, str]]) -> bytes:
+    """Pack a generated repository into an in-memory zip archive."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for path, content in repo:
+            archive.writestr(path, content)
+    return buffer.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('out', help='directory to write into (or zip path with --zip)')
+    arg_parser.add_argument('--files', type=int, default=1000)
+    arg_parser.add_argument('--seed', type=int, default=42)
+    arg_parser.add_argument('--min-lines', type=int, default=20)
+    arg_parser.add_argument('--max-lines', type=int, default=400)
+    arg_parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help='language weights')
+    arg_parser.add_argument('--zip', action='store_true', help='write a single zip archive')
+    args = arg_parser.parse_args()
+
+    repo = generate_repo(args.files, args.seed, args.min_lines, args.max_lines, args.mix)
+    if args.zip:
+        with open(args.out, 'wb') as f:
+            f.write(repo_zip(repo))
+    else:
+        for path, content in repo:
+            target = os.path.join(args.out, path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(content)
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in repo)
+    print(f"Wrote {len(repo)} files, {total_bytes / 1e6:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
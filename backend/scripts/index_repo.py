@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""Index a local checkout straight into the database, without the HTTP API.
+
+The tree is walked with os.scandir on a thread pool, honouring
+.gitignore. Worker processes read files through mmap, then hash, parse,
+chunk and compress them, so file contents never cross a process
+boundary on the way in. Rows go through the same bulk writer as the API,
+committed every --commit-every files; --resume skips paths an earlier,
+interrupted run already committed.
+
+--snapshot records the indexed tree as a named version (--version, or
+git HEAD). --incremental reads only the files git reports as changed
+since the codebase's latest snapshot, whose label must be a commit of
+the checkout, so re-indexing a new commit costs time proportional to
+the change rather than to the repository.
+
+Usage: python scripts/index_repo.py PATH [--name NAME | --codebase-id ID]
+       [--resume] [--prune] [--incremental] [--snapshot] [--version LABEL]
+       [--workers N] [--commit-every N] [--no-gitignore]
+"""
+import argparse
+import asyncio
+import mmap
+import os
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, async_engine
+from app.schemas.code_analysis import Codebase
+from app.services.archive_reader import BINARY_SNIFF_BYTES
+from app.services.blob_store import blob_row, store_blob_rows
+from app.services.bulk_writer import CodeFileBulkWriter
+from app.services.chunker import chunk_file
+from app.services.dependency_graph import build_graph
+from app.services.ingest import FileOutcome, IngestStats, batch_outcomes, code_file_row
+from app.services.parse_cache import content_hash
+from app.services.parse_executor import available_cores
+from app.services.parser_registry import get_parser
+from app.services.repo_walk import walk_repo
+from app.services.response_cache import bump_generation
+from app.services.versions import create_snapshot, latest_snapshot, remove_paths, stored_files
+
+# Files handed to a worker per task
+TASK_SIZE = 64
+
+
+def _index_file(parser, codebase_id: str, path: str, rel: str, stored: Optional[str],
+                max_file_bytes: int) -> Tuple[FileOutcome, Any, Any, Any]:
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > max_file_bytes:
+            return FileOutcome(rel, "skipped", reason=f"file too large ({size} bytes)"), None, None, None
+        # Empty files cannot be mapped
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+    try:
+        if b'\x00' in data[:BINARY_SNIFF_BYTES]:
+            return FileOutcome(rel, "skipped", reason="binary file"), None, None, None
+        # Hashing, decoding and compression read the mapping without copying it first
+        digest = content_hash(data)
+        if digest == stored:
+            return FileOutcome(rel, "unchanged"), None, None, None
+        try:
+            content_str = str(data, 'utf-8')
+        except UnicodeDecodeError:
+            return FileOutcome(rel, "skipped", reason="not valid UTF-8"), None, None, None
+
+        try:
+            parsed = parser.parse_code(content_str, rel)
+        except Exception as e:
+            return FileOutcome(rel, "failed", reason=str(e)), None, None, None
+        row = code_file_row(codebase_id, rel, content_str, parsed, digest)
+        return FileOutcome(rel, "processed", parsed=parsed), row, blob_row(digest, data), chunk_file(content_str, parsed)
+    finally:
+        if size:
+            data.close()
+
+
+def index_files(codebase_id: str, files: List[Tuple[str, str, Optional[str]]],
+                max_file_bytes: int) -> List[Tuple[FileOutcome, Any, Any, Any]]:
+    """Read, hash, parse, chunk and compress files inside a worker process.
+
+    ``files`` are (absolute path, relative path, stored content hash).
+    Returns (outcome, row, blob row, chunks) per file; all but the
+    outcome are None unless the file was processed.
+    """
+    parser = get_parser()  # Built once per worker process
+    results = []
+    for path, rel, stored in files:
+        try:
+            results.append(_index_file(parser, codebase_id, path, rel, stored, max_file_bytes))
+        except OSError as e:
+            results.append((FileOutcome(rel, "failed", reason=str(e)), None, None, None))
+    return results
+
+
+def _git(path: str, *argv: str) -> str:
+    return subprocess.run(['git', *argv], cwd=path, capture_output=True, text=True, check=True).stdout
+
+
+def _git_head(path: str) -> Optional[str]:
+    try:
+        return _git(path, 'rev-parse', 'HEAD').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _git_changes(path: str, base: str, use_gitignore: bool) -> Tuple[List[str], List[str]]:
+    """(added or modified, deleted) paths between commit ``base`` and the working tree."""
+    changed, deleted = [], []
+    fields = _git(path, 'diff', '--name-status', '--no-renames', '--relative', '-z', base).split('\0')
+    for status, rel in zip(fields[0::2], fields[1::2]):
+        (deleted if status == 'D' else changed).append(rel)
+    # Untracked files are part of the working tree too
+    others = _git(path, 'ls-files', '--others', '-z', *(['--exclude-standard'] if use_gitignore else []))
+    changed.extend(rel for rel in others.split('\0') if rel)
+    return changed, deleted
+
+
+async def _resolve_codebase(db, args) -> str:
+    if args.codebase_id:
+        codebase = await db.get(Codebase, uuid.UUID(args.codebase_id))
+        if codebase is None:
+            sys.exit(f"Codebase {args.codebase_id} not found")
+        return str(codebase.id)
+
+    codebase = Codebase(
+        name=args.name or os.path.basename(os.path.abspath(args.path)),
+        version=args.version or _git_head(args.path)
+    )
+    db.add(codebase)
+    await db.commit()
+    print(f"Created codebase {codebase.id} ({codebase.name} {codebase.version or ''})", flush=True)
+    return str(codebase.id)
+
+
+class _Progress:
+    def __init__(self, stats: IngestStats):
+        self.stats = stats
+        self.start = time.perf_counter()
+
+    def report(self, label: str = "indexed"):
+        done = sum(self.stats.counts[key] for key in ("processed", "unchanged", "skipped", "failed"))
+        elapsed = time.perf_counter() - self.start
+        counts = ', '.join(f"{key} {value}" for key, value in self.stats.counts.items()
+                           if value and not key.startswith('cache'))
+        print(f"  {label} {done} files in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.0f} files/s): {counts}",
+              flush=True)
+
+
+async def index_repo(args) -> IngestStats:
+    """Walk, parse and load one checkout; returns the per-status counts."""
+    parser = get_parser()
+    stats = IngestStats()
+    progress = _Progress(stats)
+
+    async with AsyncSessionLocal() as db:
+        codebase_id = await _resolve_codebase(db, args)
+        deleted: List[str] = []
+        if args.incremental:
+            base = await latest_snapshot(db, codebase_id)
+            if base is None:
+                sys.exit("--incremental needs an earlier snapshot of the codebase")
+            try:
+                changed, deleted = _git_changes(args.path, base.label, not args.no_gitignore)
+            except (OSError, subprocess.CalledProcessError) as e:
+                sys.exit(f"Cannot diff against snapshot {base.label}: {getattr(e, 'stderr', '') or e}")
+            root = os.path.abspath(args.path)
+            files = [
+                (os.path.join(root, rel), rel) for rel in changed
+                if parser.supports(rel) and os.path.isfile(os.path.join(root, rel))
+            ]
+            print(f"{len(files)} changed and {len(deleted)} deleted files since {base.label}", flush=True)
+            existing = await stored_files(db, codebase_id, [rel for _, rel in files])
+        else:
+            files = walk_repo(args.path, not args.no_gitignore, parser.supports, args.walk_threads)
+            existing = await stored_files(db, codebase_id)
+            if existing:
+                print(f"Codebase already has {len(existing)} files", flush=True)
+
+        seen = set()
+
+        def tasks():
+            task = []
+            for path, rel in files:
+                seen.add(rel)
+                stored = existing.get(rel)
+                if stored and args.resume:
+                    # Committed by an earlier run; not read again
+                    stats.record(FileOutcome(rel, "unchanged"))
+                    continue
+                task.append((path, rel, stored[1] if stored else None))
+                if len(task) == TASK_SIZE:
+                    yield task
+                    task = []
+            if task:
+                yield task
+
+        writer = CodeFileBulkWriter(db, codebase_id)
+        since_commit = 0
+        processed_since_commit = False
+
+        async def checkpoint():
+            nonlocal since_commit, processed_since_commit
+            for outcome in batch_outcomes(await writer.flush()):
+                stats.record(outcome)
+            if processed_since_commit:
+                await bump_generation(db, codebase_id)
+            await db.commit()
+            since_commit = 0
+            processed_since_commit = False
+            progress.report()
+
+        loop = asyncio.get_running_loop()
+        max_in_flight = 2 * args.workers
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            pending = set()
+            exhausted = False
+            batches = tasks()
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_in_flight:
+                    task = next(batches, None)
+                    if task is None:
+                        exhausted = True
+                    else:
+                        pending.add(loop.run_in_executor(
+                            pool, index_files, codebase_id, task, settings.ARCHIVE_MAX_FILE_BYTES
+                        ))
+                if not pending:
+                    break
+
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results = future.result()
+                    # Contents go to the blob store before any row references them
+                    await store_blob_rows(db, [blob for _, _, blob, _ in results if blob is not None])
+                    for outcome, row, _, chunks in results:
+                        if row is None:
+                            stats.record(outcome)
+                            continue
+                        processed_since_commit = True
+                        replaces = existing.get(outcome.path, (None,))[0]
+                        for flushed in batch_outcomes(await writer.add(row, replaces, outcome, chunks)):
+                            stats.record(flushed)
+                    since_commit += len(results)
+                    if since_commit >= args.commit_every:
+                        await checkpoint()
+
+        await checkpoint()
+
+        pruned = 0
+        if args.incremental:
+            pruned = await remove_paths(db, codebase_id, deleted)
+        elif args.prune:
+            pruned = await remove_paths(db, codebase_id, [path for path in existing if path not in seen])
+        if pruned:
+            await db.commit()
+            print(f"Pruned {pruned} files no longer in the checkout", flush=True)
+
+        if stats.counts["processed"] or pruned:
+            print("Building dependency graph", flush=True)
+            await build_graph(db, codebase_id)
+            await db.commit()
+
+        if args.snapshot:
+            snapshot = await create_snapshot(db, codebase_id, args.version or _git_head(args.path))
+            await db.commit()
+            print(f"Recorded version {snapshot.label}: {snapshot.file_count} files, {snapshot.files_added} added, "
+                  f"{snapshot.files_changed} changed, {snapshot.files_removed} removed", flush=True)
+
+    progress.report("done:")
+    print(f"Codebase id: {codebase_id}")
+    return stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('path', help='checkout to index')
+    target = arg_parser.add_mutually_exclusive_group()
+    target.add_argument('--name', help='name of the codebase to create (default: directory name)')
+    target.add_argument('--codebase-id', help='index into an existing codebase')
+    arg_parser.add_argument('--version', help='version of a new codebase and label of --snapshot (default: git HEAD)')
+    arg_parser.add_argument('--resume', action='store_true',
+                            help='skip paths already stored, to continue an interrupted run')
+    arg_parser.add_argument('--prune', action='store_true', help='delete stored files missing from the checkout')
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help='only read files git reports changed since the latest snapshot')
+    arg_parser.add_argument('--snapshot', action='store_true', help='record the indexed tree as a named version')
+    arg_parser.add_argument('--workers', type=int, default=available_cores(), help='parser processes')
+    arg_parser.add_argument('--walk-threads', type=int, default=8, help='threads listing directories')
+    arg_parser.add_argument('--commit-every', type=int, default=5000, help='files per checkpoint commit')
+    arg_parser.add_argument('--no-gitignore', action='store_true', help='index ignored files too')
+    args = arg_parser.parse_args()
+
+    if args.resume and not args.codebase_id:
+        arg_parser.error('--resume needs --codebase-id')
+    if args.incremental and not args.codebase_id:
+        arg_parser.error('--incremental needs --codebase-id')
+    if args.incremental and (args.resume or args.prune):
+        arg_parser.error('--incremental already skips unchanged and removes deleted files')
+    if args.snapshot and not (args.version or _git_head(args.path)):
+        arg_parser.error('--snapshot needs --version outside a git checkout')
+    if not os.path.isdir(args.path):
+        arg_parser.error(f"{args.path} is not a directory")
+
+    async def run():
+        try:
+            return await index_repo(args)
+        finally:
+            await async_engine.dispose()
+
+    stats = asyncio.run(run())
+    sys.exit(1 if stats.counts["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
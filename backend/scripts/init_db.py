@@ -3,6 +3,8 @@
 import sys
 import os
 
+from sqlalchemy import text
+
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from app.core.database import engine, Base
@@ -13,7 +15,15 @@ def init_database():
     print(f"Initializing database: {settings.DATABASE_URL}")
     
     # Import models so they're registered with Base
-    from app.schemas.code_analysis import Codebase, CodeFile
+    from app.schemas.code_analysis import (
+        Codebase, CodebaseVersion, CodeChunk, CodeFile, DependencyGraphRecord, FileBlob, IngestJob,
+        IngestJobChunk, ParseCacheEntry, Symbol
+    )
+    
+    # Extensions used by the indexes
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
     
     # Create all tables
     Base.metadata.create_all(bind=engine)
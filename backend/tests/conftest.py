@@ -0,0 +1,10 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Settings are read when app modules are imported. Tests that need a real
+# database run against TEST_DATABASE_URL (Postgres with pgvector and
+# pg_trgm available) and are skipped without it.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL or "postgresql://localhost/codebase_oracle_test")
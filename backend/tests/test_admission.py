@@ -0,0 +1,149 @@
+"""Upload admission: limits, queueing, cancellation and the rejections the middleware answers with."""
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, AdmissionMiddleware, AdmissionRejected
+from app.core.config import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+def _controller(**limits) -> AdmissionController:
+    values = dict(
+        max_concurrent=2, max_bytes=100, max_concurrent_per_codebase=2, max_bytes_per_codebase=100,
+        max_queue=2, max_queue_per_codebase=2
+    )
+    values.update(limits)
+    return AdmissionController(**values)
+
+
+async def _settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def test_waiter_runs_when_capacity_is_released():
+    controller = _controller(max_concurrent=1)
+    await controller.acquire("a", 10, timeout=5)
+    waiting = asyncio.create_task(controller.acquire("b", 10, timeout=5))
+    await _settle()
+    assert not waiting.done() and controller.state()["queued"] == 1
+
+    controller.release("a", 10)
+    await waiting
+    assert controller.state() == {"active": 1, "queued": 0, "inflight_bytes": 10, "codebases": 1}
+
+
+async def test_oversized_request_runs_alone():
+    controller = _controller()
+    await controller.acquire("a", 500, timeout=5)
+    assert controller.active_bytes == 500
+    waiting = asyncio.create_task(controller.acquire("b", 1, timeout=5))
+    await _settle()
+    assert not waiting.done()
+    controller.release("a", 500)
+    await waiting
+
+
+async def test_codebase_limit_lets_other_codebases_pass():
+    controller = _controller(max_concurrent=3, max_concurrent_per_codebase=1)
+    await controller.acquire("a", 1, timeout=5)
+    blocked = asyncio.create_task(controller.acquire("a", 1, timeout=5))
+    await _settle()
+    await asyncio.wait_for(controller.acquire("b", 1, timeout=5), 1)
+    assert not blocked.done()
+    controller.release("a", 1)
+    await blocked
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    controller = _controller(max_concurrent=1)
+    await controller.acquire("a", 1, timeout=5)
+    waiting = asyncio.create_task(controller.acquire("b", 1, timeout=5))
+    await _settle()
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert controller.state()["queued"] == 0
+
+    controller.release("a", 1)
+    assert controller.state() == {"active": 0, "queued": 0, "inflight_bytes": 0, "codebases": 0}
+
+
+async def test_cancelled_after_admission_releases():
+    controller = _controller(max_concurrent=1)
+    await controller.acquire("a", 1, timeout=5)
+    waiting = asyncio.create_task(controller.acquire("b", 1, timeout=5))
+    await _settle()
+    # Admitted by the release, but cancelled before it could run
+    controller.release("a", 1)
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert controller.state() == {"active": 0, "queued": 0, "inflight_bytes": 0, "codebases": 0}
+
+
+async def test_full_queues_and_timeouts_are_rejected():
+    controller = _controller(max_concurrent=1, max_queue=2, max_queue_per_codebase=1)
+    await controller.acquire("a", 1, timeout=5)
+    queued = asyncio.create_task(controller.acquire("b", 1, timeout=5))
+    await _settle()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire("b", 1, timeout=5)
+    assert (rejected.value.status_code, rejected.value.reason) == (429, "codebase_queue_full")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire("c", 1, timeout=0.01)
+    assert (rejected.value.status_code, rejected.value.reason) == (503, "timeout")
+
+    expiring = asyncio.create_task(controller.acquire("c", 1, timeout=5))
+    await _settle()
+    with pytest.raises(AdmissionRejected) as rejected:
+        await controller.acquire("d", 1, timeout=5)
+    assert (rejected.value.status_code, rejected.value.reason) == (503, "queue_full")
+
+    for task in (queued, expiring):
+        task.cancel()
+    await asyncio.gather(queued, expiring, return_exceptions=True)
+
+
+async def _call(middleware, headers, body=b""):
+    scope = {
+        "type": "http", "method": "POST", "path": f"{settings.API_V1_STR}/codebases/abc/upload",
+        "headers": headers
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware(scope, receive, send)
+    return sent
+
+
+async def test_middleware_answers_413_and_503():
+    async def app(scope, receive, send):
+        await receive()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    controller = _controller(max_concurrent=1, max_queue=0)
+    middleware = AdmissionMiddleware(app, controller)
+
+    too_large = str(settings.ADMISSION_MAX_BODY_BYTES + 1).encode()
+    sent = await _call(middleware, [(b"content-length", too_large)])
+    assert sent[0]["status"] == 413
+
+    sent = await _call(middleware, [(b"content-length", b"4")], b"data")
+    assert sent[0]["status"] == 200 and controller.active == 0
+
+    await controller.acquire("other", 1, timeout=5)
+    sent = await _call(middleware, [(b"content-length", b"4")], b"data")
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", str(settings.ADMISSION_RETRY_AFTER).encode()) in sent[0]["headers"]
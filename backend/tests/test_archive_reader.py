@@ -0,0 +1,62 @@
+"""Streaming zip and tar archives: skips, unsafe paths and corrupt input."""
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from app.services.archive_reader import ArchiveEntry, ArchiveError, iter_archive
+
+FILES = {
+    "repo/app/main.py": b"print('main')\n",
+    "repo/app/data.bin.py": b"\x00\x01binary",
+    "repo/app/big.py": b"x = 1\n" * 100,
+    "repo/README.md": b"# readme\n",
+    "../escape.py": b"evil = True\n",
+}
+EXPECTED = [
+    ArchiveEntry("repo/app/main.py", b"print('main')\n"),
+    ArchiveEntry("repo/app/data.bin.py", None, "binary file"),
+    ArchiveEntry("repo/app/big.py", None, "file too large (600 bytes)"),
+    ArchiveEntry("repo/README.md", None, "unsupported file type"),
+]
+
+
+def _zip(compression: int = zipfile.ZIP_DEFLATED) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, data in FILES.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def _tar(mode: str) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _read(data: bytes):
+    return list(iter_archive(io.BytesIO(data), lambda path: path.endswith(".py"), 100))
+
+
+@pytest.mark.parametrize("data", [_zip(), _tar("w"), _tar("w:gz"), _tar("w:xz")], ids=["zip", "tar", "tar.gz", "tar.xz"])
+def test_entries_are_read_or_skipped(data):
+    assert _read(data) == EXPECTED
+
+
+@pytest.mark.parametrize("data", [
+    b"not an archive at all",
+    _tar("w:gz")[:60],
+    _tar("w:gz")[:len(_tar("w:gz")) * 2 // 3],
+    _zip()[:len(_zip()) // 2],
+    _tar("w:gz")[:10] + bytes(byte ^ 0xFF for byte in _tar("w:gz")[10:]),
+    _zip(zipfile.ZIP_STORED).replace(b"print('main')", b"print('MAIN')"),
+], ids=["garbage", "truncated tar.gz", "tar.gz cut inside a member", "truncated zip", "corrupt gzip stream", "bad zip crc"])
+def test_unreadable_archives_raise_archive_error(data):
+    with pytest.raises(ArchiveError):
+        _read(data)
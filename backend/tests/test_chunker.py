@@ -0,0 +1,67 @@
+"""Chunks follow the parser's definitions and cover the whole file."""
+from app.services.chunker import chunk_file
+from app.services.parse_result import ParseResult
+from app.services.scanner import scan_python
+
+SOURCE = '''"""Orders."""
+import os
+
+
+@cache
+def load(path):
+    def inner():
+        pass
+    return inner
+
+
+class Processor:
+    """Processes orders."""
+
+    def run(self):
+        return 1
+
+    def stop(self):
+        return 2
+
+
+def stub():
+    pass
+
+
+def stub():
+    pass
+'''
+
+
+def test_chunks_follow_definitions():
+    chunks = chunk_file(SOURCE, scan_python(SOURCE))
+    assert [(chunk.kind, chunk.name, chunk.parent, chunk.start_line, chunk.end_line) for chunk in chunks] == [
+        ("module", None, None, 1, 2),
+        ("function", "load", None, 5, 9),
+        ("class", "Processor", None, 12, 13),
+        ("function", "run", "Processor", 15, 16),
+        ("function", "stop", "Processor", 18, 19),
+        ("function", "stub", None, 22, 23),
+        ("function", "stub", None, 26, 27),
+    ]
+    # Decorators belong to the definition, nested functions to their parent
+    assert chunks[1].text.startswith("@cache\ndef load")
+    assert "def inner" in chunks[1].text
+
+
+def test_identical_chunks_get_distinct_hashes():
+    chunks = chunk_file(SOURCE, scan_python(SOURCE))
+    assert chunks[-1].text == chunks[-2].text
+    assert len({chunk.chunk_hash for chunk in chunks}) == len(chunks)
+    # Hashes depend only on the text, so re-chunking an unchanged file keeps them
+    assert [chunk.chunk_hash for chunk in chunk_file(SOURCE, scan_python(SOURCE))] == [
+        chunk.chunk_hash for chunk in chunks
+    ]
+
+
+def test_file_without_line_numbers_is_one_module_chunk():
+    chunks = chunk_file("x = 1\ny = 2\n", ParseResult("python", "mcp-simple"))
+    assert [(chunk.kind, chunk.start_line, chunk.end_line, chunk.text) for chunk in chunks] == [
+        ("module", 1, 2, "x = 1\ny = 2")
+    ]
+    assert chunk_file("\n\n", ParseResult("python", "mcp-simple")) == []
@@ -0,0 +1,153 @@
+"""Round trips through a real Postgres over asyncpg (needs TEST_DATABASE_URL)."""
+import os
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import Base, async_engine
+from app.schemas.code_analysis import CodeChunk, Codebase, CodeFile
+from app.services.blob_store import store_blobs
+from app.services.bulk_writer import CodeFileBulkWriter
+from app.services.chunker import chunk_file
+from app.services.embeddings import embed_texts, file_embedding_text, semantic_search
+from app.services.archive_reader import ArchiveEntry
+from app.services.ingest import code_file_row, ingest_entries
+from app.services.parse_cache import content_hash
+from app.services.parser_registry import get_parser
+from app.services.response_cache import bump_generation
+from app.services.versions import live
+
+pytestmark = [
+    pytest.mark.skipif(not os.environ.get("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set"),
+    pytest.mark.asyncio,
+]
+
+SOURCE = '''import os
+
+class OrderProcessor:
+    def process_order(self, order_id):
+        return os.path.join("orders", order_id)
+'''
+
+
+@pytest_asyncio.fixture
+async def db():
+    """A session inside a transaction that is rolled back, tables included."""
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+        async with AsyncSession(bind=conn, autoflush=False, expire_on_commit=False) as session:
+            yield session
+        await transaction.rollback()
+    # Each test runs on its own event loop; pooled connections must not outlive it
+    await async_engine.dispose()
+
+
+async def test_embeddings_round_trip_through_bulk_writer(db):
+    codebase = Codebase(name="round-trip")
+    db.add(codebase)
+    await db.flush()
+
+    data = SOURCE.encode('utf-8')
+    digest = content_hash(data)
+    await store_blobs(db, {digest: data})
+    # Chunk names need line numbers, which the default regex engine does not record
+    parsed = get_parser("scanner").parse_code(SOURCE, "orders/processor.py")
+    row = code_file_row(codebase.id, "orders/processor.py", SOURCE, parsed, digest)
+
+    writer = CodeFileBulkWriter(db, codebase.id)
+    await writer.add(row, item="orders/processor.py", chunks=chunk_file(SOURCE, parsed))
+    result = await writer.flush()
+    assert result.error is None
+
+    stored = await db.scalar(select(CodeFile.embedding).where(CodeFile.id == row["id"]))
+    assert isinstance(stored, np.ndarray)
+    np.testing.assert_allclose(stored, embed_texts([file_embedding_text(row)])[0], rtol=1e-6)
+
+    chunk_vectors = (await db.scalars(
+        select(CodeChunk.embedding).where(CodeChunk.codebase_id == codebase.id)
+    )).all()
+    assert chunk_vectors and all(isinstance(vector, np.ndarray) for vector in chunk_vectors)
+
+    hits = await semantic_search(db, codebase.id, "process order")
+    assert [hit["file_path"] for hit in hits] == ["orders/processor.py"]
+    chunk_hits = await semantic_search(db, codebase.id, "process order", level="chunk")
+    assert "process_order" in [hit["name"] for hit in chunk_hits]
+
+
+async def test_semantic_search_fills_k_for_small_codebase(db):
+    """The HNSW index is shared, so its candidates can all belong to another codebase."""
+    large, small = Codebase(name="large"), Codebase(name="small")
+    db.add_all([large, small])
+    await db.flush()
+
+    query = embed_texts(["process order"])[0]
+    rng = np.random.default_rng(0)
+
+    def rows(codebase_id, count, sign):
+        # Near the query for the large codebase, opposite it for the small one
+        vectors = sign * query + rng.normal(scale=0.05, size=(count, query.shape[0])).astype(np.float32)
+        return [
+            dict(codebase_id=codebase_id, file_path=f"f{index}.py", language="python", embedding=vector)
+            for index, vector in enumerate(vectors)
+        ]
+
+    await db.execute(insert(CodeFile), rows(large.id, 2000, 1.0))
+    await db.execute(insert(CodeFile), rows(small.id, 20, -1.0))
+    # Stand in for a codebase large enough that the planner picks the HNSW index;
+    # the dropped indexes come back when the test's transaction is rolled back
+    for index in CodeFile.__table__.indexes:
+        if index.name != "ix_code_files_embedding_hnsw":
+            await db.execute(text(f"DROP INDEX {index.name}"))
+    await db.execute(text("SET LOCAL seq_page_cost = 1000"))
+
+    hits = await semantic_search(db, small.id, "process order", k=10)
+    assert len(hits) == 10
+
+
+@pytest.mark.parametrize("chunk_size", [10, 1])
+async def test_repeated_paths_keep_the_last_entry(db, monkeypatch, chunk_size):
+    """Within one chunk and across chunks, a repeated path ends up as one live row."""
+    monkeypatch.setattr(settings, "INGEST_CHUNK_SIZE", chunk_size)
+    codebase = Codebase(name="duplicates")
+    db.add(codebase)
+    await db.flush()
+
+    entries = [
+        ArchiveEntry("app/main.py", b"def first():\n    pass\n"),
+        ArchiveEntry("app/other.py", b"def other():\n    pass\n"),
+        ArchiveEntry("app/main.py", b"def second():\n    pass\n"),
+    ]
+    outcomes = [outcome async for outcome in ingest_entries(db, str(codebase.id), entries)]
+    assert all(outcome.status != "failed" for outcome in outcomes)
+
+    rows = (await db.execute(
+        select(CodeFile.file_path, CodeFile.analysis_result).where(CodeFile.codebase_id == codebase.id, live())
+    )).all()
+    assert sorted(path for path, _ in rows) == ["app/main.py", "app/other.py"]
+    main = next(result for path, result in rows if path == "app/main.py")
+    assert [record["name"] for record in main["functions"]] == ["second"]
+
+
+async def test_failed_savepoint_keeps_the_generation(db):
+    """Rolling back a SAVEPOINT must not make the next bump advance the generation again."""
+    codebase = Codebase(name="savepoint")
+    db.add(codebase)
+    await db.flush()
+
+    generation = await bump_generation(db, codebase.id)
+    with pytest.raises(DBAPIError):
+        async with db.begin_nested():
+            await db.execute(text("SELECT 1 / 0"))
+    assert await bump_generation(db, codebase.id) == generation
+    await db.commit()
+
+    stored = await db.scalar(select(Codebase.generation).where(Codebase.id == codebase.id))
+    assert stored == generation
@@ -0,0 +1,79 @@
+"""Import resolution, cycle detection and incremental updates of the dependency graph."""
+import uuid
+
+import numpy as np
+
+from app.services.dependency_graph import DependencyGraph, resolve_edges
+
+PATHS = [
+    "app/__init__.py",
+    "app/main.py",
+    "app/models.py",
+    "app/util/__init__.py",
+    "app/util/text.py",
+    "web/api.ts",
+    "web/index.js",
+    "web/lib/format.js",
+]
+
+
+def _graph(imports):
+    return DependencyGraph.from_edges([uuid.uuid4() for _ in PATHS], PATHS, resolve_edges(PATHS, imports))
+
+
+def _edges(graph):
+    return {
+        (graph.paths[source], graph.paths[target])
+        for source in range(len(graph.paths))
+        for target in graph.indices[graph.indptr[source]:graph.indptr[source + 1]]
+    }
+
+
+def test_resolve_python_and_javascript_imports():
+    graph = _graph([
+        [],
+        ["import app.models", "from .util import text", "from app.util.text import slug", "import os"],
+        ["from . import main"],
+        [],
+        ["from ..models import Model"],
+        ["import { format } from './lib/format'"],
+        ["const api = require('./api')", "import React from 'react'"],
+        [],
+    ])
+    assert _edges(graph) == {
+        ("app/main.py", "app/models.py"),
+        ("app/main.py", "app/util/text.py"),
+        ("app/models.py", "app/main.py"),
+        ("app/util/text.py", "app/models.py"),
+        ("web/api.ts", "web/lib/format.js"),
+        ("web/index.js", "web/api.ts"),
+    }
+
+
+def test_cycles_and_memo():
+    graph = _graph([[], ["import app.models"], ["import app.util.text"], [], ["import app.main"], [], [], []])
+    cycles = graph.cycles()
+    assert [sorted(graph.paths[node] for node in cycle) for cycle in cycles] == [
+        ["app/main.py", "app/models.py", "app/util/text.py"]
+    ]
+    assert graph.cycles() is cycles
+
+    acyclic = _graph([[]] * len(PATHS))
+    assert acyclic.cycles() == []
+
+
+def test_replacing_files_matches_a_full_build():
+    before = [[], ["import app.models"], ["import app.main"], [], [], ["import './index'"], [], []]
+    after = list(before)
+    after[2] = ["from .util.text import slug"]
+    after[7] = ["import { api } from '../api'"]
+
+    graph = _graph(before)
+    file_id = uuid.uuid4()
+    updated = graph.with_files_replaced({2: (file_id, after[2]), 7: (graph.file_ids[7], after[7])})
+    full = DependencyGraph.from_edges(graph.file_ids, PATHS, resolve_edges(PATHS, after))
+
+    np.testing.assert_array_equal(updated.indptr, full.indptr)
+    np.testing.assert_array_equal(updated.indices, full.indices)
+    assert updated.file_ids[2] == file_id and graph.file_ids[2] != file_id
+    assert updated.cycles() == []
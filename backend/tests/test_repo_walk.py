@@ -0,0 +1,62 @@
+"""Repository walk: .gitignore rules, nested ignore files and skipped directories."""
+import pytest
+
+from app.services.repo_walk import is_ignored, parse_rules, walk_repo
+
+
+@pytest.mark.parametrize("lines, path, is_dir, ignored", [
+    (["*.pyc"], "pkg/module.pyc", False, True),
+    (["build/"], "build", True, True),
+    (["build/"], "build", False, False),
+    (["/dist"], "dist", True, True),
+    (["/dist"], "pkg/dist", True, False),
+    (["docs/*.md"], "docs/guide.md", False, True),
+    (["docs/*.md"], "docs/api/guide.md", False, False),
+    (["**/generated"], "a/b/generated", True, True),
+    (["logs/**"], "logs/2024/app.log", False, True),
+    (["*.log", "!keep.log"], "keep.log", False, False),
+    (["*.log", "!keep.log"], "other.log", False, True),
+    (["# comment", "", "\\#literal"], "#literal", False, True),
+    (["file[0-9].py"], "file7.py", False, True),
+    (["file[!0-9].py"], "file7.py", False, False),
+])
+def test_gitignore_rules(lines, path, is_dir, ignored):
+    assert is_ignored(parse_rules(lines), path, is_dir) is ignored
+
+
+def test_nested_rules_only_apply_below_their_directory():
+    rules = parse_rules(["*.txt"]) + parse_rules(["/local.py", "!keep.txt"], base="pkg")
+    assert is_ignored(rules, "pkg/local.py", False)
+    assert not is_ignored(rules, "local.py", False)
+    assert not is_ignored(rules, "pkg/keep.txt", False)
+    assert is_ignored(rules, "keep.txt", False)
+
+
+def test_walk_honours_ignore_files(tmp_path):
+    files = {
+        ".gitignore": "*.log\nbuild/\n",
+        ".git/info/exclude": "secret.py\n",
+        ".git/config": "",
+        "main.py": "",
+        "secret.py": "",
+        "debug.log": "",
+        "build/out.py": "",
+        "pkg/.gitignore": "generated.py\n!important.log\n",
+        "pkg/generated.py": "",
+        "pkg/important.log": "",
+        "pkg/module.py": "",
+        "other/generated.py": "",
+    }
+    for name, text in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+
+    found = sorted(rel for _, rel in walk_repo(str(tmp_path), threads=2))
+    assert found == [".gitignore", "main.py", "other/generated.py", "pkg/.gitignore",
+                     "pkg/important.log", "pkg/module.py"]
+
+    everything = sorted(rel for _, rel in walk_repo(str(tmp_path), use_gitignore=False,
+                                                      include=lambda rel: rel.endswith(".py")))
+    assert everything == ["build/out.py", "main.py", "other/generated.py", "pkg/generated.py",
+                          "pkg/module.py", "secret.py"]
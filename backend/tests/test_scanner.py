@@ -0,0 +1,68 @@
+"""Keywords inside strings, comments and regex literals are not declarations."""
+from app.services.scanner import scan_javascript, scan_python
+
+
+def _names(records):
+    return [(record.name, record.line) for record in records]
+
+
+def test_javascript_strings_do_not_hide_or_fake_declarations():
+    parsed = scan_javascript(
+        'const s = "function notReal(";\n'
+        'const docs = "http://example.com"; function afterUrl() {}\n'
+        "const base = 'http://example.com'; const join = (path) => base + path;\n"
+    )
+    assert _names(parsed.functions) == [("afterUrl", 2), ("join", 3)]
+
+
+def test_javascript_blocks_keep_line_numbers():
+    parsed = scan_javascript(
+        "const pattern = /[`'\"]/g;\n"
+        "const help = `\n"
+        "function inTemplate() {}\n"
+        "continued \\\n"
+        "`;\n"
+        "/* class InComment {}\n"
+        "   function inComment() {} */ export class Linker {}\n"
+        "// function commentedOut() {}\n"
+        "export const load = async (\n"
+        "    path,\n"
+        ") => path;\n"
+    )
+    assert _names(parsed.functions) == [("load", 9)]
+    assert _names(parsed.classes) == [("Linker", 7)]
+
+
+def test_python_strings_and_comments():
+    parsed = scan_python(
+        'HELP = """\n'
+        "def fake(): pass\n"
+        '"""\n'
+        "quote = '\"\"\"'\n"
+        "class Cart:  # class Fake\n"
+        "    async def total(self):\n"
+        "        def price(item): pass\n"
+        "from os import path  # import sys\n"
+    )
+    assert _names(parsed.functions) == [("total", 6), ("price", 7)]
+    assert _names(parsed.classes) == [("Cart", 5)]
+    assert parsed.functions[0].parent == "Cart"
+    assert parsed.functions[1].parent_function == "total"
+    assert parsed.imports == ["from os import path"]
+
+
+def test_javascript_methods_and_unterminated_comments():
+    parsed = scan_javascript(
+        "class Cart {\n"
+        "    constructor() { this.items = []; }\n"
+        "    async total(rate) {\n"
+        "        if (rate) {\n"
+        "            return 1;\n"
+        "        }\n"
+        "    }\n"
+        "}\n"
+        "/* unterminated\n"
+        "function hidden() {}\n"
+    )
+    assert _names(parsed.functions) == [("constructor", 2), ("total", 3)]
+    assert _names(parsed.classes) == [("Cart", 1)]
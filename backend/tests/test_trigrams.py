@@ -0,0 +1,74 @@
+"""Soundness of the trigram extractor: a file that matches is never filtered out."""
+import random
+import re
+
+import pytest
+
+from app.services.trigrams import content_trigrams, required_trigrams
+
+
+def _assert_sound(pattern: str, text: str, flags: int = 0):
+    compiled = re.compile(pattern, flags)
+    assert compiled.search(text), (pattern, text)
+    required = required_trigrams(pattern, regex=True, ignore_case=bool(compiled.flags & re.IGNORECASE),
+                                 verbose=bool(compiled.flags & re.VERBOSE))
+    missing = set(required) - set(content_trigrams(text.encode('utf-8')))
+    assert not missing, (pattern, text)
+
+
+@pytest.mark.parametrize("pattern, text, flags", [
+    # Verbose mode drops whitespace and comments from the pattern
+    ("def handler # the entry point", "defhandler", re.VERBOSE),
+    ("(?x) def handler", "defhandler", 0),
+    ("(?ix) DEF handler", "defhandler", 0),
+    # Escapes that stand for other text or consume what follows
+    (r"\x41bcdef", "Abcdef", 0),
+    (r"Abcdef", "Abcdef", 0),
+    (r"\N{LATIN SMALL LETTER A}bcdef", "abcdef", 0),
+    (r"\101bcdef", "Abcdef", 0),
+    (r"\0bcdef", "\0bcdef", 0),
+    (r"(ab)\1cde", "ababcde", 0),
+    # Escaped "]" inside a class
+    (r"[\]abc]xyz", "]xyz", 0),
+    ("[]abc]xyz", "]xyz", 0),
+    # Zero repetitions however they are spelled
+    ("abcd{00}ef", "abcef", 0),
+    ("abcd{0,2}ef", "abcef", 0),
+    ("abcd{,2}ef", "abcef", 0),
+    # IGNORECASE matches non-ASCII letters to i, k and s
+    ("(?i)stalking", "\u017ftal\u212aing", 0),
+    ("kitten", "\u212a\u0130tten", re.IGNORECASE),
+    ("mask", "ma\u017fk", re.IGNORECASE),
+])
+def test_known_matches_keep_their_files(pattern, text, flags):
+    _assert_sound(pattern, text, flags)
+
+
+# Pattern pieces with texts each one matches
+PIECES = [
+    ("abc", ["abc"]), ("def", ["def"]), ("x", ["x"]), ("K", ["K"]), ("s", ["s"]),
+    ("a?", ["", "a"]), ("b*", ["", "bb"]), ("c+", ["c", "cc"]), ("d{0}", [""]), ("e{0,2}", ["", "ee"]),
+    ("f{2}", ["ff"]), (r"\.", ["."]), (r"\d", ["7"]), (r"\w", ["q"]), (r"\s", [" "]), (r"\x41", ["A"]),
+    (r"\n", ["\n"]), ("[xyz]", ["y"]), (r"[\]q]", ["]"]), ("[^a]", ["#"]), ("(?:gh)?", ["", "gh"]),
+    ("(ij)", ["ij"]), ("(?=k)k", ["k"]), (".", ["%"]), (" ", [" "]), ("#", ["#"]),
+]
+
+
+def test_random_patterns_keep_matching_files():
+    rng = random.Random(0)
+    for _ in range(3000):
+        chosen = [rng.choice(PIECES) for _ in range(rng.randint(1, 8))]
+        pattern = ''.join(piece for piece, _ in chosen)
+        text = ''.join(rng.choice(samples) for _, samples in chosen)
+        flags = rng.choice([0, re.IGNORECASE, re.VERBOSE])
+        compiled = re.compile(pattern, flags)
+        if compiled.search(text):
+            _assert_sound(pattern, text, flags)
+        if flags & re.IGNORECASE:
+            _assert_sound(pattern, text.swapcase().replace('s', 'ſ').replace('k', 'K'), flags)
+
+
+def test_plain_text_is_still_indexed():
+    assert required_trigrams("def handler", regex=True)
+    assert required_trigrams("def handler(", regex=False)
+    assert required_trigrams("(?i)parse_order", regex=True, ignore_case=True)
@@ -0,0 +1,17 @@
+"""Manifest diffs against the stored tree."""
+from app.services.versions import ManifestDiff, diff_manifests
+
+
+def test_diff_manifests():
+    stored = {"a.py": "1", "b.py": "2", "c.py": "3", "d.py": None}
+    manifest = {"b.py": "2", "c.py": "changed", "d.py": "4", "e.py": "5", "0.py": "6"}
+    assert diff_manifests(stored, manifest) == ManifestDiff(
+        added=["0.py", "e.py"], changed=["c.py", "d.py"], removed=["a.py"], unchanged=1
+    )
+
+
+def test_diff_manifests_edge_cases():
+    assert diff_manifests({}, {}) == ManifestDiff([], [], [], 0)
+    assert diff_manifests({}, {"a.py": "1"}) == ManifestDiff(["a.py"], [], [], 0)
+    assert diff_manifests({"a.py": "1"}, {}) == ManifestDiff([], [], ["a.py"], 0)
+    assert diff_manifests({"a.py": "1"}, {"a.py": "1"}) == ManifestDiff([], [], [], 1)